@@ -0,0 +1 @@
+"""Data pipeline behind the AI-Powered CRM dashboard (app.py)."""
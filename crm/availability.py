@@ -0,0 +1,255 @@
+"""Agent availability index built live from Schedule and LeadCall.
+
+Each agent-day is one uint32 bitset with bit h set when the agent is busy
+during hour h (a scheduled task or a call in progress). The bitsets form an
+(agents x days) matrix, about 4 bytes per agent-day, so a thousand agents
+over a year fit in under 1.5 MB. Next to it the index keeps:
+
+* a per-agent running sum of busy working hours per day, so utilization over
+  any range of days is two prefix lookups;
+* per agent, the sorted days that still have a free working hour, so the
+  first free slot after T is one binary search plus a bit scan.
+
+"Which agents are free at T" is a single column read of the matrix. Queries
+outside the indexed days treat every agent as free.
+
+    python -m crm.availability [data_dir]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from crm import ingest
+
+WORK_START, WORK_END = 9, 18  # working hours are [WORK_START, WORK_END)
+WORK_MASK = np.uint32(((1 << WORK_END) - 1) ^ ((1 << WORK_START) - 1))
+WORK_HOURS = WORK_END - WORK_START
+TASK_SECONDS = 3600
+MAX_SPAN_HOURS = 24
+SOURCES = ['Agent', 'LeadCall', 'Schedule']
+
+_DAY_OFFSET = 1 << 31  # keeps pre-1970 days positive inside the packed keys
+_POPCOUNT = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.uint8)
+
+
+def popcount(bits):
+    bits = np.asarray(bits, dtype=np.uint32)
+    return _POPCOUNT[bits & 0xFFFF].astype(np.int32) + _POPCOUNT[bits >> 16]
+
+
+def _lowest_bit(bits):
+    bits = int(bits)
+    return (bits & -bits).bit_length() - 1
+
+
+class BusyAccumulator:
+    """Busy-hour bitsets per (agent, day) folded over any number of LeadCall
+    chunks and Schedule rows; memory grows with the busy agent-days, not the
+    call history."""
+
+    call_columns = ['CallDateTime', 'DurationSeconds', 'AssignedAgentId']
+
+    def __init__(self, agent_ids):
+        self.agent_ids = np.sort(np.asarray(agent_ids))
+        self.keys = np.empty(0, dtype=np.int64)  # agent position << 32 | day offset, sorted
+        self.bits = np.empty(0, dtype=np.uint32)
+
+    def add_calls(self, calls):
+        self.add(calls['CallDateTime'].to_numpy(dtype='datetime64[s]'),
+                 calls['DurationSeconds'].to_numpy(dtype='int64'), calls['AssignedAgentId'].to_numpy())
+
+    def add_schedule(self, schedule):
+        self.add(schedule['ScheduledDate'].to_numpy(dtype='datetime64[s]'),
+                 np.full(len(schedule), TASK_SECONDS, dtype='int64'), schedule['AssignedAgentId'].to_numpy())
+
+    def add(self, starts, seconds, agents):
+        """Mark every hour each activity overlaps; zero-length ones still take their start hour."""
+        agent_ids = self.agent_ids
+        valid = ~np.isnat(starts)
+        pos = np.searchsorted(agent_ids, agents).clip(0, max(len(agent_ids) - 1, 0))
+        valid &= (agent_ids[pos] == agents) if len(agent_ids) else False
+        starts, seconds, pos = starts[valid], seconds[valid], pos[valid].astype(np.int64)
+        if not len(starts):
+            return
+        hours = starts.astype('datetime64[h]').astype('int64')
+        offset = (starts - starts.astype('datetime64[h]')).astype('int64')
+        span = np.clip((offset + np.maximum(seconds, 1) - 1) // 3600 + 1, 1, MAX_SPAN_HOURS)
+        keys, bits = [self.keys], [self.bits]
+        for step in range(int(span.max())):
+            take = span > step
+            hour = hours[take] + step
+            keys.append(pos[take] << 32 | (hour // 24 + _DAY_OFFSET))
+            bits.append(np.left_shift(np.uint32(1), (hour % 24).astype(np.uint32)))
+        self.keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        self.bits = np.zeros(len(self.keys), dtype=np.uint32)
+        np.bitwise_or.at(self.bits, inverse, np.concatenate(bits))
+
+    def matrix(self):
+        """(agent_ids, first_day, busy) for AvailabilityIndex."""
+        agent_ids = self.agent_ids
+        if not len(self.keys):
+            return agent_ids, np.datetime64('today', 'D'), np.zeros((len(agent_ids), 1), dtype=np.uint32)
+        pos, day = self.keys >> 32, (self.keys & 0xFFFFFFFF) - _DAY_OFFSET
+        first = int(day.min())
+        busy = np.zeros((len(agent_ids), int(day.max()) - first + 1), dtype=np.uint32)
+        busy[pos, day - first] = self.bits
+        return agent_ids, np.datetime64(first, 'D'), busy
+
+
+class AvailabilityIndex:
+    """Busy-hour bitsets per agent-day with utilization and free-slot queries."""
+
+    def __init__(self, agent_ids, first_day, busy):
+        self.agent_ids = np.asarray(agent_ids)
+        self.first_day = np.datetime64(first_day, 'D')
+        self.busy = busy
+        work_busy = popcount(busy & WORK_MASK)
+        self.busy_prefix = np.zeros((len(self.agent_ids), busy.shape[1] + 1), dtype=np.int32)
+        np.cumsum(work_busy, axis=1, out=self.busy_prefix[:, 1:])
+        self.open_days = [np.flatnonzero(row < WORK_HOURS).astype(np.int32) for row in work_busy]
+
+    @classmethod
+    def from_frames(cls, agent_ids, calls, schedule):
+        """Build from LeadCall rows (CallDateTime, DurationSeconds, AssignedAgentId)
+        and Schedule rows (ScheduledDate, AssignedAgentId)."""
+        busy = BusyAccumulator(agent_ids)
+        busy.add_calls(calls)
+        busy.add_schedule(schedule)
+        return cls(*busy.matrix())
+
+    @classmethod
+    def from_data(cls, data_dir=ingest.DATA_DIR, chunk_rows=ingest.CALL_CHUNK_ROWS):
+        """Build from data/, folding LeadCall one chunk at a time."""
+        busy = BusyAccumulator(ingest.read_table(data_dir, 'Agent', columns=['AgentId'])['AgentId'])
+        for chunk in ingest.iter_calls(data_dir, chunk_rows, columns=BusyAccumulator.call_columns):
+            busy.add_calls(chunk)
+        busy.add_schedule(ingest.read_table(data_dir, 'Schedule', columns=['ScheduledDate', 'AssignedAgentId']))
+        return cls(*busy.matrix())
+
+    @classmethod
+    def load(cls, data_dir=ingest.DATA_DIR, store=None):
+        """from_data() shared through the host-wide cache, keyed on the source
+        files, so only the first worker on a host scans LeadCall."""
+        from crm import cache, query
+        sources = [query._fingerprint(ingest._csv_path(data_dir, s)) for s in SOURCES]
+        key = f'availability:{os.path.abspath(data_dir)}:{":".join(sources)}'
+        table = (store or cache.default_cache()).table(key, lambda: cls.from_data(data_dir).to_table())
+        return cls.from_table(table)
+
+    def to_table(self):
+        """The busy matrix as an Arrow table, one column of bitsets per agent."""
+        table = pa.table({str(a): self.busy[i] for i, a in enumerate(self.agent_ids)})
+        return table.replace_schema_metadata({'first_day': str(self.first_day),
+                                              'agent_dtype': str(self.agent_ids.dtype)})
+
+    @classmethod
+    def from_table(cls, table):
+        meta = table.schema.metadata
+        agent_ids = np.array([int(a) for a in table.column_names], dtype=meta[b'agent_dtype'].decode())
+        busy = np.empty((len(agent_ids), table.num_rows), dtype=np.uint32)
+        for i, column in enumerate(table.columns):
+            busy[i] = column.to_numpy()
+        return cls(agent_ids, np.datetime64(meta[b'first_day'].decode(), 'D'), busy)
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    @property
+    def days(self):
+        return self.busy.shape[1]
+
+    @property
+    def last_day(self):
+        return self.first_day + self.days - 1
+
+    @property
+    def nbytes(self):
+        return (self.busy.nbytes + self.busy_prefix.nbytes
+                + sum(days.nbytes for days in self.open_days) + self.agent_ids.nbytes)
+
+    def _agent(self, agent_id):
+        pos = int(np.searchsorted(self.agent_ids, agent_id))
+        if pos >= len(self.agent_ids) or self.agent_ids[pos] != agent_id:
+            raise KeyError(agent_id)
+        return pos
+
+    def _day_hour(self, t):
+        t = np.datetime64(pd.Timestamp(t).floor('h').to_datetime64(), 'h')
+        day = int((t.astype('datetime64[D]') - self.first_day).astype(int))
+        return day, int((t - t.astype('datetime64[D]')).astype(int))
+
+    def free_at(self, t):
+        """Agent ids free at time t (outside working hours nobody is)."""
+        day, hour = self._day_hour(t)
+        if not WORK_START <= hour < WORK_END:
+            return self.agent_ids[:0]
+        if not 0 <= day < self.days:
+            return self.agent_ids
+        return self.agent_ids[(self.busy[:, day] >> np.uint32(hour) & 1) == 0]
+
+    def _busy_hours(self, start, end):
+        """Busy working hours per agent over [start, end), day-granular."""
+        first, _ = self._day_hour(start)
+        last, _ = self._day_hour(pd.Timestamp(end) - pd.Timedelta(seconds=1))
+        first, last = max(first, 0), min(last, self.days - 1)
+        if first > last:
+            return np.zeros(len(self.agent_ids), dtype=np.int64), 0
+        busy = self.busy_prefix[:, last + 1] - self.busy_prefix[:, first]
+        return busy, last - first + 1
+
+    def utilization(self, start, end, agent_id=None):
+        """Share of working hours in [start, end) that agents were busy.
+
+        Whole days are counted; returns a per-agent Series, or one float for
+        agent_id.
+        """
+        busy, days = self._busy_hours(start, end)
+        requested = (pd.Timestamp(end).normalize() - pd.Timestamp(start).normalize()).days or 1
+        share = busy / (WORK_HOURS * max(requested, days))
+        if agent_id is not None:
+            return float(share[self._agent(agent_id)])
+        return pd.Series(share, index=self.agent_ids, name='utilization')
+
+    def first_free_slot(self, agent_id, after):
+        """Start of the first free working hour for agent_id at or after `after`."""
+        row = self._agent(agent_id)
+        t = _next_working_hour(pd.Timestamp(after).ceil('h'))
+        day, hour = self._day_hour(t)
+        if day < 0:
+            return t
+        if day < self.days:
+            later = np.uint32(((1 << 24) - 1) ^ ((1 << hour) - 1))
+            free = WORK_MASK & later & ~self.busy[row, day]
+            if free:
+                return pd.Timestamp(self.first_day + day) + pd.Timedelta(hours=_lowest_bit(free))
+            days = self.open_days[row]
+            i = int(np.searchsorted(days, day + 1))
+            if i < len(days):
+                free = WORK_MASK & ~self.busy[row, days[i]]
+                return pd.Timestamp(self.first_day + int(days[i])) + pd.Timedelta(hours=_lowest_bit(free))
+            t = pd.Timestamp(self.first_day + self.days) + pd.Timedelta(hours=WORK_START)
+        return t
+
+
+def _next_working_hour(t):
+    if t.hour >= WORK_END:
+        t = t.normalize() + pd.Timedelta(days=1)
+    return t.normalize() + pd.Timedelta(hours=max(t.hour, WORK_START))
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else ingest.DATA_DIR
+    started = time.perf_counter()
+    index = AvailabilityIndex.from_data(data_dir)
+    built = time.perf_counter() - started
+    utilization = index.utilization(pd.Timestamp(index.first_day), pd.Timestamp(index.last_day) + pd.Timedelta(days=1))
+    print(f'{len(index.agent_ids):,} agents x {index.days:,} days in {index.nbytes / 1024:.1f} KB '
+          f'(built in {built:.2f}s)', file=sys.stderr)
+    print(f'utilization over the indexed days: mean {utilization.mean():.1%}, max {utilization.max():.1%}')
+    agent = index.agent_ids[0]
+    print(f'agent {agent} first free slot after {index.first_day}: '
+          f'{index.first_free_slot(agent, pd.Timestamp(index.first_day))}')
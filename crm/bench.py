@@ -0,0 +1,339 @@
+"""Scale benchmark harness for the data pipeline.
+
+For each requested scale, generates (or reuses) a synthetic data/ directory
+with crm.synth, then times and memory-profiles every registered step:
+ingestion, aggregation and the data preparation behind each page. Each step
+runs once untraced for wall time and once under tracemalloc for its peak
+allocation. Results are written as JSON, one file per run, tagged with the
+git commit so runs can be compared across commits. tracemalloc only sees
+Python-heap allocations, so steps that run inside DuckDB report near-zero
+peaks; their cost shows up in wall time.
+
+    python -m crm.bench --scale 10k 1m
+    python -m crm.bench --startup
+    python -m crm.bench --compare bench_results/a.json bench_results/b.json
+
+--startup times the Streamlit app instead: for each page, in a fresh
+interpreter, the cold import of streamlit and the app's modules, the first
+paint of that page (AppTest run, cold in-process caches) and a warm rerun,
+and fails when a timing exceeds STARTUP_BUDGET.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import duckdb
+
+from crm import (availability, cache, charts, cube, incremental, ingest, insights, live, query, scheduler, scoring,
+                 search, synth)
+
+BENCH_DATA_DIR = 'bench_data'
+RESULTS_DIR = 'bench_results'
+
+BENCHMARKS = []
+STARTUP_BUDGET = {'import': 2.0, 'first_paint': 5.0, 'rerun': 1.0}  # seconds
+
+
+def benchmark(name):
+    """Register fn(data_dir, workdir) as a benchmark step."""
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+# -------------------------------
+# STEPS
+# -------------------------------
+@benchmark('ingest.build_dashboard_model')
+def bench_ingest(data_dir, workdir):
+    ingest.build_dashboard_model(data_dir, scores_path=None, trace_memory=False)
+
+
+@benchmark('incremental.full_refresh')
+def bench_incremental(data_dir, workdir):
+    state = os.path.join(workdir, 'aggregates.json')
+    if os.path.exists(state):
+        os.remove(state)
+    incremental.IncrementalAggregator(data_dir, state).refresh()
+
+
+@benchmark('scoring.score_leads')
+def bench_scoring(data_dir, workdir):
+    scoring.score_leads(data_dir)
+
+
+@benchmark('availability.build')
+def bench_availability(data_dir, workdir):
+    index = availability.AvailabilityIndex.from_data(data_dir)
+    for agent in index.agent_ids:
+        index.first_free_slot(agent, index.first_day)
+
+
+@benchmark('scheduler.load')
+def bench_scheduler(data_dir, workdir):
+    tasks = scheduler.TaskScheduler.from_data(data_dir)
+    for agent in tasks.heaps:
+        tasks.next_tasks(agent, 10)
+        tasks.counts(agent_id=agent)
+
+
+@benchmark('live.fold')
+def bench_live(data_dir, workdir):
+    counters = live.LiveCounters()
+
+    async def fold():
+        stop = asyncio.Event()
+        queue = asyncio.Queue(maxsize=live.QUEUE_BATCHES)
+        consumer = asyncio.ensure_future(live.consume(queue, counters))
+        tail = asyncio.ensure_future(live.tail_file(ingest._csv_path(data_dir, 'LeadCall'), queue, counters,
+                                                    poll=0.01, stop=stop))
+        while not counters.caught_up:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await tail
+        consumer.cancel()
+    asyncio.run(fold())
+    counters.snapshot()
+
+
+@benchmark('cube.build')
+def bench_cube(data_dir, workdir):
+    rollup = cube.Cube.build(data_dir)
+    for dims in (('country',), ('country', 'status'), ('agent', 'month'), ('city', 'agent')):
+        rollup.slice(dims)
+
+
+@benchmark('search.build')
+def bench_search(data_dir, workdir):
+    path = os.path.join(workdir, 'search.sqlite')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    index = search.SearchIndex(path)
+    index.sync(data_dir)
+    for text in ('connected', '"need more time"', 'residential'):
+        index.calls(text)
+        index.calls(text, query.Filters(agent_ids=(1,)))
+        index.leads(text)
+    index.con.close()
+
+
+@benchmark('insights.run')
+def bench_insights(data_dir, workdir):
+    insights.run(data_dir)
+
+
+@benchmark('insights.run.inline')
+def bench_insights_inline(data_dir, workdir):
+    insights.run(data_dir, workers=0)
+
+
+@benchmark('query.build_database')
+def bench_query_build(data_dir, workdir):
+    con = duckdb.connect(os.path.join(workdir, 'bench.duckdb'))
+    query.build_database(con, data_dir, force=True)
+    con.close()
+
+
+def _page_query(fn):
+    def run(data_dir, workdir):
+        con = query.open_database(data_dir, os.path.join(workdir, 'bench.duckdb'))
+        fn(con, query.Filters())
+        con.close()
+    return run
+
+
+@benchmark('charts.call_volume')
+def bench_call_volume(data_dir, workdir):
+    con = query.open_database(data_dir, os.path.join(workdir, 'bench.duckdb'))
+    charts.ensure_rollups(con)
+    store = cache.SharedCache(os.path.join(workdir, 'cache'))
+    store.clear()
+    for _ in range(2):  # miss, then hit
+        charts.cached_figure('call_volume', {}, 0,
+                             lambda: charts.call_volume_figure(*charts.call_series(con)), store)
+    con.close()
+
+
+for _name, _fn in (('page.lead_status', query.lead_status_counts),
+                   ('page.call_activity', query.call_activity),
+                   ('page.call_activity.hourly', query.hourly_success),
+                   ('page.geographic', query.geographic),
+                   ('page.grid.calls', lambda con, f: query.grid_page(con, 'calls', f, sort='Time')),
+                   ('page.grid.calls.count', lambda con, f: query.grid_count(
+                       con, 'calls', query.Filters(agent_ids=(1,))))):
+    benchmark(_name)(_page_query(_fn))
+
+
+# -------------------------------
+# HARNESS
+# -------------------------------
+def measure(fn, *args, trace_memory=True):
+    """(seconds, peak_mb) for one call; peak comes from a second traced call."""
+    started = time.perf_counter()
+    fn(*args)
+    seconds = time.perf_counter() - started
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def dataset(scale, seed=0):
+    """Path of the synthetic dataset for scale, generating it on first use."""
+    path = os.path.join(BENCH_DATA_DIR, f'{scale}-seed{seed}')
+    if not os.path.exists(os.path.join(path, 'LeadCall.csv')):
+        synth.generate(path, synth.parse_scale(scale), seed)
+    return path
+
+
+def run(scales, only=None, trace_memory=True, seed=0):
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    for scale in scales:
+        data_dir = dataset(scale, seed)
+        workdir = tempfile.mkdtemp(prefix='crm-bench-')
+        try:
+            for name, fn in BENCHMARKS:
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                seconds, peak_mb = measure(fn, data_dir, workdir, trace_memory=trace_memory)
+                results['runs'].append({
+                    'scale': scale, 'step': name,
+                    'seconds': round(seconds, 4),
+                    'peak_mb': None if peak_mb is None else round(peak_mb, 2),
+                })
+                print(f'{scale:>6}  {name:<36} {seconds:9.3f}s  '
+                      f'{"" if peak_mb is None else f"{peak_mb:9.1f} MB"}')
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# Runs in a fresh interpreter from the app directory; argv[1] is the page label.
+STARTUP_DRIVER = """
+import json, sys, time
+started = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+import sections.common
+imported = time.perf_counter() - started
+at = AppTest.from_file('app.py', default_timeout=600)
+at.session_state['nav'] = sys.argv[1]
+started = time.perf_counter()
+at.run()
+first_paint = time.perf_counter() - started
+started = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - started
+print(json.dumps({'import': imported, 'first_paint': first_paint, 'rerun': rerun,
+                  'errors': [str(e.value) for e in at.exception]}))
+"""
+
+
+def startup(app_dir='.'):
+    """Per-page cold import, first-paint and rerun seconds, checked against STARTUP_BUDGET."""
+    import sections
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    over = []
+    for label, name in sections.PAGES.items():
+        done = subprocess.run([sys.executable, '-c', STARTUP_DRIVER, label], cwd=app_dir,
+                              capture_output=True, text=True)
+        if done.returncode != 0:
+            raise RuntimeError(f'{name}: {done.stderr.strip().splitlines()[-1]}')
+        timing = json.loads(done.stdout.strip().splitlines()[-1])
+        if timing['errors']:
+            raise RuntimeError(f'{name}: {timing["errors"][0]}')
+        for phase in ('import', 'first_paint', 'rerun'):
+            step = f'startup.{name}.{phase}'
+            flag = timing[phase] > STARTUP_BUDGET[phase]
+            if flag:
+                over.append(step)
+            results['runs'].append({'scale': 'app', 'step': step, 'seconds': round(timing[phase], 4),
+                                    'peak_mb': None})
+            print(f'{"app":>6}  {step:<36} {timing[phase]:9.3f}s'
+                  f'{f"  over budget ({STARTUP_BUDGET[phase]}s)" if flag else ""}')
+    results['over_budget'] = over
+    return results
+
+
+def compare(old_path, new_path):
+    """Print the per-step time and memory ratio new/old."""
+    with open(old_path) as f:
+        old = {(r['scale'], r['step']): r for r in json.load(f)['runs']}
+    with open(new_path) as f:
+        new = json.load(f)['runs']
+    for row in new:
+        before = old.get((row['scale'], row['step']))
+        if not before:
+            continue
+        time_ratio = row['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+        line = f'{row["scale"]:>6}  {row["step"]:<36} time x{time_ratio:5.2f}'
+        if row['peak_mb'] and before['peak_mb']:
+            line += f'  memory x{row["peak_mb"] / before["peak_mb"]:5.2f}'
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scale', nargs='+', default=['10k'],
+                        help=f'dataset scales: {", ".join(synth.SCALES)} or a row count')
+    parser.add_argument('--only', nargs='+', help='run only steps starting with these prefixes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--out', help='results file (default: bench_results/<timestamp>-<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    parser.add_argument('--startup', action='store_true',
+                        help='time app import, first paint and rerun per page instead')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        if args.startup:
+            results = startup()
+        else:
+            results = run(args.scale, args.only, not args.no_memory, args.seed)
+        out = args.out or os.path.join(
+            RESULTS_DIR, f'{datetime.now():%Y%m%d-%H%M%S}-{results["commit"]}.json')
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        with open(out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'results written to {out}')
+        if results.get('over_budget'):
+            sys.exit(f'over budget: {", ".join(results["over_budget"])}')
@@ -0,0 +1,213 @@
+"""Host-wide cache shared by every dashboard worker on the machine.
+
+@st.cache_data and @st.cache_resource keep one copy per process, so N
+replicas behind a load balancer build and hold N copies of every computed
+aggregate. SharedCache keeps each entry once, as a file under
+processed_data/.state/cache: tables as uncompressed Arrow IPC, opened
+memory-mapped so every worker reads the same page-cache pages, and other
+values as raw bytes. A small SQLite index (WAL mode, safe across processes)
+records each entry's size and last use and keeps host-wide hit / miss /
+eviction counters. When the entries outgrow max_bytes the least recently
+used ones are deleted; a worker still reading an evicted file keeps its
+mapping, the file just stops being findable.
+
+Entries are immutable: a key names one value for good, so callers put the
+data version or source fingerprints in the key and stale entries age out
+through the LRU.
+
+    python -m crm.cache [--clear]      # print the counters (or empty the cache)
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pyarrow as pa
+
+CACHE_DIR = os.path.join('processed_data', '.state', 'cache')
+MAX_BYTES = int(float(os.environ.get('CRM_CACHE_MB', 512)) * (1 << 20))
+COUNTERS = ('hits', 'misses', 'evictions')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, file TEXT NOT NULL,
+                                    bytes INTEGER NOT NULL, used REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def _read_table(path):
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _write_table(table):
+    def write(path):
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return write
+
+
+def _write_bytes(data):
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return write
+
+
+class SharedCache:
+    """Size-bounded LRU of Arrow tables and byte strings on local disk."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO counters VALUES (?, 0)', [(c,) for c in COUNTERS])
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ext)
+
+    def _count(self, name, n=1):
+        self._db.execute('UPDATE counters SET value = value + ? WHERE name = ?', (n, name))
+
+    def _get(self, key, read):
+        with self._lock:
+            row = self._db.execute('SELECT file FROM entries WHERE key = ?', (key,)).fetchone()
+            value = None
+            if row:
+                try:
+                    value = read(os.path.join(self.root, row[0]))
+                except FileNotFoundError:
+                    pass
+            with self._db:
+                if value is None:
+                    self._count('misses')
+                else:
+                    self._db.execute('UPDATE entries SET used = ? WHERE key = ?', (time.time(), key))
+                    self._count('hits')
+            return value
+
+    def _put(self, key, ext, write):
+        path = self._path(key, ext)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            write(tmp)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                             (key, os.path.basename(path), size, time.time()))
+            self._evict()
+        return path
+
+    def _evict(self):
+        total = self._db.execute('SELECT coalesce(sum(bytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, name, size in self._db.execute('SELECT key, file, bytes FROM entries ORDER BY used').fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        self._count('evictions', evicted)
+
+    # -------------------------------
+    # ENTRIES
+    # -------------------------------
+    def get_table(self, key):
+        """Memory-mapped pyarrow.Table stored under key, or None."""
+        return self._get(key, _read_table)
+
+    def put_table(self, key, table):
+        self._put(key, '.arrow', _write_table(table))
+
+    def get_bytes(self, key):
+        """Bytes stored under key, or None."""
+        return self._get(key, _read_bytes)
+
+    def put_bytes(self, key, data):
+        self._put(key, '.bin', _write_bytes(data))
+
+    def table(self, key, build):
+        """The table under key, stored from build() on a miss and returned
+        memory-mapped either way."""
+        table = self.get_table(key)
+        if table is None:
+            table = _read_table(self._put(key, '.arrow', _write_table(build())))
+        return table
+
+    def blob(self, key, build):
+        """The bytes under key, stored from build() on a miss."""
+        data = self.get_bytes(key)
+        if data is None:
+            data = build()
+            self._put(key, '.bin', _write_bytes(data))
+        return data
+
+    # -------------------------------
+    # ADMIN
+    # -------------------------------
+    def stats(self):
+        """Host-wide hits / misses / evictions plus the current entries and bytes."""
+        with self._lock:
+            stats = dict(self._db.execute('SELECT name, value FROM counters').fetchall())
+            stats['entries'], stats['bytes'] = self._db.execute(
+                'SELECT count(*), coalesce(sum(bytes), 0) FROM entries').fetchone()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def clear(self):
+        """Delete every entry and reset the counters."""
+        with self._lock, self._db:
+            for (name,) in self._db.execute('SELECT file FROM entries').fetchall():
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    pass
+            self._db.execute('DELETE FROM entries')
+            self._db.execute('UPDATE counters SET value = 0')
+
+
+_default = None
+
+
+def default_cache():
+    """The process-wide SharedCache over CACHE_DIR, opened on first use."""
+    global _default
+    if _default is None:
+        _default = SharedCache()
+    return _default
+
+
+if __name__ == '__main__':
+    store = default_cache()
+    if '--clear' in sys.argv[1:]:
+        store.clear()
+    stats = store.stats()
+    lookups = stats['hits'] + stats['misses']
+    print(f"{stats['entries']:,} entries, {stats['bytes'] / (1 << 20):.1f} / "
+          f"{stats['max_bytes'] / (1 << 20):.0f} MB")
+    print(f"hits {stats['hits']:,}  misses {stats['misses']:,}  evictions {stats['evictions']:,}  "
+          f"hit rate {stats['hits'] / lookups if lookups else 0:.1%}")
@@ -0,0 +1,188 @@
+"""Chart data layer: multi-resolution call rollups, point-budget decimation
+and a figure JSON cache.
+
+Call counts are pre-aggregated inside the crm.query DuckDB database into
+hour, day, week and month rollup tables (rebuilt whenever LeadCall is
+reloaded). A series request picks the finest rollup whose bucket count over
+the visible range stays within a few times the point budget, then
+downsamples to the budget with largest-triangle-three-buckets (LTTB), which
+keeps the peaks and dips a plain stride would drop. Requests filtered by
+agent, country or score aggregate lead_call directly at the chosen grain.
+
+Built figures are cached as Plotly JSON in the host-wide crm.cache, keyed
+on the data version, the source fingerprint and the chart parameters, so a
+repeat render from any worker skips both the aggregation and the figure
+build. Old figures age out through the cache's size-bounded LRU.
+
+    python -m crm.charts [data_dir]
+"""
+import json
+import sys
+import threading
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from crm import cache, ingest, query, trace
+
+GRAINS = query.GRAINS
+GRAIN_SECONDS = {'hour': 3600, 'day': 86_400, 'week': 7 * 86_400, 'month': 30 * 86_400}
+POINT_BUDGET = 400
+OVERSAMPLE = 4
+
+_rollup_lock = threading.Lock()
+
+
+# -------------------------------
+# ROLLUPS
+# -------------------------------
+def _source_fingerprint(con):
+    row = con.execute("SELECT fingerprint FROM _sources WHERE name = 'LeadCall'").fetchone()
+    return row[0] if row else ''
+
+
+def ensure_rollups(con):
+    """(Re)build the call_rollup_<grain> tables if LeadCall changed since.
+
+    Up-to-date rollups are detected with reads only, so this is safe on the
+    read-only connections workers share (see query.open_database).
+    """
+    with _rollup_lock:
+        fingerprint = _source_fingerprint(con)
+        try:
+            if con.execute('SELECT fingerprint FROM _rollups').fetchone() == (fingerprint,):
+                return False
+        except duckdb.CatalogException:
+            pass
+        con.execute('CREATE TABLE IF NOT EXISTS _rollups (fingerprint VARCHAR)')
+        con.execute("""
+            CREATE OR REPLACE TABLE call_rollup_hour AS
+            SELECT date_trunc('hour', c.CallDateTime) AS period,
+                   count(*) AS calls,
+                   count(*) FILTER (WHERE cs.StatusName_E = ?) AS connected
+            FROM lead_call c LEFT JOIN call_status cs USING (CallStatusId)
+            WHERE c.CallDateTime IS NOT NULL
+            GROUP BY period ORDER BY period
+        """, [ingest.CONNECTED_STATUS])
+        for grain in GRAINS[1:]:
+            con.execute(f"""
+                CREATE OR REPLACE TABLE call_rollup_{grain} AS
+                SELECT date_trunc('{grain}', period) AS period,
+                       sum(calls)::BIGINT AS calls, sum(connected)::BIGINT AS connected
+                FROM call_rollup_hour GROUP BY 1 ORDER BY 1
+            """)
+        con.execute('DELETE FROM _rollups')
+        con.execute('INSERT INTO _rollups VALUES (?)', [fingerprint])
+        return True
+
+
+def pick_grain(start, end, budget=POINT_BUDGET):
+    """Finest grain with at most budget * OVERSAMPLE buckets over [start, end)."""
+    seconds = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds(), 1)
+    for grain in GRAINS:
+        if seconds / GRAIN_SECONDS[grain] <= budget * OVERSAMPLE:
+            return grain
+    return GRAINS[-1]
+
+
+def lttb(x, y, threshold):
+    """Indices of the points largest-triangle-three-buckets keeps."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = [0]
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket).
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        ax, ay = x[keep[-1]], y[keep[-1]]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        keep.append(lo + int(area.argmax()))
+    keep.append(n - 1)
+    return np.asarray(keep)
+
+
+def call_series(con, filters=query.Filters(), budget=POINT_BUDGET):
+    """Calls / connected / success_rate per period for the visible range.
+
+    Returns (frame, grain); the frame has at most budget rows.
+    """
+    ensure_rollups(con)
+    start, end = filters.start, filters.end
+    if start is None or end is None:
+        low, high = con.execute('SELECT min(period), max(period) FROM call_rollup_hour').fetchone()
+        if low is None:
+            return pd.DataFrame(columns=['period', 'calls', 'connected', 'success_rate']), GRAINS[0]
+        start = start if start is not None else low
+        end = end if end is not None else pd.Timestamp(high) + pd.Timedelta(hours=1)
+    grain = pick_grain(start, end, budget)
+
+    if filters.agent_ids or filters.country_ids or filters.score_ids:
+        frame = query.call_activity(con, filters, grain)
+    else:
+        frame = con.execute(f"""
+            SELECT period, calls, connected, round(100.0 * connected / calls, 2) AS success_rate
+            FROM call_rollup_{grain}
+            WHERE period >= date_trunc(?, ?::TIMESTAMP) AND period < ? ORDER BY period
+        """, [grain, query._plain(pd.Timestamp(start)), query._plain(pd.Timestamp(end))]).df()
+    if len(frame) > budget:
+        x = pd.to_datetime(frame['period']).to_numpy(dtype='datetime64[s]').astype('int64')
+        frame = frame.iloc[lttb(x, frame['calls'].to_numpy(), budget)].reset_index(drop=True)
+    return frame, grain
+
+
+# -------------------------------
+# FIGURES
+# -------------------------------
+def call_volume_figure(frame, grain):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frame['period'], y=frame['calls'], name='Calls', mode='lines'))
+    fig.add_trace(go.Scatter(x=frame['period'], y=frame['connected'], name='Connected', mode='lines'))
+    fig.update_layout(title=f'Call Volume ({grain}ly)', hovermode='x unified',
+                      margin=dict(l=10, r=10, t=40, b=10), legend=dict(orientation='h'))
+    return fig
+
+
+def cached_figure(kind, params, version, build, store=None):
+    """Plotly figure dict for (kind, params, version), building it on a miss.
+
+    build() returns a plotly Figure; its JSON is stored in store (the
+    host-wide cache by default) so later calls from any session, process or
+    replica return the parsed dict without rebuilding.
+    """
+    key = 'figure:' + json.dumps([kind, version, params], sort_keys=True, default=str)
+
+    def encode():
+        trace.miss()
+        return build().to_json().encode()
+    with trace.span(f'figure {kind}', cached=True):
+        return json.loads((store or cache.default_cache()).blob(key, encode))
+
+
+def call_volume(con, filters=query.Filters(), version=0, budget=POINT_BUDGET):
+    """Cached call-volume figure dict for filters (see call_series)."""
+    params = {'filters': filters, 'budget': budget}
+    fingerprint = _source_fingerprint(con)
+
+    def build():
+        return call_volume_figure(*call_series(con, filters, budget))
+    return cached_figure('call_volume', params, [version, fingerprint], build)
+
+
+if __name__ == '__main__':
+    con = query.open_database(sys.argv[1] if len(sys.argv) > 1 else ingest.DATA_DIR)
+    started = time.perf_counter()
+    rebuilt = ensure_rollups(con)
+    print(f'rollups {"rebuilt" if rebuilt else "current"} in {time.perf_counter() - started:.3f}s')
+    for label, filters in (('all', query.Filters()), ('agent 1', query.Filters(agent_ids=(1,)))):
+        started = time.perf_counter()
+        frame, grain = call_series(con, filters)
+        print(f'{label}: {len(frame)} {grain} points in {(time.perf_counter() - started) * 1000:.1f} ms')
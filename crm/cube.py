@@ -0,0 +1,226 @@
+"""Rollup cube over leads and calls for country / city / score / status /
+agent / month slicing.
+
+The base cuboid groups every lead and every call by all six dimensions and
+sums the additive measures: leads, calls, connected calls and
+Revenue_Potential (revenue comes from crm.scoring). A lead is counted under
+its assigned agent and creation month; a call under the call's
+AssignedAgentId and CallDateTime month and its lead's country, city, score
+and status, so agent x month rollups agree with call_activity. Missing
+members (no agent, unknown lead, blank date) are kept under UNKNOWN, so every
+cuboid sums to the table totals. Each configured grouping in CUBOIDS is
+materialized by rolling up its smallest already-materialized superset, and
+slice() answers any grouping plus filters from the smallest materialized
+cuboid that contains every dimension it touches, so adding a dimension costs
+one more column in the base rather than new offline work.
+
+Cuboids are stored as Arrow IPC files under processed_data/.state/cube with
+a manifest of the source fingerprints; load() memory-maps them when the
+sources are unchanged and rebuilds otherwise.
+
+    python -m crm.cube [data_dir]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from crm import ingest, query, scoring, snapshots
+
+CUBE_DIR = os.path.join('processed_data', '.state', 'cube')
+DIMENSIONS = ['country', 'city', 'score', 'status', 'agent', 'month']
+MEASURES = ['leads', 'calls', 'connected', 'revenue']
+CUBOIDS = [
+    ('country', 'city', 'score', 'status'),
+    ('country', 'score', 'status', 'month'),
+    ('agent', 'status', 'month'),
+    ('country', 'agent'),
+    ('country',),
+    ('agent',),
+    ('month',),
+]
+UNKNOWN = 'Unknown'
+FORMAT = 2  # bump when base_cuboid's cells change meaning; stored cubes are rebuilt
+SOURCES = ['Lead', 'LeadCall', 'Schedule', 'Agent', 'Country', 'CityRegion',
+           'LeadScoring', 'LeadStatus', 'Sentiment', 'CallStatus']
+
+
+def _name(dims):
+    return '-'.join(dims) or 'total'
+
+
+def fingerprint(data_dir):
+    return {s: query._fingerprint(ingest._csv_path(data_dir, s)) for s in SOURCES}
+
+
+def _months(stamps):
+    """Months since year 0 (-1 for NaT), a cheap integer stand-in for 'YYYY-MM'."""
+    stamps = pd.DatetimeIndex(stamps)
+    return np.where(stamps.isna(), -1, stamps.year * 12 + stamps.month - 1)
+
+
+def _month_labels(months):
+    return np.array([f'{m // 12:04d}-{m % 12 + 1:02d}' if m >= 0 else UNKNOWN for m in range(-1, months.max() + 1)]
+                    if len(months) else [UNKNOWN], dtype=object)[months + 1]
+
+
+def _labels(values):
+    """Categorical dimension with missing members as UNKNOWN."""
+    values = pd.Categorical(values)
+    if UNKNOWN not in values.categories:
+        values = values.add_categories(UNKNOWN)
+    return values.fillna(UNKNOWN)
+
+
+def call_counts(data_dir, lead_index, connected_id, chunk_rows=ingest.CALL_CHUNK_ROWS):
+    """calls / connected per (lead position, AssignedAgentId, call month),
+    folded chunk by chunk; -1 marks an unknown lead, agent or month."""
+    totals = None
+    for chunk in ingest.iter_calls(data_dir, chunk_rows,
+                                   columns=['LeadId', 'AssignedAgentId', 'CallDateTime', 'CallStatusId']):
+        part = pd.DataFrame({
+            'pos': lead_index.get_indexer(chunk['LeadId']),
+            'agent_id': chunk['AssignedAgentId'].to_numpy(dtype='float64', na_value=np.nan),
+            'month': _months(chunk['CallDateTime']),
+            'calls': 1,
+            'connected': (chunk['CallStatusId'].to_numpy() == connected_id).astype('int64'),
+        })
+        part['agent_id'] = part['agent_id'].fillna(-1).astype('int64')
+        if totals is not None:
+            part = pd.concat([totals, part], ignore_index=True)
+        totals = part.groupby(['pos', 'agent_id', 'month'], sort=False)[['calls', 'connected']].sum().reset_index()
+    if totals is None:
+        totals = pd.DataFrame({c: pd.Series(dtype='int64') for c in ('pos', 'agent_id', 'month', 'calls', 'connected')})
+    return totals
+
+
+def base_cuboid(data_dir=ingest.DATA_DIR):
+    """All six dimensions with summed measures, one row per populated cell."""
+    tables = ingest.load_tables(data_dir)
+    features = scoring.build_features(data_dir, tables=tables)
+    scores = scoring.score_frame(features, scoring.load_bands(data_dir))
+    lead = tables['Lead']
+    labels = ingest.agent_labels(tables['Agent'])
+    lead_dims = pd.DataFrame({
+        'country': ingest.resolve(lead['CountryId'], tables['Country']),
+        'city': ingest.resolve(lead['CityRegionId'], tables['CityRegion']),
+        'score': ingest.resolve(lead['LeadScoringId'], tables['LeadScoring']),
+        'status': ingest.resolve(lead['LeadStatusId'], tables['LeadStatus']),
+    }).astype(object)
+    calls = call_counts(data_dir, pd.Index(lead['LeadId']), ingest.connected_status_id(tables))
+    pos = calls['pos'].to_numpy()
+    call_dims = lead_dims.reindex(pos)  # position -1 is not in the index: an unknown lead
+    lead_agent = lead['AssignedAgentId'].to_numpy(dtype='float64', na_value=np.nan)
+    agent = np.concatenate([labels.reindex(lead_agent).to_numpy(dtype=object),
+                            labels.reindex(calls['agent_id'].to_numpy()).to_numpy(dtype=object)])
+    months = np.concatenate([_months(lead['CreatedOn']), calls['month'].to_numpy()])
+    zeros = np.zeros(len(calls), dtype='int64')
+    facts = pd.DataFrame({
+        **{dim: _labels(np.concatenate([lead_dims[dim].to_numpy(), call_dims[dim].to_numpy()]))
+           for dim in lead_dims},
+        'agent': _labels(agent),
+        'month': _labels(_month_labels(months)),
+        'leads': np.concatenate([np.ones(len(lead), dtype='int64'), zeros]),
+        'calls': np.concatenate([np.zeros(len(lead), dtype='int64'), calls['calls'].to_numpy()]),
+        'connected': np.concatenate([np.zeros(len(lead), dtype='int64'), calls['connected'].to_numpy()]),
+        'revenue': np.concatenate([scores['Revenue_Potential'].to_numpy(dtype='float64'), zeros]),
+    })
+    return _rollup(facts, tuple(DIMENSIONS))
+
+
+def _rollup(frame, dims):
+    if not dims:
+        return pd.DataFrame({m: [frame[m].sum()] for m in MEASURES})
+    return frame.groupby(list(dims), observed=True, sort=False, dropna=False)[MEASURES].sum().reset_index()
+
+
+class Cube:
+    """Materialized cuboids keyed by their dimension tuple."""
+
+    def __init__(self, cuboids):
+        self.cuboids = cuboids
+
+    @classmethod
+    def build(cls, data_dir=ingest.DATA_DIR, groupings=CUBOIDS):
+        cube = cls({tuple(DIMENSIONS): base_cuboid(data_dir)})
+        for dims in sorted(groupings, key=len, reverse=True):
+            cube.materialize(dims)
+        return cube
+
+    def materialize(self, dims):
+        dims = tuple(dims)
+        if dims not in self.cuboids:
+            self.cuboids[dims] = _rollup(self.cuboids[self.source_for(dims)], dims)
+        return self.cuboids[dims]
+
+    def source_for(self, dims):
+        """Smallest materialized cuboid containing every dimension in dims."""
+        needed = set(dims)
+        candidates = [c for c in self.cuboids if needed <= set(c)]
+        return min(candidates, key=lambda c: len(self.cuboids[c]))
+
+    def slice(self, dims=(), where=None):
+        """Measures grouped by dims, restricted to where {dimension: values}."""
+        where = {d: v for d, v in (where or {}).items() if v}
+        unknown = (set(dims) | set(where)) - set(DIMENSIONS)
+        if unknown:
+            raise KeyError(f'unknown dimensions: {sorted(unknown)}')
+        frame = self.cuboids[self.source_for(set(dims) | set(where))]
+        for dim, values in where.items():
+            frame = frame[frame[dim].isin(values)]
+        result = _rollup(frame, tuple(dims))
+        return result.sort_values(MEASURES[0], ascending=False, ignore_index=True) if dims else result
+
+    def members(self, dim):
+        return sorted(self.cuboids[self.source_for((dim,))][dim].dropna().unique().tolist())
+
+    # -------------------------------
+    # PERSISTENCE
+    # -------------------------------
+    def save(self, cube_dir, sources):
+        os.makedirs(cube_dir, exist_ok=True)
+        for dims, frame in self.cuboids.items():
+            path = os.path.join(cube_dir, f'{_name(dims)}.arrow')
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            snapshots._atomic_write(path, snapshots._write_table(table))
+        manifest = json.dumps({'format': FORMAT, 'sources': sources, 'cuboids': [list(d) for d in self.cuboids]}).encode()
+        snapshots._atomic_write(os.path.join(cube_dir, 'manifest.json'), lambda f: f.write(manifest))
+
+    @classmethod
+    def load(cls, data_dir=ingest.DATA_DIR, cube_dir=CUBE_DIR, groupings=CUBOIDS):
+        """Stored cube if its sources are unchanged, else a fresh (saved) build."""
+        sources = fingerprint(data_dir)
+        try:
+            with open(os.path.join(cube_dir, 'manifest.json'), 'r') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = None
+        wanted = {tuple(DIMENSIONS)} | {tuple(g) for g in groupings}
+        if (manifest and manifest.get('format') == FORMAT and manifest['sources'] == sources
+                and wanted <= {tuple(d) for d in manifest['cuboids']}):
+            cuboids = {}
+            for dims in manifest['cuboids']:
+                source = pa.memory_map(os.path.join(cube_dir, f'{_name(dims)}.arrow'), 'r')
+                cuboids[tuple(dims)] = pa.ipc.open_file(source).read_all().to_pandas()
+            return cls(cuboids)
+        cube = cls.build(data_dir, groupings)
+        cube.save(cube_dir, sources)
+        return cube
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else ingest.DATA_DIR
+    started = time.perf_counter()
+    cube = Cube.build(data_dir)
+    print(f'built {len(cube.cuboids)} cuboids in {time.perf_counter() - started:.2f}s', file=sys.stderr)
+    for dims, frame in cube.cuboids.items():
+        print(f'{_name(dims):<40} {len(frame):>10,} rows')
+    for dims in (('country',), ('country', 'status'), ('agent', 'month'), ('city', 'agent')):
+        started = time.perf_counter()
+        result = cube.slice(dims)
+        print(f'slice {_name(dims):<22} from {_name(cube.source_for(dims)):<34} '
+              f'{len(result):>6} rows in {(time.perf_counter() - started) * 1000:.1f} ms')
@@ -0,0 +1,247 @@
+"""Headless export of the dashboard pages as static HTML and JSON bundles.
+
+Builds every page with the same prepare() the app runs, from one load of the
+data: the insight sections are read once from the snapshots, one DuckDB
+database is opened (attached read-only when another worker already built
+the shared file, see query.open_database) and, when data/ exists, one task
+scheduler is loaded. Each page is written as <page>.html, drawn with the
+dashboard stylesheet and a bundled plotly.min.js so the files open offline,
+and <page>.json, the same blocks with DataFrames in pandas 'split' layout.
+
+With --by agent or --by country, the drill-downs of the pages that define
+drilldown() (see sections) are also written for every agent or country, or
+only --ids, one directory per partition. Partitions render on a thread pool
+sharing that one load; each thread queries through its own DuckDB cursor,
+and DuckDB runs the queries outside the GIL. index.html links everything and
+index.json lists the files, the data version and any insight schema drift.
+
+    python -m crm.export reports/                          # the seven pages
+    python -m crm.export reports/ --by agent --workers 8   # + one directory per agent
+    python -m crm.export reports/ --by country --ids 1 4
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from crm import charts, model, query, scheduler, snapshots
+import sections
+from sections import common
+
+# partition kind -> (directory, Filters field, filter_options key)
+PARTITIONS = {
+    'agent': ('agents', 'agent_ids', 'agents'),
+    'country': ('countries', 'country_ids', 'countries'),
+}
+WORKERS = 4
+
+EXPORT_CSS = """
+body { font-family: sans-serif; max-width: 1200px; margin: 2rem auto; padding: 0 1rem; }
+.export-row { display: flex; gap: 1rem; margin: 1rem 0; }
+.export-row > div { flex: 1; min-width: 0; }
+.export-metric .label { font-size: 0.9rem; color: #555; }
+.export-metric .value { font-size: 1.8rem; font-weight: 600; }
+.export-metric .delta { font-size: 0.85rem; color: #059669; }
+.export-table { border-collapse: collapse; width: 100%; font-size: 0.9rem; }
+.export-table th, .export-table td { border-bottom: 1px solid #e5e7eb; padding: 0.3rem 0.6rem; text-align: left; }
+.export-footer { color: #6b7280; font-size: 0.8rem; margin-top: 2rem; }
+"""
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="{root}style.css"><style>{css}</style>
+<script src="{root}plotly.min.js"></script></head>
+<body>
+<p><a href="{root}index.html">← All reports</a></p>
+<h1 class="main-header">{header}</h1>
+{subtitle}{body}
+<p class="export-footer">Data version v{version} · exported {exported_at}</p>
+</body></html>
+"""
+
+
+# -------------------------------
+# DATA
+# -------------------------------
+def load_context():
+    """(sections.Context, DuckDB connection or None) over one load of the data
+    (no live call feed: exports show the published snapshot)"""
+    version = snapshots.read_version()['version']
+    loaded = {name: common.load_insight_section(name) for name in model.INSIGHTS}
+    try:
+        tasks = scheduler.TaskScheduler.from_data()
+    except Exception:
+        tasks = None
+    try:
+        con = query.open_database(shared=True, prepare=(charts.ensure_rollups,))
+    except Exception:
+        con = None
+    dashboard = common.read_dashboard_data()
+    return sections.Context(version, loaded.__getitem__, tasks=tasks, dashboard=dashboard.__getitem__), con
+
+
+def partitions(con, by, ids=None):
+    """[(id, label)] of the agents or countries to export (all when ids is None)"""
+    if con is None:
+        raise ValueError(f'--by {by} needs the data/ exports')
+    options = query.filter_options(con.cursor())[PARTITIONS[by][2]]
+    if ids is not None:
+        wanted = set(ids)
+        options = [(key, label) for key, label in options if key in wanted]
+    return options
+
+
+# -------------------------------
+# RENDERING
+# -------------------------------
+def block_json(block):
+    """block with its DataFrame (if any) as a JSON-ready dict"""
+    return {key: json.loads(value.to_json(orient='split', date_format='iso')) if isinstance(value, pd.DataFrame)
+            else value for key, value in block.items()}
+
+
+def _figure_html(figure, element_id):
+    payload = json.dumps({'data': figure.get('data', []), 'layout': figure.get('layout', {})}, default=str)
+    payload = payload.replace('</', '<\\/')
+    return (f'<div id="{element_id}"></div><script>(function(f){{Plotly.newPlot("{element_id}", f.data, f.layout, '
+            f'{{responsive: true}});}})({payload});</script>')
+
+
+def _bar_figure(frame):
+    return {'data': [{'type': 'bar', 'name': str(column), 'x': [str(i) for i in frame.index],
+                      'y': frame[column].tolist()} for column in frame.columns],
+            'layout': {'barmode': 'group', 'margin': {'l': 40, 'r': 10, 't': 10, 'b': 40}}}
+
+
+def block_html(block, element_id):
+    """HTML for one block, laid out like common.render_blocks"""
+    kind = block['type']
+    if kind == 'metrics':
+        return '<div class="export-row">' + ''.join(
+            '<div class="export-metric">'
+            f'<div class="label">{html.escape(str(item["label"]))}</div>'
+            f'<div class="value">{html.escape(str(item["value"]))}</div>'
+            + (f'<div class="delta">{html.escape(str(item["delta"]))}</div>' if item.get('delta') else '')
+            + '</div>' for item in block['items']) + '</div>'
+    if kind == 'cards':
+        return '<div class="export-row">' + ''.join(
+            '<div>' + ''.join(item if isinstance(item, list) else [item]) + '</div>' for item in block['items']) + '</div>'
+    if kind == 'html':
+        return block['html']
+    if kind == 'divider':
+        return '<hr>'
+    if kind == 'heading':
+        return f'<h4>{html.escape(block["text"])}</h4>'
+    if kind == 'table':
+        title = f'<h4>{html.escape(block["title"])}</h4>' if block.get('title') else ''
+        return title + block['data'].to_html(index=not block.get('hide_index'), border=0, classes='export-table')
+    if kind == 'bar':
+        return _figure_html(_bar_figure(block['data']), element_id)
+    if kind == 'figure':
+        return _figure_html(block['figure'], element_id)
+    raise ValueError(f'unknown block type {kind!r}')
+
+
+def write_page(out_dir, name, header, blocks, version, root='', subtitle=None):
+    """Write <name>.html and <name>.json under out_dir; returns both paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    exported_at = datetime.now().isoformat(timespec='seconds')
+    body = '\n'.join(block_html(block, f'{name}-{i}') for i, block in enumerate(blocks))
+    html_path = os.path.join(out_dir, f'{name}.html')
+    with open(html_path, 'w') as f:
+        f.write(PAGE_HTML.format(
+            title=html.escape(f'{header} · {subtitle}' if subtitle else header), root=root, css=EXPORT_CSS,
+            header=html.escape(header), subtitle=f'<h2>{html.escape(subtitle)}</h2>\n' if subtitle else '',
+            body=body, version=version, exported_at=exported_at))
+    json_path = os.path.join(out_dir, f'{name}.json')
+    with open(json_path, 'w') as f:
+        json.dump({'page': name, 'header': header, 'partition': subtitle, 'version': version,
+                   'exported_at': exported_at, 'blocks': [block_json(b) for b in blocks]}, f, default=str)
+    return [html_path, json_path]
+
+
+def _write_index(out_dir, ctx, pages, exported, by):
+    links = [f'<li><a href="{name}.html">{html.escape(label)}</a></li>' for label, name in pages]
+    for (key, label), paths in exported:
+        if paths:
+            links.append(f'<li>{html.escape(label)}: ' + ', '.join(
+                f'<a href="{os.path.relpath(p, out_dir)}">{html.escape(os.path.basename(p)[:-5])}</a>'
+                for p in paths if p.endswith('.html')) + '</li>')
+    drift = ''.join(f'<li><code>{html.escape(d)}</code></li>' for d in ctx.drift)
+    body = '<ul>' + ''.join(links) + '</ul>'
+    if drift:
+        body += '<h4>⚠️ Insight data that did not match the schema (shown as empty)</h4><ul>' + drift + '</ul>'
+    with open(os.path.join(out_dir, 'index.html'), 'w') as f:
+        f.write(PAGE_HTML.format(title='CRM Dashboard Reports', root='', css=EXPORT_CSS,
+                                 header='CRM Dashboard Reports', subtitle='', body=body, version=ctx.version,
+                                 exported_at=datetime.now().isoformat(timespec='seconds')))
+    with open(os.path.join(out_dir, 'index.json'), 'w') as f:
+        json.dump({'version': ctx.version, 'by': by, 'pages': [name for _, name in pages],
+                   'partitions': {str(key): {'label': label, 'files': [os.path.relpath(p, out_dir) for p in paths]}
+                                  for (key, label), paths in exported},
+                   'drift': ctx.drift}, f, indent=2)
+
+
+# -------------------------------
+# EXPORT
+# -------------------------------
+def export_partition(ctx, con, by, key, label, out_dir):
+    """Write the drill-downs of one agent / country; returns the paths"""
+    directory, field, _ = PARTITIONS[by]
+    cursor = con.cursor()
+    filters = query.Filters(**{field: (key,)})
+    written = []
+    for name in sections.PAGES.values():
+        page = sections.load(name)
+        if not hasattr(page, 'drilldown'):
+            continue
+        blocks = page.drilldown(ctx, cursor, filters)
+        if blocks:
+            written += write_page(os.path.join(out_dir, directory, str(key)), name, page.DRILLDOWN, blocks,
+                                  ctx.version, root='../../', subtitle=label)
+    return written
+
+
+def export(out_dir, by=None, ids=None, workers=WORKERS):
+    """Write every page (and, with by, every partition's drill-downs) to out_dir; returns the paths"""
+    import plotly.offline
+
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copyfile(common.STYLE_PATH, os.path.join(out_dir, 'style.css'))
+    with open(os.path.join(out_dir, 'plotly.min.js'), 'w') as f:
+        f.write(plotly.offline.get_plotlyjs())
+    ctx, con = load_context()
+    written, pages = [], list(sections.PAGES.items())
+    for label, name in pages:
+        page = sections.load(name)
+        written += write_page(out_dir, name, page.HEADER, page.prepare(ctx), ctx.version)
+    exported = []
+    if by:
+        keys = partitions(con, by, ids)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = pool.map(lambda item: export_partition(ctx, con, by, item[0], item[1], out_dir), keys)
+            exported = list(zip(keys, results))
+        for _, paths in exported:
+            written += paths
+    _write_index(out_dir, ctx, pages, exported, by)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the dashboard pages as static HTML / JSON')
+    parser.add_argument('out_dir')
+    parser.add_argument('--by', choices=sorted(PARTITIONS), help='also export drill-downs per agent or country')
+    parser.add_argument('--ids', type=int, nargs='+', help='only these agent / country ids')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='partition threads')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    try:
+        paths = export(args.out_dir, args.by, args.ids, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f'{len(paths)} files written to {args.out_dir} in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,263 @@
+"""Incremental, append-only maintenance of the call and task aggregates.
+
+LeadCall.csv and Schedule.csv only ever grow at the end, so instead of
+re-reading the full history on every refresh we persist, per table, the byte
+offset we have consumed up to plus an id/CreatedOn watermark, and fold only
+the rows past it into running state: call totals, per-hour and per-day
+buckets, and the set of still-upcoming tasks. A refresh after a 10k-row
+delta parses those 10k rows and nothing else.
+
+If a source shrinks or its header changes (a re-export rather than an
+append), its state is discarded and rebuilt from the start of the file.
+
+    python -m crm.incremental [data_dir]
+"""
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from crm import ingest
+
+STATE_PATH = os.path.join('processed_data', '.state', 'aggregates.json')
+READ_BLOCK_BYTES = 64 << 20
+UPCOMING_TASKS = 5
+
+CALL_COLUMNS = {
+    'LeadCallId': 'int32', 'CallDateTime': None, 'CallStatusId': 'int8', 'CreatedOn': None,
+}
+TASK_COLUMNS = {
+    'ScheduleId': 'int32', 'LeadId': 'int32', 'ScheduleTitle': 'string',
+    'ScheduledDate': None, 'TaskStatusId': 'Int8', 'AssignedAgentId': 'int32', 'CreatedOn': None,
+}
+# Bumped whenever the persisted state layout changes; older state is rebuilt.
+STATE_FORMAT = 2
+
+
+class SourceChanged(ValueError):
+    """The source was re-exported (shrank or changed header), not appended to."""
+
+
+def _empty_state(data_dir=None):
+    return {
+        'format': STATE_FORMAT,
+        'data_dir': data_dir,
+        'calls': {
+            'offset': 0, 'header': None, 'last_id': 0, 'last_created_on': None,
+            'total': 0, 'connected': 0,
+            'hour_total': [0] * 24, 'hour_connected': [0] * 24,
+            'by_date': {},
+        },
+        'tasks': {
+            'offset': 0, 'header': None, 'last_id': 0, 'last_created_on': None,
+            'pending': [],
+        },
+    }
+
+
+def _records_end(buffer):
+    """Length of the complete CSV records at the start of buffer: up to the
+    last newline outside a quoted field (0 when there is none)."""
+    if b'"' not in buffer:
+        return buffer.rfind(b'\n') + 1
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    # Doubled quotes toggle twice, so parity alone tells quoted bytes apart.
+    quoted = np.bitwise_xor.accumulate((data == ord('"')).view(np.uint8))
+    ends = np.flatnonzero((data == ord('\n')) & (quoted == 0))
+    return int(ends[-1]) + 1 if len(ends) else 0
+
+
+def read_appended(path, offset, header, columns):
+    """Yield DataFrames for the complete records of path past byte offset.
+
+    Returns through StopIteration.value the (new_offset, header) pair; a
+    trailing record without its newline (a writer mid-append) is left for
+    the next refresh, and a quoted field may span lines. Reads in bounded blocks so a large backlog never has to
+    fit in memory at once. Raises SourceChanged when path was re-exported
+    rather than appended to.
+    """
+    with open(path, 'rb') as f:
+        first = f.readline()
+        current = first.decode().strip()
+        if header is not None and current != header:
+            raise SourceChanged(f'{path}: header changed')
+        offset = max(offset, len(first))
+        size = os.fstat(f.fileno()).st_size
+        if size < offset:
+            raise SourceChanged(f'{path}: file shrank')
+        f.seek(offset)
+        names = current.split(',')
+        dtypes = {c: t for c, t in columns.items() if t is not None}
+        dates = [c for c, t in columns.items() if t is None]
+        position, buffer = offset, b''
+        while position < size:
+            block = f.read(min(READ_BLOCK_BYTES, size - position))
+            position += len(block)
+            buffer += block
+            end = _records_end(buffer)
+            if end == 0:
+                continue
+            offset += end
+            yield pd.read_csv(io.BytesIO(buffer[:end]), header=None, names=names,
+                              usecols=list(columns), dtype=dtypes, parse_dates=dates)
+            buffer = buffer[end:]
+    return offset, current
+
+
+def _consume(path, table_state, columns, fold, updates=False):
+    """Run fold over every new row batch and advance table_state's watermark.
+
+    Rows at or below the id watermark are skipped unless updates is set
+    (a Schedule row for a known ScheduleId updates that task).
+    """
+    reader = read_appended(path, table_state['offset'], table_state['header'], columns)
+    id_col = next(iter(columns))
+    new_rows = 0
+    while True:
+        try:
+            batch = next(reader)
+        except StopIteration as done:
+            table_state['offset'], table_state['header'] = done.value
+            return new_rows
+        if not updates:
+            batch = batch[batch[id_col] > table_state['last_id']]
+        if batch.empty:
+            continue
+        fold(batch)
+        new_rows += len(batch)
+        table_state['last_id'] = max(table_state['last_id'], int(batch[id_col].max()))
+        table_state['last_created_on'] = str(batch['CreatedOn'].max())
+
+
+class IncrementalAggregator:
+    """Persisted running call/task aggregates over append-only sources."""
+
+    def __init__(self, data_dir=ingest.DATA_DIR, state_path=STATE_PATH):
+        self.data_dir = data_dir
+        self.state_path = state_path
+        self.state = self._load()
+        ids, names = ingest.read_lookup(data_dir, 'CallStatus')
+        self.connected_id = int(ids[list(names).index(ingest.CONNECTED_STATUS)])
+
+    def _load(self):
+        source = os.path.abspath(self.data_dir)
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = None
+        # State built from a different export directory cannot be extended.
+        if not state or state.get('data_dir') != source or state.get('format') != STATE_FORMAT:
+            state = _empty_state(source)
+        return state
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def _fold_calls(self, calls):
+        state = self.state['calls']
+        hours = calls['CallDateTime'].dt.hour.to_numpy()
+        connected = calls['CallStatusId'].to_numpy() == self.connected_id
+        state['total'] += len(calls)
+        state['connected'] += int(connected.sum())
+        state['hour_total'] = (np.asarray(state['hour_total'])
+                               + np.bincount(hours, minlength=24)).tolist()
+        state['hour_connected'] = (np.asarray(state['hour_connected'])
+                                   + np.bincount(hours[connected], minlength=24)).tolist()
+        by_date = state['by_date']
+        for day, count in calls['CallDateTime'].dt.strftime('%Y-%m-%d').value_counts().items():
+            by_date[day] = by_date.get(day, 0) + int(count)
+
+    def _fold_tasks(self, tasks, now):
+        # A row replaces any earlier entry for its ScheduleId; closed tasks
+        # are dropped as crm.scheduler drops them.
+        updated = set(tasks['ScheduleId'].tolist())
+        pending = [t for t in self.state['tasks']['pending'] if t['schedule_id'] not in updated]
+        tasks = ingest.open_tasks(tasks)
+        upcoming = tasks[tasks['ScheduledDate'] >= now]
+        self.state['tasks']['pending'] = pending
+        pending.extend(
+            {
+                'schedule_id': int(row.ScheduleId),
+                'lead_id': int(row.LeadId),
+                'title': str(row.ScheduleTitle),
+                'scheduled_date': row.ScheduledDate.strftime('%Y-%m-%d %H:%M:%S'),
+                'agent_id': int(row.AssignedAgentId),
+            }
+            for row in upcoming.itertuples(index=False)
+        )
+
+    def _refresh_table(self, name, table, columns, fold, updates=False):
+        path = ingest._csv_path(self.data_dir, table)
+        try:
+            return _consume(path, self.state[name], columns, fold, updates)
+        except SourceChanged:
+            # Not an append: rebuild this table's state from scratch. Parse
+            # errors in appended rows propagate instead of wiping the state.
+            self.state[name] = _empty_state()[name]
+            return _consume(path, self.state[name], columns, fold, updates)
+
+    def refresh(self, now=None):
+        """Fold rows appended since the last refresh; returns new-row counts."""
+        now = pd.Timestamp(now or datetime.now())
+        new_calls = self._refresh_table('calls', 'LeadCall', CALL_COLUMNS, self._fold_calls)
+        new_tasks = self._refresh_table('tasks', 'Schedule', TASK_COLUMNS,
+                                        lambda batch: self._fold_tasks(batch, now), updates=True)
+        cutoff = now.strftime('%Y-%m-%d %H:%M:%S')
+        self.state['tasks']['pending'] = sorted(
+            (t for t in self.state['tasks']['pending'] if t['scheduled_date'] >= cutoff),
+            key=lambda t: t['scheduled_date'],
+        )
+        self.save()
+        return {'new_calls': new_calls, 'new_tasks': new_tasks}
+
+    def accumulator(self):
+        """The call totals as an ingest.CallAccumulator, for build_dashboard_model."""
+        calls = self.state['calls']
+        accumulator = ingest.CallAccumulator(self.connected_id)
+        accumulator.total = calls['total']
+        accumulator.connected = calls['connected']
+        accumulator.hour_total = np.array(calls['hour_total'], dtype=np.int64)
+        accumulator.hour_connected = np.array(calls['hour_connected'], dtype=np.int64)
+        return accumulator
+
+    def sections(self, now=None, days=None):
+        """Current values for the dashboard_data.json call/task sections."""
+        now = pd.Timestamp(now or datetime.now()).normalize()
+        calls = self.state['calls']
+        dates = sorted(calls['by_date'])
+        if days:
+            dates = dates[-days:]
+        hourly = [
+            {'hour': hour, 'total_calls': total, 'success_rate': round(connected / total * 100, 2)}
+            for hour, (total, connected) in enumerate(zip(calls['hour_total'], calls['hour_connected']))
+            if total
+        ]
+        upcoming = []
+        for task in self.state['tasks']['pending'][:UPCOMING_TASKS]:
+            due = pd.Timestamp(task['scheduled_date']).normalize()
+            upcoming.append({k: v for k, v in task.items() if k != 'schedule_id'} | {'days_until': int((due - now).days)})
+        return {
+            'executive_summary': {
+                'total_calls': calls['total'],
+                'connected_calls': calls['connected'],
+                'success_rate': round(calls['connected'] / calls['total'] * 100, 1) if calls['total'] else 0.0,
+            },
+            'call_activity': [{'date': d, 'calls': calls['by_date'][d]} for d in dates],
+            'hourly_success': hourly,
+            'upcoming_tasks': upcoming,
+        }
+
+
+if __name__ == '__main__':
+    aggregator = IncrementalAggregator(sys.argv[1] if len(sys.argv) > 1 else ingest.DATA_DIR)
+    print(json.dumps(aggregator.refresh()), file=sys.stderr)
+    print(json.dumps(aggregator.sections(), indent=2))
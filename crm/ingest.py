@@ -0,0 +1,357 @@
+"""Columnar ingestion of the raw CRM exports in data/.
+
+Builds the dashboard_data.json structures (executive_summary, lead_status,
+geographic, agent_performance, hourly_success) directly from the CSV tables.
+Every table is read with explicit compact dtypes and only the columns the
+dashboard needs; LeadCall, the only table that grows into the millions, is
+streamed in chunks and folded into fixed-size accumulators so peak memory is
+bounded by the chunk size rather than the call history.
+
+    python -m crm.ingest [data_dir]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = 'data'
+SCORES_PATH = 'processed_data/enhanced_lead_data.csv'
+CALL_CHUNK_ROWS = 500_000
+
+HIGH_RISK_THRESHOLD = 70
+CONNECTED_STATUS = 'Connected'
+WON_STATUS = 'Won'
+HOT_SCORE = 'HOT'
+# TaskStatusId values that mark a Schedule task done. The export has no
+# TaskStatus lookup table, so these are configuration: 4 (Completed) and
+# 5 (Cancelled) in the CRM's status order Pending, In Progress, Scheduled,
+# Completed, Cancelled. CRM_CLOSED_TASK_STATUSES="4,5" overrides them.
+CLOSED_TASK_STATUSES = tuple(int(s) for s in os.environ.get('CRM_CLOSED_TASK_STATUSES', '4,5').split(',')
+                             if s.strip())
+
+# -------------------------------
+# TABLE SCHEMAS
+# -------------------------------
+# Only the columns listed here are read. IDs are int32, small enumerations
+# int8, *_E display names categorical, timestamps parsed. Nullable foreign
+# keys (blank in the export when a call never connected) use Int32.
+LOOKUP_TABLES = {
+    'LeadStatus': ('LeadStatusId', 'StatusName_E'),
+    'LeadStage': ('LeadStageId', 'StageName_E'),
+    'LeadScoring': ('LeadScoringId', 'ScoreName_E'),
+    'CallStatus': ('CallStatusId', 'StatusName_E'),
+    'Sentiment': ('SentimentId', 'SentimentName_E'),
+    'Country': ('CountryId', 'CountryName_E'),
+    'CityRegion': ('CityRegionId', 'CityName_E'),
+    'TaskType': ('TaskTypeId', 'TypeName_E'),
+}
+
+TABLE_DTYPES = {
+    'Lead': {
+        'LeadId': 'int32', 'LeadStageId': 'int8', 'LeadStatusId': 'int8',
+        'LeadScoringId': 'int8', 'CountryId': 'int32', 'CityRegionId': 'int32',
+        'AssignedAgentId': 'int32',
+    },
+    'LeadCall': {
+        'LeadCallId': 'int32', 'LeadId': 'int32', 'DurationSeconds': 'int32',
+        'CallStatusId': 'int8', 'SentimentId': 'Int32', 'AssignedAgentId': 'int32',
+    },
+    'Schedule': {
+        'ScheduleId': 'int32', 'LeadId': 'int32', 'TaskTypeId': 'int8',
+        'ScheduleTitle': 'category', 'TaskStatusId': 'Int8',
+        'AssignedAgentId': 'int32', 'IsFollowUp': 'int8',
+    },
+    'Agent': {
+        'AgentId': 'int32', 'FirstName': 'string', 'LastName': 'string',
+        'Role': 'category', 'CountryId': 'int32', 'CityRegionId': 'int32',
+        'IsActive': 'int8',
+    },
+}
+
+TABLE_DATES = {
+    'Lead': ['CreatedOn'],
+    'LeadCall': ['CallDateTime'],
+    'Schedule': ['ScheduledDate'],
+    'Agent': [],
+}
+
+
+def _csv_path(data_dir, table):
+    return os.path.join(data_dir, f'{table}.csv')
+
+
+def read_table(data_dir, table, columns=None, **kwargs):
+    """Read one raw table with its declared dtypes and date columns.
+
+    columns narrows the read to a subset of the declared columns.
+    """
+    dtypes = TABLE_DTYPES[table]
+    dates = TABLE_DATES[table]
+    if columns is not None:
+        dtypes = {c: t for c, t in dtypes.items() if c in columns}
+        dates = [c for c in dates if c in columns]
+    return pd.read_csv(
+        _csv_path(data_dir, table),
+        usecols=list(dtypes) + dates,
+        dtype=dtypes,
+        parse_dates=dates,
+        **kwargs
+    )
+
+
+def read_lookup(data_dir, table):
+    """Read a lookup table as an id-sorted (ids, categorical names) pair."""
+    id_col, name_col = LOOKUP_TABLES[table]
+    df = pd.read_csv(_csv_path(data_dir, table), usecols=[id_col, name_col],
+                     dtype={id_col: 'int32', name_col: 'string'})
+    df = df.sort_values(id_col)
+    return df[id_col].to_numpy(), pd.Categorical(df[name_col].to_numpy(dtype=object))
+
+
+def resolve(ids, lookup):
+    """Vectorized foreign-key join: map an id column onto lookup names.
+
+    Uses a sorted-id search instead of a merge, so the result is a categorical
+    sharing the lookup's categories and costs one small code per row. Unknown
+    or missing ids resolve to NaN.
+    """
+    lookup_ids, names = lookup
+    ids = pd.array(ids, dtype='Int32')
+    valid = ~ids.isna()
+    values = ids.to_numpy(dtype='int64', na_value=-1)
+    pos = np.searchsorted(lookup_ids, values).clip(0, len(lookup_ids) - 1)
+    found = valid & (lookup_ids[pos] == values)
+    codes = np.where(found, names.codes[pos], -1)
+    return pd.Categorical.from_codes(codes, categories=names.categories)
+
+
+def load_tables(data_dir=DATA_DIR):
+    """Load Lead, Schedule, Agent and every lookup table into memory.
+
+    LeadCall is deliberately absent: it is streamed by iter_calls().
+    """
+    tables = {name: read_table(data_dir, name) for name in ('Lead', 'Schedule', 'Agent')}
+    for name in LOOKUP_TABLES:
+        tables[name] = read_lookup(data_dir, name)
+    return tables
+
+
+def iter_calls(data_dir=DATA_DIR, chunk_rows=CALL_CHUNK_ROWS, columns=None):
+    """Stream LeadCall in fixed-size chunks."""
+    return read_table(data_dir, 'LeadCall', columns, chunksize=chunk_rows)
+
+
+def load_lead_scores(path=SCORES_PATH):
+    """Per-lead Revenue_Potential and Churn_Risk produced by the scoring model."""
+    if not path or not os.path.exists(path):
+        return None
+    return pd.read_csv(path, usecols=['LeadId', 'Revenue_Potential', 'Churn_Risk'],
+                       dtype={'LeadId': 'int32', 'Revenue_Potential': 'float64',
+                              'Churn_Risk': 'float32'})
+
+
+def enrich_leads(tables, scores=None):
+    """Resolve Lead foreign keys and attach model scores, all column-wise."""
+    lead = tables['Lead']
+    leads = pd.DataFrame({
+        'LeadId': lead['LeadId'],
+        'AssignedAgentId': lead['AssignedAgentId'],
+        'StatusName_E': resolve(lead['LeadStatusId'], tables['LeadStatus']),
+        'StageName_E': resolve(lead['LeadStageId'], tables['LeadStage']),
+        'ScoreName_E': resolve(lead['LeadScoringId'], tables['LeadScoring']),
+        'CountryName_E': resolve(lead['CountryId'], tables['Country']),
+        'CityName_E': resolve(lead['CityRegionId'], tables['CityRegion']),
+        'CreatedOn': lead['CreatedOn'],
+    })
+    if scores is None:
+        leads['Revenue_Potential'] = 0.0
+        leads['Churn_Risk'] = np.float32(np.nan)
+    else:
+        scores = scores.set_index('LeadId')
+        leads['Revenue_Potential'] = scores['Revenue_Potential'].reindex(leads['LeadId']).fillna(0).to_numpy()
+        leads['Churn_Risk'] = scores['Churn_Risk'].reindex(leads['LeadId']).to_numpy()
+    return leads
+
+
+def open_tasks(schedule, closed_statuses=CLOSED_TASK_STATUSES):
+    """Schedule rows still open: the last row per ScheduleId (a later row
+    updates the task) when its status is not closed and it has a date."""
+    schedule = schedule.drop_duplicates('ScheduleId', keep='last')
+    return schedule[~schedule['TaskStatusId'].isin(closed_statuses) & schedule['ScheduledDate'].notna()]
+
+
+def agent_names(agent):
+    """AgentId -> 'First Last' display name."""
+    return pd.Series((agent['FirstName'] + ' ' + agent['LastName']).to_numpy(),
+                     index=agent['AgentId'].to_numpy())
+
+
+def agent_labels(agent):
+    """AgentId -> unique label: the display name, suffixed with ' (#id)' when
+    agents share it. Keys agent_performance and the cube's agent dimension."""
+    names = agent_names(agent)
+    shared = names.duplicated(keep=False).to_numpy()
+    return pd.Series([f'{name} (#{i})' if dup else str(name) for i, name, dup in zip(names.index, names, shared)],
+                     index=names.index)
+
+
+# -------------------------------
+# CALL AGGREGATION
+# -------------------------------
+class CallAccumulator:
+    """Fixed-size running totals over any number of LeadCall chunks."""
+
+    columns = ['CallDateTime', 'CallStatusId']
+
+    def __init__(self, connected_id):
+        self.connected_id = connected_id
+        self.total = 0
+        self.connected = 0
+        self.hour_total = np.zeros(24, dtype=np.int64)
+        self.hour_connected = np.zeros(24, dtype=np.int64)
+
+    def add(self, calls):
+        hours = calls['CallDateTime'].dt.hour.to_numpy()
+        connected = calls['CallStatusId'].to_numpy() == self.connected_id
+        self.total += len(calls)
+        self.connected += int(connected.sum())
+        self.hour_total += np.bincount(hours, minlength=24)
+        self.hour_connected += np.bincount(hours[connected], minlength=24)
+
+    def hourly_success(self):
+        rows = []
+        for hour in np.flatnonzero(self.hour_total):
+            total = int(self.hour_total[hour])
+            rows.append({
+                'hour': int(hour),
+                'total_calls': total,
+                'success_rate': round(self.hour_connected[hour] / total * 100, 2),
+            })
+        return rows
+
+
+def connected_status_id(tables):
+    ids, names = tables['CallStatus']
+    return int(ids[list(names).index(CONNECTED_STATUS)])
+
+
+# -------------------------------
+# DASHBOARD MODEL
+# -------------------------------
+def summarize(leads, agent, calls):
+    """Assemble the dashboard sections from enriched leads and call totals."""
+    total_leads = len(leads)
+    won = leads['StatusName_E'] == WON_STATUS
+    hot = leads['ScoreName_E'] == HOT_SCORE
+
+    lead_status = leads['StatusName_E'].value_counts()
+    lead_status = {str(k): int(v) for k, v in lead_status[lead_status > 0].items()}
+
+    geo = leads.groupby('CountryName_E', observed=True).agg(
+        LeadId=('LeadId', 'size'),
+        Revenue_Potential=('Revenue_Potential', 'sum'),
+        Churn_Risk=('Churn_Risk', 'mean'),
+    ).sort_values('LeadId', ascending=False)
+    geographic = {}
+    for country, row in geo.iterrows():
+        stats = {'LeadId': int(row.LeadId), 'Revenue_Potential': int(row.Revenue_Potential)}
+        if pd.notna(row.Churn_Risk):  # unscored leads: no churn estimate, not NaN
+            stats['Churn_Risk'] = round(float(row.Churn_Risk), 2)
+        geographic[str(country)] = stats
+
+    per_agent = pd.DataFrame({
+        'total_leads': leads.groupby('AssignedAgentId').size(),
+        'hot_leads': hot.groupby(leads['AssignedAgentId']).sum(),
+        'won_leads': won.groupby(leads['AssignedAgentId']).sum(),
+    })
+    names = agent_labels(agent)
+    roles = pd.Series(agent['Role'].to_numpy(), index=agent['AgentId'].to_numpy())
+    agent_performance = {}
+    for agent_id, row in per_agent.iterrows():
+        if agent_id not in names.index:
+            continue
+        agent_performance[names[agent_id]] = {
+            'role': str(roles[agent_id]),
+            'total_leads': int(row.total_leads),
+            'hot_leads': int(row.hot_leads),
+            'won_leads': int(row.won_leads),
+            'win_rate': round(row.won_leads / row.total_leads * 100, 2),
+        }
+
+    churn = leads['Churn_Risk']
+    executive_summary = {
+        'total_leads': total_leads,
+        'total_calls': calls.total,
+        'connected_calls': calls.connected,
+        'success_rate': round(calls.connected / calls.total * 100, 1) if calls.total else 0.0,
+        'total_revenue_potential': int(leads['Revenue_Potential'].sum()),
+        'high_risk_leads': int((churn >= HIGH_RISK_THRESHOLD).sum()),
+        'conversion_rate': round(won.sum() / total_leads * 100, 1) if total_leads else 0.0,
+        'agents_count': int(agent['IsActive'].sum()),
+        'countries_coverage': int(leads['CountryName_E'].nunique()),
+        'avg_churn_risk': round(float(churn.mean()), 1) if churn.notna().any() else 0.0,
+    }
+
+    return {
+        'executive_summary': executive_summary,
+        'lead_status': lead_status,
+        'geographic': geographic,
+        'agent_performance': agent_performance,
+        'hourly_success': calls.hourly_success(),
+    }
+
+
+def build_dashboard_model(data_dir=DATA_DIR, scores_path=SCORES_PATH, chunk_rows=CALL_CHUNK_ROWS,
+                          trace_memory=True, calls=None, scores=None):
+    """Build the dashboard sections from data/*.csv in a single pass.
+
+    calls, a CallAccumulator already holding the LeadCall totals (e.g. from
+    crm.incremental), skips the LeadCall scan. scores, per-lead
+    Revenue_Potential and Churn_Risk (e.g. crm.scoring.score_leads), is used
+    instead of reading scores_path. Returns (model, stats) where
+    stats carries the wall time, row counts and the tracemalloc peak in MB
+    for the whole build. Tracing roughly doubles the build time; pass
+    trace_memory=False when timing.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if trace_memory and not already_tracing:
+        tracemalloc.start()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    peak = None
+    try:
+        tables = load_tables(data_dir)
+        leads = enrich_leads(tables, load_lead_scores(scores_path) if scores is None else scores)
+        if calls is None:
+            calls = CallAccumulator(connected_status_id(tables))
+            for chunk in iter_calls(data_dir, chunk_rows, CallAccumulator.columns):
+                calls.add(chunk)
+        model = summarize(leads, tables['Agent'], calls)
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if trace_memory and not already_tracing:
+            tracemalloc.stop()
+    stats = {
+        'seconds': round(time.perf_counter() - started, 3),
+        'peak_memory_mb': None if peak is None else round(peak / 1024 ** 2, 2),
+        'lead_rows': len(leads),
+        'call_rows': calls.total,
+        'call_chunk_rows': chunk_rows,
+    }
+    return model, stats
+
+
+if __name__ == '__main__':
+    from crm import scoring  # scoring imports this module
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    # Revenue and churn from the crm.scoring model, as crm.refresh and
+    # crm.cube use, not the legacy enhanced_lead_data.csv.
+    model, stats = build_dashboard_model(data_dir, scores=scoring.score_leads(data_dir))
+    print(json.dumps(model, indent=2))
+    print(json.dumps(stats), file=sys.stderr)
@@ -0,0 +1,624 @@
+"""Parallel insight engine for comprehensive_ai_insights.json.
+
+Each top-level section of the insights document has one registered producer
+that declares the input tables and columns it reads and the sections it
+depends on. run() prepares the inputs once from data/, writes them as Arrow
+IPC files (LeadCall is parsed once and streamed to its file chunk by chunk;
+the scoring features are read back from it), and executes the dependency
+graph on a process pool: every
+producer whose dependencies are done is submitted immediately, and workers
+memory-map only the columns they declared, so the large tables are shared
+through the page cache rather than pickled to each process.
+
+    python -m crm.insights [--data-dir data] [--workers N] [--out FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from crm import availability, ingest, scheduler, scoring
+
+SECTION_ORDER = [
+    'executive_summary', 'lead_status', 'call_activity', 'tasks_followup',
+    'agent_availability', 'conversion', 'geographic', 'meta_insights',
+]
+
+OPEN_STAGES = ('New', 'Qualified', 'Nurtured')
+CLOSED_STATUSES = ('Won', 'Lost', 'Not Interested')
+HIGH_VALUE_REVENUE = 60_000
+HIGH_PROBABILITY, MEDIUM_PROBABILITY = 0.7, 0.4
+TREND_DAYS = 30
+MIN_WINDOW_CALLS = 3
+UNDERUTILIZED, OVERUTILIZED, BURNOUT = 0.6, 0.9, 0.95
+TRAINING_AREAS = ['Sales_Skills', 'Product_Knowledge', 'CRM_Proficiency']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+SENTIMENT_SCORES = {'Positive': 1.0, 'Neutral': 0.0, 'Negative': -1.0}
+
+PRODUCERS = {}
+
+
+def producer(section, inputs, depends=()):
+    """Register fn(tables, deps, context) -> dict as the producer of section.
+
+    inputs maps input table name -> list of columns the producer reads.
+    """
+    def register(fn):
+        PRODUCERS[section] = {'fn': fn, 'inputs': inputs, 'depends': tuple(depends)}
+        return fn
+    return register
+
+
+# -------------------------------
+# INPUTS
+# -------------------------------
+CALL_INPUT_COLUMNS = ['LeadCallId', 'LeadId', 'CallDateTime', 'DurationSeconds', 'CallStatusId',
+                      'SentimentId', 'AssignedAgentId']
+
+
+def _write_arrow(path, frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def write_calls(data_dir, tables, path, chunk_rows=ingest.CALL_CHUNK_ROWS):
+    """Stream LeadCall into one Arrow IPC file, a record batch per chunk, so
+    the parent never holds more than one chunk. Returns the latest CallDateTime."""
+    connected_id = ingest.connected_status_id(tables)
+    latest, writer, sink, schema = pd.NaT, None, None, None
+    chunks = ingest.iter_calls(data_dir, chunk_rows, columns=CALL_INPUT_COLUMNS)
+    try:
+        for chunk in chunks:
+            chunk['Connected'] = chunk['CallStatusId'].to_numpy() == connected_id
+            # Sentiment names share the lookup's categories, so every batch
+            # carries the same dictionary.
+            chunk['SentimentName_E'] = ingest.resolve(chunk['SentimentId'], tables['Sentiment'])
+            if len(chunk):
+                latest = max(latest, chunk['CallDateTime'].max()) if pd.notna(latest) else chunk['CallDateTime'].max()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                sink = pa.OSFile(path, 'wb')
+                writer = pa.ipc.new_file(sink, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+            sink.close()
+    if writer is None:  # LeadCall has a header only
+        _write_arrow(path, ingest.read_table(data_dir, 'LeadCall', CALL_INPUT_COLUMNS).assign(
+            Connected=False, SentimentName_E=None))
+    return latest
+
+
+def read_call_batches(path, columns):
+    """LeadCall chunks back from write_calls' file, memory-mapped one batch at a time."""
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield pa.Table.from_batches([reader.get_batch(i).select(columns)]).to_pandas()
+
+
+def prepare_inputs(data_dir, workdir, scores=None):
+    """Build the shared input tables and write each as an Arrow IPC file.
+
+    LeadCall is parsed once, streamed to calls.arrow chunk by chunk, and the
+    scoring features are read back from that file. Lead revenue, churn and
+    win probability come from the crm.scoring model, or from scores when the
+    caller already scored the leads. Returns the context dict passed to
+    every producer.
+    """
+    tables = ingest.load_tables(data_dir)
+    calls_path = os.path.join(workdir, 'calls.arrow')
+    last_call = write_calls(data_dir, tables, calls_path)
+    if scores is None:
+        features = scoring.build_features(data_dir, tables=tables,
+                                          call_chunks=read_call_batches(calls_path, scoring.CALL_COLUMNS))
+        scores = scoring.score_frame(features, scoring.load_bands(data_dir))
+    leads = ingest.enrich_leads(tables, scores)
+    leads['Conversion_Probability'] = scores['Conversion_Probability'].to_numpy()
+
+    schedule = tables['Schedule'][['ScheduleId', 'LeadId', 'ScheduledDate', 'TaskStatusId', 'AssignedAgentId']]
+    agents = pd.DataFrame({
+        'AgentId': tables['Agent']['AgentId'],
+        'AgentName': ingest.agent_names(tables['Agent']).to_numpy(),
+        'Role': tables['Agent']['Role'],
+    })
+    for name, frame in (('leads', leads), ('schedule', schedule), ('agents', agents)):
+        _write_arrow(os.path.join(workdir, f'{name}.arrow'), frame)
+
+    activity = [t for t in (leads['CreatedOn'].max(), last_call) if pd.notna(t)]
+    return {
+        'workdir': workdir,
+        'now': pd.Timestamp(datetime.now()),
+        # Trend windows are anchored at the latest activity in the export, so a
+        # stale export still compares its own last 30 days with the 30 before.
+        'as_of': max(activity) if activity else pd.Timestamp(datetime.now()),
+    }
+
+
+def load_inputs(context, inputs):
+    """Memory-map the declared input tables and convert only the declared columns."""
+    frames = {}
+    for name, columns in inputs.items():
+        source = pa.memory_map(os.path.join(context['workdir'], f'{name}.arrow'), 'r')
+        frames[name] = pa.ipc.open_file(source).read_all().select(columns).to_pandas()
+    return frames
+
+
+def _execute(section, context, deps):
+    spec = PRODUCERS[section]
+    started = time.perf_counter()
+    result = spec['fn'](load_inputs(context, spec['inputs']), deps, context)
+    return section, result, time.perf_counter() - started
+
+
+# -------------------------------
+# SHARED FEATURES
+# -------------------------------
+def sentiment_correlation(sentiment, won):
+    """Pearson r between call sentiment (+1 / 0 / -1) and the call's lead
+    being won, over the calls that have a sentiment; 0.0 when either side
+    does not vary."""
+    score = sentiment.astype(object).map(SENTIMENT_SCORES).to_numpy(dtype=float)
+    rated = ~np.isnan(score)
+    x, y = score[rated], np.asarray(won, dtype=float)[rated]
+    if len(x) < 2 or x.std() == 0 or y.std() == 0:
+        return 0.0
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def connect_rate_gap(connect_rate):
+    """(agents below the team's mean connect rate, their mean shortfall).
+
+    The shortfall is what training_impact_prediction reports: the average
+    connect-rate gain, as a fraction, if each of those agents reached the
+    team mean. It is a gap, not a forecast of what training achieves.
+    """
+    weak = connect_rate[connect_rate < connect_rate.mean()]
+    return weak.index, float((connect_rate.mean() - weak).mean()) if len(weak) else 0.0
+
+
+def is_open(leads):
+    return ~leads['StatusName_E'].isin(CLOSED_STATUSES).to_numpy()
+
+
+def conversion_probability(leads):
+    """Per-lead win probability from the scoring model."""
+    return leads['Conversion_Probability'].to_numpy(dtype=float)
+
+
+def days_since(timestamps, as_of):
+    return (as_of - timestamps).dt.days.to_numpy()
+
+
+def growth(recent, previous):
+    return round((recent - previous) / previous, 3) if previous else 0.0
+
+
+def _window_masks(timestamps, as_of, days=TREND_DAYS):
+    age = days_since(timestamps, as_of)
+    return age < days, (age >= days) & (age < 2 * days)
+
+
+# -------------------------------
+# PRODUCERS
+# -------------------------------
+LEAD_COLUMNS = ['LeadId', 'StatusName_E', 'StageName_E', 'ScoreName_E', 'CountryName_E',
+                'AssignedAgentId', 'CreatedOn', 'Revenue_Potential', 'Churn_Risk',
+                'Conversion_Probability']
+
+
+@producer('lead_status', inputs={'leads': LEAD_COLUMNS})
+def lead_status(tables, deps, context):
+    leads = tables['leads']
+    prob = conversion_probability(leads)
+    open_ = is_open(leads)
+    churn = leads['Churn_Risk'].to_numpy(dtype=float)
+    revenue = leads['Revenue_Potential'].to_numpy(dtype=float)
+    age = days_since(leads['CreatedOn'], context['as_of'])
+
+    # Next likely status: the most common status of the following stage.
+    stage_order = ['New', 'Qualified', 'Nurtured', 'Converted']
+    transitions = {}
+    for stage, following in zip(stage_order, stage_order[1:]):
+        ahead = leads[leads['StageName_E'] == following]
+        if ahead.empty:
+            continue
+        counts = ahead['StatusName_E'].value_counts()
+        target = counts.index[0]
+        here_statuses = leads.loc[leads['StageName_E'] == stage, 'StatusName_E'].dropna().unique()
+        for status in [s for s in here_statuses if s not in CLOSED_STATUSES]:
+            here = age[(leads['StatusName_E'] == status).to_numpy()]
+            there = age[(leads['StatusName_E'] == target).to_numpy()]
+            transitions[str(status)] = {
+                'next_likely_status': str(target),
+                'probability': round(float(counts.iloc[0] / counts.sum()), 2),
+                'avg_days': round(float(max(here.mean() - there.mean(), 0)), 1),
+            }
+
+    priority = np.where(open_, prob * revenue, 0.0)
+    top = np.argsort(-priority, kind='stable')[:5]
+    top = top[priority[top] > 0]
+    return {
+        'conversion_predictions': {
+            'high_probability_leads': int((prob > HIGH_PROBABILITY).sum()),
+            'medium_probability_leads': int(((prob >= MEDIUM_PROBABILITY) & (prob <= HIGH_PROBABILITY)).sum()),
+            'low_probability_leads': int((prob < MEDIUM_PROBABILITY).sum()),
+            'average_conversion_probability': round(float(prob.mean()), 2) if len(prob) else 0.0,
+        },
+        'status_transitions': transitions,
+        'optimization_recommendations': {
+            'priority_leads_for_immediate_action': [int(i) for i in leads['LeadId'].to_numpy()[top]],
+            'leads_at_risk_of_churn': leads.loc[open_ & (churn >= ingest.HIGH_RISK_THRESHOLD), 'LeadId'].astype(int).tolist(),
+            'high_value_opportunities': leads.loc[open_ & (revenue >= HIGH_VALUE_REVENUE), 'LeadId'].astype(int).tolist(),
+        },
+    }
+
+
+@producer('call_activity', inputs={'calls': ['LeadId', 'CallDateTime', 'Connected', 'SentimentName_E', 'AssignedAgentId'],
+                                   'leads': ['LeadId', 'StatusName_E']})
+def call_activity(tables, deps, context):
+    calls, leads = tables['calls'], tables['leads']
+    connected = calls['Connected'].to_numpy()
+    overall = connected.mean() if len(calls) else 0.0
+    when = calls['CallDateTime']
+    windows = pd.DataFrame({
+        'day': when.dt.day_name().str[:3], 'weekday': when.dt.dayofweek,
+        'hour': when.dt.hour, 'connected': connected,
+    }).groupby(['weekday', 'day', 'hour'])['connected'].agg(['mean', 'size']).reset_index()
+
+    # A (weekday, hour) majority-class model: its accuracy is how often the
+    # window's majority outcome matches each call's outcome.
+    majority = np.maximum(windows['mean'], 1 - windows['mean'])
+    accuracy = float((majority * windows['size']).sum() / windows['size'].sum()) if len(windows) else 0.0
+
+    # Small exports may have no window with MIN_WINDOW_CALLS calls; relax to the busiest.
+    min_calls = min(MIN_WINDOW_CALLS, int(windows['size'].max())) if len(windows) else 0
+    ranked = windows[windows['size'] >= min_calls].sort_values(['mean', 'size'], ascending=False)
+    best = ranked['mean'].iloc[0] if len(ranked) else overall
+    schedule = {}
+    for weekday, day in enumerate(WEEKDAYS):
+        hours = ranked[ranked['weekday'] == weekday].head(3)['hour'].sort_values()
+        if len(hours):
+            schedule[day] = [f'{h:02d}:00' for h in hours]
+
+    per_agent_day = calls.groupby([calls['AssignedAgentId'], when.dt.date]).size()
+    won_leads = leads.loc[leads['StatusName_E'] == ingest.WON_STATUS, 'LeadId']
+    return {
+        'success_prediction': {
+            'model_accuracy': round(accuracy, 2),
+            'optimal_calling_windows': [
+                {'time': f'{row.day}_{row.hour}', 'success_rate': round(float(row.mean), 2)}
+                for row in ranked.head(5).itertuples()
+            ],
+        },
+        'call_optimization': {
+            'predicted_success_rate_improvement': round(float(best - overall), 3),
+            'optimal_call_volume_per_agent': round(float(per_agent_day.median()), 1) if len(per_agent_day) else 0.0,
+            'sentiment_correlation': round(sentiment_correlation(
+                calls['SentimentName_E'], calls['LeadId'].isin(won_leads).to_numpy()), 2),
+        },
+        'predictive_scheduling': {'next_week_optimal_schedule': schedule},
+    }
+
+
+@producer('tasks_followup', inputs={'schedule': ['ScheduleId', 'LeadId', 'ScheduledDate', 'TaskStatusId'],
+                                    'leads': LEAD_COLUMNS})
+def tasks_followup(tables, deps, context):
+    # Open tasks only, as crm.scheduler counts them.
+    tasks, leads = ingest.open_tasks(tables['schedule']), tables['leads']
+    lead_index = pd.Index(leads['LeadId'])
+    pos = lead_index.get_indexer(tasks['LeadId'])
+    known = pos >= 0
+    prob = np.where(known, conversion_probability(leads)[pos], 0.0)
+    churn = np.where(known, leads['Churn_Risk'].to_numpy(dtype=float)[pos], np.nan)
+    revenue = np.where(known, leads['Revenue_Potential'].to_numpy(dtype=float)[pos], 0.0)
+    priority = scheduler.task_priority(churn, revenue)
+
+    today = context['now'].normalize()
+    due = tasks['ScheduledDate']
+    overdue = (due < today).to_numpy()
+    return {
+        'smart_prioritization': {
+            'high_priority_tasks': int((priority >= 0.66).sum()),
+            'medium_priority_tasks': int(((priority >= 0.33) & (priority < 0.66)).sum()),
+            'low_priority_tasks': int((priority < 0.33).sum()),
+            'average_priority_score': round(float(priority.mean()), 2) if len(priority) else 0.0,
+        },
+        'success_prediction': {
+            'overall_success_rate_prediction': round(float(prob.mean()), 3) if len(prob) else 0.0,
+            'high_success_probability_tasks': int((prob >= 0.5).sum()),
+            'low_success_probability_tasks': int((prob < 0.2).sum()),
+        },
+        'urgent_actions': {
+            'overdue_tasks': int(overdue.sum()),
+            'tasks_due_today': int(((due >= today) & (due < today + timedelta(days=1))).sum()),
+            'tasks_due_this_week': int(((due >= today) & (due < today + timedelta(days=7))).sum()),
+        },
+        'predictive_insights': {
+            'completion_rate_forecast': round(float(1 - overdue.mean()), 2) if len(overdue) else 0.0,
+            'productivity_improvement_potential': round(float(overdue.mean()), 2) if len(overdue) else 0.0,
+        },
+    }
+
+
+@producer('agent_availability', inputs={
+    'calls': ['CallDateTime', 'DurationSeconds', 'Connected', 'AssignedAgentId'],
+    'schedule': ['ScheduledDate', 'AssignedAgentId'],
+    'leads': ['AssignedAgentId', 'StatusName_E'],
+    'agents': ['AgentId'],
+})
+def agent_availability(tables, deps, context):
+    calls, leads, agents = tables['calls'], tables['leads'], tables['agents']
+    ids = np.sort(agents['AgentId'].to_numpy())
+    win_rate = (leads['StatusName_E'] == ingest.WON_STATUS).groupby(leads['AssignedAgentId']).mean()
+    win_rate = win_rate.reindex(ids).fillna(0.0)
+    connect_rate = calls.groupby('AssignedAgentId')['Connected'].mean().reindex(ids).fillna(0.0)
+    index = availability.AvailabilityIndex.from_frames(ids, calls, tables['schedule'])
+    end = context['as_of'].normalize() + timedelta(days=1)
+    utilization = index.utilization(end - timedelta(days=TREND_DAYS), end)
+
+    spread = win_rate.std(ddof=0) if len(win_rate) else 0.0
+    mean_win = win_rate.mean() if len(win_rate) else 0.0
+    weak, gap = connect_rate_gap(connect_rate)
+    return {
+        'performance_prediction': {
+            'agents_exceeding_targets': int((win_rate > mean_win + spread / 2).sum()),
+            'agents_needing_support': int((win_rate < mean_win - spread / 2).sum()),
+            'average_performance_improvement_potential': round(float((win_rate.max() - win_rate).mean()), 3)
+            if len(win_rate) else 0.0,
+        },
+        'capacity_optimization': {
+            'current_utilization_rate': round(float(utilization.mean()), 3) if len(utilization) else 0.0,
+            'underutilized_agents': [int(a) for a in utilization.index[utilization < UNDERUTILIZED]],
+            'overutilized_agents': [int(a) for a in utilization.index[utilization > OVERUTILIZED]],
+        },
+        'skills_development': {
+            'agents_needing_training': [int(a) for a in weak],
+            'training_impact_prediction': round(gap, 3),
+            'priority_training_areas': TRAINING_AREAS,
+        },
+        'burnout_prevention': {
+            'high_burnout_risk_agents': [int(a) for a in utilization.index[utilization >= BURNOUT]],
+            'wellness_score': round(float(1 - (utilization - 0.8).clip(lower=0).mean()), 2) if len(utilization) else 1.0,
+        },
+    }
+
+
+@producer('conversion', inputs={'leads': LEAD_COLUMNS, 'calls': ['CallDateTime']})
+def conversion(tables, deps, context):
+    leads, calls = tables['leads'], tables['calls']
+    prob = conversion_probability(leads)
+    open_ = is_open(leads)
+    revenue = leads['Revenue_Potential'].to_numpy(dtype=float)
+    churn = np.nan_to_num(leads['Churn_Risk'].to_numpy(dtype=float), nan=50.0)
+    age = days_since(leads['CreatedOn'], context['as_of'])
+    won = (leads['StatusName_E'] == ingest.WON_STATUS).to_numpy()
+
+    expected = float((prob * revenue)[open_].sum())
+    at_risk = open_ & (churn >= ingest.HIGH_RISK_THRESHOLD)
+    avg_days = float(age[won].mean()) if won.any() else 0.0
+    recent_calls, previous_calls = _window_masks(calls['CallDateTime'], context['as_of'])
+    recent_leads, previous_leads = _window_masks(leads['CreatedOn'], context['as_of'])
+    return {
+        'revenue_forecasting': {
+            'total_pipeline_value': int(revenue[open_].sum()),
+            'expected_revenue_next_quarter': int(expected),
+            'high_probability_revenue': int(revenue[open_ & (prob > HIGH_PROBABILITY)].sum()),
+        },
+        'conversion_optimization': {
+            'optimization_opportunities_count': int((open_ & (revenue >= HIGH_VALUE_REVENUE) & (churn >= 50)).sum()),
+            'total_revenue_at_risk': int(revenue[at_risk].sum()),
+            'potential_revenue_uplift': int((revenue * (1 - prob))[at_risk].sum() * (1 - churn[at_risk].mean() / 100))
+            if at_risk.any() else 0,
+        },
+        'time_to_conversion': {
+            'average_conversion_time': round(avg_days, 1),
+            'fast_track_opportunities': int((open_ & (leads['StageName_E'] == 'Nurtured').to_numpy()
+                                             & (age < avg_days)).sum()),
+            'stalled_deals_needing_attention': int((open_ & (age > 1.5 * avg_days)).sum()) if avg_days else 0,
+        },
+        'predictive_insights': {
+            'next_month_conversions_forecast': int(round(prob[open_].sum() / 3)),
+            'revenue_confidence_interval': [int(expected * 0.8), int(expected * 1.2)],
+            'seasonal_adjustment_factor': round(1 + growth(recent_calls.sum(), previous_calls.sum()), 2),
+            'market_trend_impact': growth(recent_leads.sum(), previous_leads.sum()),
+        },
+    }
+
+
+def _saturation(months):
+    if months < 12:
+        return '6-12 months'
+    low = int(months // 6 * 6)
+    return f'{low}-{low + 6} months' if low < 36 else '36-48 months'
+
+
+@producer('geographic', inputs={'leads': LEAD_COLUMNS})
+def geographic(tables, deps, context):
+    leads = tables['leads']
+    leads = leads.assign(
+        open=is_open(leads),
+        won=(leads['StatusName_E'] == ingest.WON_STATUS).to_numpy(),
+        lost=leads['StatusName_E'].isin(['Lost', 'Not Interested']).to_numpy(),
+        uncontacted=(leads['StatusName_E'] == 'Uncontacted').to_numpy(),
+        pipeline=np.where(is_open(leads), leads['Revenue_Potential'], 0.0),
+    )
+    recent, previous = _window_masks(leads['CreatedOn'], context['as_of'])
+    leads['recent'], leads['previous'] = recent, previous
+    by = leads.groupby('CountryName_E', observed=True).agg(
+        leads=('LeadId', 'size'), pipeline=('pipeline', 'sum'), revenue=('Revenue_Potential', 'mean'),
+        win_rate=('won', 'mean'), loss_rate=('lost', 'mean'), churn=('Churn_Risk', 'mean'),
+        recent=('recent', 'sum'), previous=('previous', 'sum'), uncontacted=('uncontacted', 'sum'),
+        agents=('AssignedAgentId', 'nunique'),
+    )
+    if by.empty:
+        return {}
+    by['growth'] = (by['recent'] - by['previous']) / by['previous'].replace(0, np.nan)
+    share = by['leads'] / by['leads'].sum()
+    hhi = float((share ** 2).sum())
+    diversity = (1 - hhi) / (1 - 1 / len(by)) if len(by) > 1 else 0.0
+
+    high_potential = by[(by['revenue'] >= by['revenue'].median()) & (by['win_rate'] >= by['win_rate'].median())]
+    per_agent = by['leads'] / by['agents']
+    # Months to work through the uncontacted backlog at the recent intake pace.
+    monthly = (by['recent'] / (TREND_DAYS / 30)).replace(0, np.nan)
+    months = (by['uncontacted'] / monthly).fillna(48)
+    return {
+        'market_intelligence': {
+            'top_opportunity_market': str(by['pipeline'].idxmax()),
+            'fastest_growing_market': str(by['growth'].fillna(0).idxmax()),
+            'highest_conversion_market': str(by['win_rate'].idxmax()),
+            'market_diversity_index': round(diversity, 2),
+        },
+        'expansion_opportunities': {
+            'high_potential_markets': [str(c) for c in high_potential.index],
+            'total_expansion_potential': f'${int(high_potential["pipeline"].sum()):,}',
+            'underserved_markets': [str(c) for c in per_agent.nlargest(2).index],
+        },
+        'risk_analysis': {
+            'high_risk_markets': [str(c) for c in by.index[by['churn'] >= ingest.HIGH_RISK_THRESHOLD]],
+            'regulatory_challenges': [str(c) for c in by['win_rate'].nsmallest(2).index],
+            'competitive_pressures': [str(c) for c in by['loss_rate'].nlargest(2).index],
+        },
+        'predictive_analytics': {
+            'market_saturation_timeline': {str(c): _saturation(m) for c, m in months.sort_values().items()},
+        },
+    }
+
+
+@producer('executive_summary', inputs={'leads': LEAD_COLUMNS},
+          depends=('conversion', 'lead_status', 'agent_availability', 'geographic'))
+def executive_summary(tables, deps, context):
+    leads = tables['leads']
+    prob = conversion_probability(leads)
+    open_ = is_open(leads)
+    revenue = leads['Revenue_Potential'].to_numpy(dtype=float)
+    churn = np.nan_to_num(leads['Churn_Risk'].to_numpy(dtype=float), nan=50.0)
+    won = (leads['StatusName_E'] == ingest.WON_STATUS).to_numpy()
+    quality = leads['ScoreName_E'].isin(['HOT', 'WARM']).to_numpy()
+    recent, previous = _window_masks(leads['CreatedOn'], context['as_of'])
+
+    def rate(mask, values):
+        return values[mask].mean() if mask.any() else 0.0
+
+    uplift_leads = open_ & (churn >= ingest.HIGH_RISK_THRESHOLD) & (revenue > 0)
+    conversion_ = deps['conversion']
+    next_30 = conversion_['revenue_forecasting']['expected_revenue_next_quarter'] / 3
+    agent_ = deps['agent_availability']
+    return {
+        'revenue_forecasting': {
+            'next_30_days_total': int(next_30),
+            'average_lead_value': int(revenue.mean()) if len(revenue) else 0,
+            'high_value_leads_count': int((revenue >= HIGH_VALUE_REVENUE).sum()),
+            # More history, tighter forecast: saturates towards 0.95.
+            'forecast_confidence': round(min(0.95, 0.5 + 0.1 * np.log10(max(len(leads), 1))), 2),
+        },
+        'performance_trends': {
+            'revenue_growth_rate': growth(revenue[recent].sum(), revenue[previous].sum()),
+            'lead_quality_trend': round(float(rate(recent, quality) - rate(previous, quality)), 3),
+            'conversion_acceleration': round(float(rate(recent, won) - rate(previous, won)), 3),
+            'churn_risk_reduction': round(float(rate(previous, churn) - rate(recent, churn)) / 100, 3),
+        },
+        'optimization_opportunities': {
+            'total_uplift_potential': conversion_['conversion_optimization']['potential_revenue_uplift'],
+            'leads_with_high_uplift': int(uplift_leads.sum()),
+            'average_improvement_probability': round(float(1 - churn[uplift_leads].mean() / 100), 2)
+            if uplift_leads.any() else 0.0,
+        },
+        'predictive_alerts': {
+            'high_risk_leads_next_week': len(deps['lead_status']['optimization_recommendations']['leads_at_risk_of_churn']),
+            'conversion_opportunities_closing': int((open_ & (prob > MEDIUM_PROBABILITY)).sum()),
+            'agent_performance_warnings': agent_['performance_prediction']['agents_needing_support'],
+            'market_expansion_signals': len(deps['geographic'].get('expansion_opportunities', {})
+                                            .get('high_potential_markets', [])),
+        },
+    }
+
+
+@producer('meta_insights', inputs={}, depends=tuple(s for s in SECTION_ORDER if s != 'meta_insights'))
+def meta_insights(tables, deps, context):
+    today = context['now'].normalize()
+    uplift = (deps['conversion']['conversion_optimization']['potential_revenue_uplift']
+              + deps['executive_summary']['optimization_opportunities']['total_uplift_potential'])
+    accuracy = [deps['call_activity']['success_prediction']['model_accuracy'],
+                deps['executive_summary']['revenue_forecasting']['forecast_confidence']]
+    return {
+        'total_models_deployed': len(PRODUCERS) - 1,
+        'prediction_accuracy_average': round(float(np.mean(accuracy)), 3),
+        'optimization_potential_total': f'${uplift / 1e6:.1f}M',
+        'automation_opportunities': (deps['tasks_followup']['urgent_actions']['overdue_tasks']
+                                     + len(deps['lead_status']['optimization_recommendations']['leads_at_risk_of_churn'])),
+        'ai_confidence_score': round(float(np.mean(accuracy + [deps['agent_availability']['burnout_prevention']['wellness_score']])), 2),
+        'last_model_update': today.strftime('%Y-%m-%d'),
+        'next_model_refresh': (today + timedelta(days=30)).strftime('%Y-%m-%d'),
+    }
+
+
+# -------------------------------
+# EXECUTION
+# -------------------------------
+def run(data_dir=ingest.DATA_DIR, workers=None, scores=None):
+    """Compute every section; returns (insights, timings).
+
+    workers=0 runs producers inline in dependency order (no process pool).
+    scores, the crm.scoring frame for every lead, skips scoring them again.
+    """
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix='crm-insights-') as workdir:
+        started = time.perf_counter()
+        context = prepare_inputs(data_dir, workdir, scores)
+        timings['prepare_inputs'] = time.perf_counter() - started
+
+        results, pending = {}, set(PRODUCERS)
+
+        def ready():
+            return [s for s in sorted(pending) if all(d in results for d in PRODUCERS[s]['depends'])]
+
+        def deps_of(section):
+            return {d: results[d] for d in PRODUCERS[section]['depends']}
+
+        if workers == 0:
+            while pending:
+                for section in ready():
+                    pending.discard(section)
+                    _, results[section], timings[section] = _execute(section, context, deps_of(section))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                running = set()
+                while pending or running:
+                    for section in ready():
+                        pending.discard(section)
+                        running.add(pool.submit(_execute, section, context, deps_of(section)))
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        section, result, seconds = future.result()
+                        results[section], timings[section] = result, seconds
+        timings['total'] = time.perf_counter() - started
+    return {s: results[s] for s in SECTION_ORDER}, {k: round(v, 4) for k, v in timings.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--data-dir', default=ingest.DATA_DIR)
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (0 = inline)')
+    parser.add_argument('--out', help='write the insights JSON here instead of stdout')
+    args = parser.parse_args()
+    insights, timings = run(args.data_dir, args.workers)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(insights, f, indent=2)
+    else:
+        print(json.dumps(insights, indent=2))
+    print(json.dumps(timings), file=sys.stderr)
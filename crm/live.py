@@ -0,0 +1,377 @@
+"""Live call counters fed by streaming LeadCall events.
+
+An asyncio consumer folds call events into LiveCounters as they arrive, so
+the call numbers on the dashboard move between processed_data rebuilds.
+Events are CSV lines with LeadCall.csv's columns and come from one of:
+
+* an append-only file with LeadCall.csv's header (data/LeadCall.csv itself
+  works): tail_file() polls its size and reads only the complete lines past
+  the last offset. A file that shrinks or changes header was re-exported,
+  so the counters are reset and it is read again from the start;
+* a local TCP socket (tcp://host:port): each connection sends the header
+  line, then events. This stands in for a real queue.
+
+Sources put line batches on a bounded asyncio.Queue (so a slow consumer
+pushes back on the reader instead of buffering) and one consumer task folds
+them under a lock. Counters are kept per event hour for the last
+WINDOW_HOURS hours: calls, calls by CallStatusId, sentiment mix and calls
+per agent, plus a running sum over the window. Older buckets are dropped as
+newer events arrive, so memory stays bounded by the window, not the
+stream. Lifetime totals (calls, connected) are kept as plain counters.
+
+LiveFeed runs the loop on a daemon thread for the app (CRM_LIVE_EVENTS).
+
+    python -m crm.live data/LeadCall.csv             # fold, then print counters every 5s
+    python -m crm.live tcp://127.0.0.1:9900 --interval 2
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from crm import ingest
+
+WINDOW_HOURS = 24 * 7
+RECENT_HOURS = 24
+POLL_SECONDS = 0.5
+READ_BLOCK_BYTES = 1 << 20
+QUEUE_BATCHES = 8
+HOUR_FORMAT = '%Y-%m-%d %H'
+COLUMNS = ('CallDateTime', 'CallStatusId', 'SentimentId', 'AssignedAgentId')
+CAUGHT_UP = object()  # queued by a source once it has read its backlog
+
+
+def _id(value):
+    """Integer id from a CSV field ('3', '3.0'), None when blank"""
+    if not value:
+        return None
+    return int(value) if value.isdigit() else int(float(value))
+
+
+def check_header(header, source):
+    """Raise ValueError unless the CSV header has every column in COLUMNS"""
+    missing = [c for c in COLUMNS if c not in next(csv.reader([header]), [])]
+    if missing:
+        raise ValueError(f'{source}: header lacks {", ".join(missing)}')
+
+
+def load_labels(data_dir=ingest.DATA_DIR):
+    """{'status' | 'sentiment' | 'agent': {id: name}} for display ({} parts when missing)"""
+    labels = {}
+    for key, table in (('status', 'CallStatus'), ('sentiment', 'Sentiment')):
+        try:
+            ids, names = ingest.read_lookup(data_dir, table)
+            labels[key] = {int(i): str(n) for i, n in zip(ids, names)}
+        except (FileNotFoundError, KeyError, ValueError):
+            labels[key] = {}
+    try:
+        names = ingest.agent_names(ingest.read_table(data_dir, 'Agent', ['AgentId', 'FirstName', 'LastName']))
+        labels['agent'] = {int(i): str(n) for i, n in names.items()}
+    except (FileNotFoundError, KeyError, ValueError):
+        labels['agent'] = {}
+    return labels
+
+
+class Bucket:
+    """Call counts for one hour (or a sum of hours)."""
+    __slots__ = ('calls', 'status', 'sentiment', 'agent')
+
+    def __init__(self):
+        self.calls = 0
+        self.status = {}
+        self.sentiment = {}
+        self.agent = {}
+
+    def add(self, status, sentiment, agent, sign=1):
+        self.calls += sign
+        self.status[status] = self.status.get(status, 0) + sign
+        if sentiment is not None:
+            self.sentiment[sentiment] = self.sentiment.get(sentiment, 0) + sign
+        if agent is not None:
+            self.agent[agent] = self.agent.get(agent, 0) + sign
+
+    def subtract(self, other):
+        self.calls -= other.calls
+        for mine, theirs in ((self.status, other.status), (self.sentiment, other.sentiment),
+                             (self.agent, other.agent)):
+            for key, count in theirs.items():
+                left = mine[key] - count
+                if left:
+                    mine[key] = left
+                else:
+                    del mine[key]
+
+
+class LiveCounters:
+    """Windowed hourly call counters; fold() and snapshot() are thread-safe."""
+
+    def __init__(self, connected_id=1, window_hours=WINDOW_HOURS):
+        self.connected_id = connected_id
+        self.window_hours = window_hours
+        self._lock = threading.Lock()
+        self._columns = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.buckets = {}  # 'YYYY-MM-DD HH' -> Bucket
+            self.window = Bucket()
+            self.newest = None
+            self.window_start = ''
+            self.total_calls = 0
+            self.total_connected = 0
+            self.late = 0
+            self.errors = 0
+            self.caught_up = False
+            self.last_event_at = None
+
+    def _indexes(self, header):
+        indexes = self._columns.get(header)
+        if indexes is None:
+            names = next(csv.reader([header]))
+            indexes = self._columns[header] = tuple(names.index(c) for c in COLUMNS)
+        return indexes
+
+    def _advance(self, hour):
+        self.newest = hour
+        start = datetime.strptime(hour, HOUR_FORMAT) - timedelta(hours=self.window_hours - 1)
+        self.window_start = start.strftime(HOUR_FORMAT)
+        for old in [h for h in self.buckets if h < self.window_start]:
+            self.window.subtract(self.buckets.pop(old))
+
+    def fold(self, header, lines):
+        """Count the events in lines (CSV rows under header); returns how many were valid."""
+        i_time, i_status, i_sentiment, i_agent = self._indexes(header)
+        arrival = datetime.now().strftime(HOUR_FORMAT)
+        folded = 0
+        with self._lock:
+            for row in csv.reader(lines):
+                try:
+                    hour = row[i_time][:13] or arrival
+                    status = _id(row[i_status])
+                    sentiment = _id(row[i_sentiment])
+                    agent = _id(row[i_agent])
+                except (IndexError, ValueError):
+                    self.errors += 1
+                    continue
+                if len(hour) != 13:
+                    self.errors += 1
+                    continue
+                folded += 1
+                self.total_calls += 1
+                self.total_connected += status == self.connected_id
+                if self.newest is None or hour > self.newest:
+                    self._advance(hour)
+                if hour < self.window_start:
+                    self.late += 1
+                    continue
+                bucket = self.buckets.get(hour)
+                if bucket is None:
+                    bucket = self.buckets[hour] = Bucket()
+                bucket.add(status, sentiment, agent)
+                self.window.add(status, sentiment, agent)
+            if folded:
+                self.last_event_at = time.time()
+        return folded
+
+    def snapshot(self, recent_hours=RECENT_HOURS):
+        """Plain-dict copy of the counters.
+
+        Totals cover every event folded; 'window' sums the last window_hours
+        event hours and 'recent' the last recent_hours, both counted back
+        from the newest event's hour.
+        """
+        def rate(connected, calls):
+            return round(connected / calls * 100, 1) if calls else 0.0
+
+        with self._lock:
+            hourly = [{'hour': hour, 'calls': b.calls, 'connected': b.status.get(self.connected_id, 0)}
+                      for hour, b in sorted(self.buckets.items())]
+            window = self.window
+            window_connected = window.status.get(self.connected_id, 0)
+            snapshot = {
+                'caught_up': self.caught_up,
+                'last_event_at': self.last_event_at,
+                'total_calls': self.total_calls,
+                'connected_calls': self.total_connected,
+                'success_rate': rate(self.total_connected, self.total_calls),
+                'late': self.late,
+                'errors': self.errors,
+                'window_hours': self.window_hours,
+                'newest_hour': self.newest,
+                'window': {
+                    'calls': window.calls,
+                    'connected': window_connected,
+                    'success_rate': rate(window_connected, window.calls),
+                    'by_status': dict(sorted(window.status.items())),
+                    'sentiment': dict(sorted(window.sentiment.items())),
+                    'by_agent': dict(sorted(window.agent.items(), key=lambda item: -item[1])),
+                },
+                'hourly': hourly,
+            }
+        if self.newest is not None:
+            cutoff = (datetime.strptime(self.newest, HOUR_FORMAT)
+                      - timedelta(hours=recent_hours - 1)).strftime(HOUR_FORMAT)
+            recent = [h for h in hourly if h['hour'] >= cutoff]
+        else:
+            recent = []
+        calls = sum(h['calls'] for h in recent)
+        connected = sum(h['connected'] for h in recent)
+        snapshot['recent'] = {'hours': recent_hours, 'calls': calls, 'connected': connected,
+                              'success_rate': rate(connected, calls)}
+        return snapshot
+
+
+# -------------------------------
+# SOURCES
+# -------------------------------
+async def tail_file(path, queue, counters, poll=POLL_SECONDS, stop=None):
+    """Put (header, lines) batches for everything appended to path on queue
+    until stop is set; CAUGHT_UP follows the first pass over the backlog.
+    Raises ValueError if the header lacks one of COLUMNS."""
+    offset, header, announced = 0, None, False
+    while stop is None or not stop.is_set():
+        block = b''
+        try:
+            with open(path, 'rb') as f:
+                first = f.readline()
+                size = os.fstat(f.fileno()).st_size
+                if first.endswith(b'\n'):  # else the header is still being written
+                    current = first.decode().strip()
+                    if header is not None and (current != header or size < offset):
+                        await queue.join()  # the old file's batches are folded before the reset
+                        counters.reset()
+                        offset, announced = 0, False
+                    if current != header:
+                        check_header(current, path)
+                    header = current
+                    offset = max(offset, len(first))
+                    f.seek(offset)
+                    block = f.read(READ_BLOCK_BYTES)
+        except FileNotFoundError:
+            pass
+        end = block.rfind(b'\n') + 1
+        if end:
+            offset += end
+            await queue.put((header, block[:end].decode().splitlines()))
+        if end and len(block) == READ_BLOCK_BYTES:
+            continue  # more backlog behind this block
+        if not announced:
+            await queue.put(CAUGHT_UP)
+            announced = True
+        await asyncio.sleep(poll)
+
+
+async def serve_socket(host, port, queue):
+    """Accept connections sending a header line then event lines; runs until
+    cancelled. A connection whose header lacks one of COLUMNS is closed."""
+    async def handle(reader, writer):
+        header = (await reader.readline()).decode().strip()
+        try:
+            check_header(header, 'connection')
+        except ValueError as e:
+            writer.write(f'{e}\n'.encode())
+            writer.close()
+            return
+        buffer = b''
+        while True:
+            chunk = await reader.read(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+            end = buffer.rfind(b'\n') + 1
+            if end:
+                await queue.put((header, buffer[:end].decode().splitlines()))
+                buffer = buffer[end:]
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    await queue.put(CAUGHT_UP)
+    async with server:
+        await server.serve_forever()
+
+
+async def consume(queue, counters):
+    """Fold every batch put on queue into counters, forever."""
+    while True:
+        item = await queue.get()
+        if item is CAUGHT_UP:
+            counters.caught_up = True
+        else:
+            counters.fold(*item)
+        queue.task_done()
+
+
+async def run(source, counters, poll=POLL_SECONDS, stop=None):
+    """Consume source (a file path or tcp://host:port) into counters; an
+    error in the source or the consumer ends the run and is raised."""
+    queue = asyncio.Queue(maxsize=QUEUE_BATCHES)
+    if source.startswith('tcp://'):
+        host, port = source[len('tcp://'):].rsplit(':', 1)
+        producer = serve_socket(host, int(port), queue)
+    else:
+        producer = tail_file(source, queue, counters, poll, stop)
+    tasks = (asyncio.ensure_future(producer), asyncio.ensure_future(consume(queue, counters)))
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class LiveFeed:
+    """Daemon thread running the asyncio consumer for one source."""
+
+    def __init__(self, source, data_dir=ingest.DATA_DIR, window_hours=WINDOW_HOURS, poll=POLL_SECONDS):
+        labels = load_labels(data_dir)
+        connected = [i for i, name in labels['status'].items() if name == ingest.CONNECTED_STATUS]
+        self.source = source
+        self.poll = poll
+        self.labels = labels
+        self.counters = LiveCounters(connected[0] if connected else 1, window_hours)
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='crm-live', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self, recent_hours=RECENT_HOURS):
+        return self.counters.snapshot(recent_hours)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                asyncio.run(run(self.source, self.counters, self.poll, self._stop))
+            except Exception as e:  # keep the feed alive; surface via last_error
+                self.last_error = f'{type(e).__name__}: {e}'
+                self._stop.wait(5)
+                self.counters.reset()  # the restarted source is read again from the start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fold a LeadCall event stream into live counters')
+    parser.add_argument('source', help='append-only LeadCall CSV file or tcp://host:port')
+    parser.add_argument('--data-dir', default=ingest.DATA_DIR, help='lookup tables for labels')
+    parser.add_argument('--interval', type=float, default=5.0)
+    args = parser.parse_args()
+    feed = LiveFeed(args.source, args.data_dir).start()
+    started, seen = time.perf_counter(), 0
+    while True:
+        time.sleep(args.interval)
+        snap = feed.snapshot()
+        elapsed, started = time.perf_counter() - started, time.perf_counter()
+        rate, seen = (snap['total_calls'] - seen) / elapsed, snap['total_calls']
+        print(json.dumps({key: snap[key] for key in ('caught_up', 'total_calls', 'success_rate', 'late', 'errors',
+                                                     'newest_hour', 'recent')}),
+              f'{rate:,.0f} events/s', feed.last_error or '', flush=True)
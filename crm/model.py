@@ -0,0 +1,459 @@
+"""Typed model of the processed_data JSON documents.
+
+Every section of comprehensive_ai_insights.json and dashboard_data.json is a
+record class with __slots__ generated from a field schema (see record()),
+so pages read attributes instead of chained .get() lookups. parse() checks a
+decoded section against its schema once, when crm.snapshots builds the
+snapshot: ints are widened where a float is declared, and every missing,
+null, mistyped or unexpected field is reported as a drift message. A field
+that fails keeps its type's empty value (0, '', [], {}), never a
+plausible-looking number, and the drift travels with the section so the
+dashboard can say what is wrong with its input.
+
+The same schema maps to an Arrow struct (arrow_schema()), which is how the
+snapshots store each section: a one-row Arrow IPC file that from_arrow()
+turns back into records without validating again.
+
+    python -m crm.model [FILE ...]     # print the schema drift of each document
+"""
+import json
+import os
+import sys
+
+import pyarrow as pa
+
+
+class List:
+    """A JSON array whose items are all of one type."""
+
+    def __init__(self, item):
+        self.item = item
+
+
+class Map:
+    """A JSON object with free-form keys and values of one type."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Record:
+    """Fixed set of typed attributes; subclasses come from record()."""
+    __slots__ = ()
+    FIELDS = {}
+    OPTIONAL = ()
+
+    def __init__(self, **values):
+        for name, kind in self.FIELDS.items():
+            setattr(self, name, values[name] if name in values else empty(kind))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{n}={getattr(self, n)!r}" for n in self.FIELDS)})'
+
+    def to_dict(self):
+        """Plain JSON-compatible dict, nested records included."""
+        return {name: _plain(getattr(self, name)) for name in self.FIELDS}
+
+
+class Section(Record):
+    """A top-level document section, with whether the source had it and the
+    drift found when it was parsed."""
+    __slots__ = ('available', 'drift')
+    WRAPS = None
+
+    def __init__(self, available=True, drift=(), **values):
+        super().__init__(**values)
+        self.available = available
+        self.drift = tuple(drift)
+
+
+def record(name, fields, optional=(), base=Record, **attrs):
+    """A Record subclass with one slot per field; fields maps name -> type.
+
+    A type is int, float, str, another record, List(type) or Map(type).
+    Fields named in optional may be absent without counting as drift.
+    """
+    return type(name, (base,), dict(attrs, **{
+        '__slots__': tuple(fields), '__module__': __name__,
+        'FIELDS': dict(fields), 'OPTIONAL': tuple(optional),
+    }))
+
+
+def section(name, fields, optional=(), wraps=None):
+    """A Section subclass. With wraps, the section in the document is a bare
+    array or object held in that single field."""
+    return record(name, fields, optional, base=Section, WRAPS=wraps)
+
+
+def _is_record(kind):
+    return isinstance(kind, type) and issubclass(kind, Record)
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _describe(kind):
+    if isinstance(kind, List):
+        return f'list of {_describe(kind.item)}'
+    if isinstance(kind, Map):
+        return f'map of {_describe(kind.value)}'
+    return 'object' if _is_record(kind) else kind.__name__
+
+
+def empty(kind):
+    """The value a field of kind takes when it is missing or invalid."""
+    if isinstance(kind, List):
+        return []
+    if isinstance(kind, Map):
+        return {}
+    return kind()
+
+
+# -------------------------------
+# VALIDATION
+# -------------------------------
+def parse(kind, value, path, drift):
+    """value checked against kind; each problem is appended to drift."""
+    if isinstance(kind, List):
+        if isinstance(value, list):
+            return [parse(kind.item, v, f'{path}[{i}]', drift) for i, v in enumerate(value)]
+    elif isinstance(kind, Map):
+        if isinstance(value, dict):
+            return {str(k): parse(kind.value, v, f'{path}.{k}', drift) for k, v in value.items()}
+    elif _is_record(kind):
+        if isinstance(value, dict):
+            values = {}
+            for name, field in kind.FIELDS.items():
+                if name in value:
+                    values[name] = parse(field, value[name], f'{path}.{name}', drift)
+                elif name not in kind.OPTIONAL:
+                    drift.append(f'{path}.{name}: missing')
+            drift.extend(f'{path}.{name}: unexpected field' for name in value if name not in kind.FIELDS)
+            return kind(**values)
+    elif type(value) is kind:
+        return value
+    elif kind is float and type(value) is int:
+        return float(value)
+    elif kind is int and type(value) is float and value.is_integer():
+        return int(value)
+    got = 'null' if value is None else type(value).__name__
+    drift.append(f'{path}: expected {_describe(kind)}, got {got}')
+    return empty(kind)
+
+
+def missing(cls, reason):
+    """An empty, unavailable section carrying reason as its drift."""
+    return cls(available=False, drift=(reason,))
+
+
+def parse_document(schema, payload):
+    """({name: section}, drift) for a decoded document.
+
+    Every section in schema is returned, absent ones as missing(); the drift
+    list covers all sections plus any top-level keys the schema lacks.
+    """
+    sections, drift = {}, []
+    for name, cls in schema.items():
+        if name in payload:
+            found = []
+            if cls.WRAPS:
+                sections[name] = cls(**{cls.WRAPS: parse(cls.FIELDS[cls.WRAPS], payload[name], name, found)})
+            else:
+                sections[name] = parse(cls, payload[name], name, found)
+            sections[name].drift = tuple(found)
+            drift.extend(found)
+        else:
+            sections[name] = missing(cls, f'{name}: missing section')
+            drift.append(f'{name}: missing section')
+    drift.extend(f'{name}: unexpected section' for name in payload if name not in schema)
+    return sections, drift
+
+
+# -------------------------------
+# ARROW ENCODING
+# -------------------------------
+ARROW_SCALARS = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+
+
+def arrow_type(kind):
+    if isinstance(kind, List):
+        return pa.list_(arrow_type(kind.item))
+    if isinstance(kind, Map):
+        return pa.map_(pa.string(), arrow_type(kind.value))
+    if _is_record(kind):
+        return pa.struct(arrow_schema(kind))
+    return ARROW_SCALARS[kind]
+
+
+def arrow_schema(cls):
+    return pa.schema([(name, arrow_type(kind)) for name, kind in cls.FIELDS.items()])
+
+
+def to_arrow(section):
+    """One-row Arrow table for a section; availability and drift go in the
+    schema metadata."""
+    table = pa.Table.from_pylist([section.to_dict()], schema=arrow_schema(type(section)))
+    return table.replace_schema_metadata({
+        'available': json.dumps(section.available), 'drift': json.dumps(list(section.drift)),
+    })
+
+
+def _decode(kind, array):
+    """Python values for every element of an Arrow array, built column by
+    column so large lists of records skip per-row dict conversion."""
+    if isinstance(kind, List):
+        items = _decode(kind.item, array.values)
+        offsets = array.offsets.to_pylist()
+        return [items[start:stop] for start, stop in zip(offsets, offsets[1:])]
+    if isinstance(kind, Map):
+        keys, values = array.keys.to_pylist(), _decode(kind.value, array.items)
+        offsets = array.offsets.to_pylist()
+        return [dict(zip(keys[start:stop], values[start:stop])) for start, stop in zip(offsets, offsets[1:])]
+    if _is_record(kind):
+        names = list(kind.FIELDS)
+        columns = [_decode(kind.FIELDS[name], child) for name, child in zip(names, array.flatten())]
+        rows = []
+        for values in zip(*columns):
+            row = kind.__new__(kind)
+            for name, value in zip(names, values):
+                setattr(row, name, value)
+            rows.append(row)
+        return rows
+    return array.to_pylist()
+
+
+def from_arrow(cls, table):
+    """The section to_arrow() stored, rebuilt without re-validating."""
+    meta = table.schema.metadata
+    result = _decode(cls, pa.StructArray.from_arrays(
+        [table.column(name).combine_chunks() for name in cls.FIELDS], list(cls.FIELDS)))[0]
+    result.available = json.loads(meta[b'available'])
+    result.drift = tuple(json.loads(meta[b'drift']))
+    return result
+
+
+# -------------------------------
+# comprehensive_ai_insights.json
+# -------------------------------
+RevenueForecast = record('RevenueForecast', {
+    'next_30_days_total': float, 'average_lead_value': float,
+    'high_value_leads_count': int, 'forecast_confidence': float,
+})
+PerformanceTrends = record('PerformanceTrends', {
+    'revenue_growth_rate': float, 'lead_quality_trend': float,
+    'conversion_acceleration': float, 'churn_risk_reduction': float,
+})
+OptimizationOpportunities = record('OptimizationOpportunities', {
+    'total_uplift_potential': float, 'leads_with_high_uplift': int,
+    'average_improvement_probability': float,
+})
+PredictiveAlerts = record('PredictiveAlerts', {
+    'high_risk_leads_next_week': int, 'conversion_opportunities_closing': int,
+    'agent_performance_warnings': int, 'market_expansion_signals': int,
+})
+ExecutiveSummary = section('ExecutiveSummary', {
+    'revenue_forecasting': RevenueForecast, 'performance_trends': PerformanceTrends,
+    'optimization_opportunities': OptimizationOpportunities, 'predictive_alerts': PredictiveAlerts,
+})
+
+ConversionPredictions = record('ConversionPredictions', {
+    'high_probability_leads': int, 'medium_probability_leads': int,
+    'low_probability_leads': int, 'average_conversion_probability': float,
+})
+StatusTransition = record('StatusTransition', {
+    'next_likely_status': str, 'probability': float, 'avg_days': float,
+})
+LeadRecommendations = record('LeadRecommendations', {
+    'priority_leads_for_immediate_action': List(int), 'leads_at_risk_of_churn': List(int),
+    'high_value_opportunities': List(int),
+})
+LeadStatusInsights = section('LeadStatusInsights', {
+    'conversion_predictions': ConversionPredictions, 'status_transitions': Map(StatusTransition),
+    'optimization_recommendations': LeadRecommendations,
+})
+
+CallingWindow = record('CallingWindow', {'time': str, 'success_rate': float})
+CallSuccessPrediction = record('CallSuccessPrediction', {
+    'model_accuracy': float, 'optimal_calling_windows': List(CallingWindow),
+})
+CallOptimization = record('CallOptimization', {
+    'predicted_success_rate_improvement': float, 'optimal_call_volume_per_agent': float,
+    'sentiment_correlation': float,
+})
+PredictiveScheduling = record('PredictiveScheduling', {'next_week_optimal_schedule': Map(List(str))})
+CallActivityInsights = section('CallActivityInsights', {
+    'success_prediction': CallSuccessPrediction, 'call_optimization': CallOptimization,
+    'predictive_scheduling': PredictiveScheduling,
+})
+
+SmartPrioritization = record('SmartPrioritization', {
+    'high_priority_tasks': int, 'medium_priority_tasks': int,
+    'low_priority_tasks': int, 'average_priority_score': float,
+})
+TaskSuccessPrediction = record('TaskSuccessPrediction', {
+    'overall_success_rate_prediction': float, 'high_success_probability_tasks': int,
+    'low_success_probability_tasks': int,
+})
+UrgentActions = record('UrgentActions', {
+    'overdue_tasks': int, 'tasks_due_today': int, 'tasks_due_this_week': int,
+})
+TaskForecast = record('TaskForecast', {
+    'completion_rate_forecast': float, 'productivity_improvement_potential': float,
+})
+TaskInsights = section('TaskInsights', {
+    'smart_prioritization': SmartPrioritization, 'success_prediction': TaskSuccessPrediction,
+    'urgent_actions': UrgentActions, 'predictive_insights': TaskForecast,
+})
+
+AgentPerformancePrediction = record('AgentPerformancePrediction', {
+    'agents_exceeding_targets': int, 'agents_needing_support': int,
+    'average_performance_improvement_potential': float,
+})
+CapacityOptimization = record('CapacityOptimization', {
+    'current_utilization_rate': float, 'underutilized_agents': List(int), 'overutilized_agents': List(int),
+})
+SkillsDevelopment = record('SkillsDevelopment', {
+    'agents_needing_training': List(int), 'training_impact_prediction': float,
+    'priority_training_areas': List(str),
+})
+BurnoutPrevention = record('BurnoutPrevention', {'high_burnout_risk_agents': List(int), 'wellness_score': float})
+AgentInsights = section('AgentInsights', {
+    'performance_prediction': AgentPerformancePrediction, 'capacity_optimization': CapacityOptimization,
+    'skills_development': SkillsDevelopment, 'burnout_prevention': BurnoutPrevention,
+})
+
+PipelineForecast = record('PipelineForecast', {
+    'total_pipeline_value': float, 'expected_revenue_next_quarter': float, 'high_probability_revenue': float,
+})
+ConversionOptimization = record('ConversionOptimization', {
+    'optimization_opportunities_count': int, 'total_revenue_at_risk': float, 'potential_revenue_uplift': float,
+})
+TimeToConversion = record('TimeToConversion', {
+    'average_conversion_time': float, 'fast_track_opportunities': int, 'stalled_deals_needing_attention': int,
+})
+ConversionForecast = record('ConversionForecast', {
+    'next_month_conversions_forecast': int, 'revenue_confidence_interval': List(float),
+    'seasonal_adjustment_factor': float, 'market_trend_impact': float,
+}, optional=('market_trend_impact',))
+ConversionInsights = section('ConversionInsights', {
+    'revenue_forecasting': PipelineForecast, 'conversion_optimization': ConversionOptimization,
+    'time_to_conversion': TimeToConversion, 'predictive_insights': ConversionForecast,
+})
+
+MarketIntelligence = record('MarketIntelligence', {
+    'top_opportunity_market': str, 'fastest_growing_market': str,
+    'highest_conversion_market': str, 'market_diversity_index': float,
+})
+ExpansionOpportunities = record('ExpansionOpportunities', {
+    'high_potential_markets': List(str), 'total_expansion_potential': str, 'underserved_markets': List(str),
+})
+MarketRisk = record('MarketRisk', {
+    'high_risk_markets': List(str), 'regulatory_challenges': List(str), 'competitive_pressures': List(str),
+})
+MarketForecast = record('MarketForecast', {'market_saturation_timeline': Map(str)})
+GeographicInsights = section('GeographicInsights', {
+    'market_intelligence': MarketIntelligence, 'expansion_opportunities': ExpansionOpportunities,
+    'risk_analysis': MarketRisk, 'predictive_analytics': MarketForecast,
+})
+
+MetaInsights = section('MetaInsights', {
+    'total_models_deployed': int, 'prediction_accuracy_average': float,
+    'optimization_potential_total': str, 'automation_opportunities': int,
+    'ai_confidence_score': float, 'last_model_update': str, 'next_model_refresh': str,
+    # stamped by crm.refresh when it publishes the document
+    'last_data_refresh': str, 'last_refresh_seconds': float, 'data_version': int,
+}, optional=('last_data_refresh', 'last_refresh_seconds', 'data_version'))
+
+INSIGHTS = {
+    'executive_summary': ExecutiveSummary,
+    'lead_status': LeadStatusInsights,
+    'call_activity': CallActivityInsights,
+    'tasks_followup': TaskInsights,
+    'agent_availability': AgentInsights,
+    'conversion': ConversionInsights,
+    'geographic': GeographicInsights,
+    'meta_insights': MetaInsights,
+}
+
+# -------------------------------
+# dashboard_data.json
+# -------------------------------
+DashboardSummary = section('DashboardSummary', {
+    'total_leads': int, 'total_calls': int, 'connected_calls': int, 'success_rate': float,
+    'total_revenue_potential': float, 'high_risk_leads': int, 'conversion_rate': float,
+    'agents_count': int, 'countries_coverage': int, 'avg_churn_risk': float,
+})
+Counts = section('Counts', {'counts': Map(int)}, wraps='counts')
+CountryStats = record('CountryStats', {'LeadId': int, 'Revenue_Potential': float, 'Churn_Risk': float},
+                      optional=('Churn_Risk',))
+AgentStats = record('AgentStats', {
+    'role': str, 'total_leads': int, 'hot_leads': int, 'won_leads': int, 'win_rate': float,
+})
+DailyCalls = record('DailyCalls', {'date': str, 'calls': int})
+HourlySuccess = record('HourlySuccess', {'hour': int, 'total_calls': int, 'success_rate': float})
+UpcomingTask = record('UpcomingTask', {
+    'lead_id': int, 'title': str, 'scheduled_date': str, 'days_until': int, 'agent_id': int,
+})
+FeatureImportance = record('FeatureImportance', {'Feature': str, 'Importance': float})
+ChurnPrediction = record('ChurnPrediction', {'high_risk_count': int, 'medium_risk_count': int, 'low_risk_count': int})
+ScoreConversion = record('ScoreConversion', {'Total_Leads': int, 'Won_Leads': int, 'Conversion_Rate': float})
+MlInsights = section('MlInsights', {
+    'feature_importance': List(FeatureImportance), 'churn_prediction': ChurnPrediction,
+    'conversion_predictions': Map(ScoreConversion),
+})
+DailyCallRows = section('DailyCallRows', {'rows': List(DailyCalls)}, wraps='rows')
+HourlySuccessRows = section('HourlySuccessRows', {'rows': List(HourlySuccess)}, wraps='rows')
+UpcomingTaskRows = section('UpcomingTaskRows', {'rows': List(UpcomingTask)}, wraps='rows')
+CountryRows = section('CountryRows', {'countries': Map(CountryStats)}, wraps='countries')
+AgentRows = section('AgentRows', {'agents': Map(AgentStats)}, wraps='agents')
+
+DASHBOARD = {
+    'executive_summary': DashboardSummary,
+    'lead_status': Counts,
+    'lead_stage': Counts,
+    'lead_scoring': Counts,
+    'geographic': CountryRows,
+    'agent_performance': AgentRows,
+    'call_activity': DailyCallRows,
+    'hourly_success': HourlySuccessRows,
+    'upcoming_tasks': UpcomingTaskRows,
+    'revenue_forecast': Counts,
+    'ml_insights': MlInsights,
+}
+
+DOCUMENTS = {
+    'comprehensive_ai_insights.json': INSIGHTS,
+    'dashboard_data.json': DASHBOARD,
+}
+
+
+def schema_for(source):
+    """The section schema of a document, chosen by its file name."""
+    try:
+        return DOCUMENTS[os.path.basename(source)]
+    except KeyError:
+        raise ValueError(f'no model for {source}') from None
+
+
+def check(source):
+    """Schema drift of a JSON document on disk."""
+    with open(source, 'r') as f:
+        payload = json.load(f)
+    return parse_document(schema_for(source), payload)[1]
+
+
+if __name__ == '__main__':
+    sources = sys.argv[1:] or [os.path.join('processed_data', name) for name in DOCUMENTS]
+    drifted = False
+    for source in sources:
+        drift = check(source)
+        drifted = drifted or bool(drift)
+        print(f'{source}: {len(drift)} drift' + ''.join(f'\n  {d}' for d in drift))
+    sys.exit(1 if drifted else 0)
@@ -0,0 +1,432 @@
+"""Embedded DuckDB query layer over the raw data/*.csv schema.
+
+The raw tables are loaded once into a DuckDB file under processed_data/.state
+and kept there between runs; a table is reloaded only when one of its source
+CSVs changes size or mtime. Page sections call the typed query functions
+below with a Filters value, and every filter and group-by is pushed down to
+the engine, so slicing by agent, country, date range or lead score never
+materializes the call history in pandas.
+
+LeadCall is stored denormalized with its lead's CountryId and LeadScoringId,
+so call queries filter on country or score without a join.
+
+Dashboard workers open the database shared and read-only (open_database
+with shared=True), so any number of replicas on one host query a single copy.
+Each data version is built into its own file (crm-<hash>.duckdb), so a new
+version never waits for readers of the old one to let go.
+
+    python -m crm.query [data_dir]      # (re)build the database
+"""
+import glob
+import hashlib
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:  # Windows: builders are not serialized
+    fcntl = None
+
+import duckdb
+import pandas as pd
+
+from crm import ingest
+
+DB_PATH = os.path.join('processed_data', '.state', 'crm.duckdb')
+
+# date_trunc parts call_activity accepts
+GRAINS = ['hour', 'day', 'week', 'month']
+
+LOOKUPS = {
+    'lead_status': 'LeadStatus', 'lead_stage': 'LeadStage', 'lead_scoring': 'LeadScoring',
+    'call_status': 'CallStatus', 'sentiment': 'Sentiment', 'country': 'Country',
+    'city_region': 'CityRegion', 'task_type': 'TaskType',
+}
+
+# table -> (source CSVs, SELECT with one {Source} placeholder per CSV)
+TABLES = {
+    'agent': (['Agent'], """
+        SELECT AgentId::INTEGER AS AgentId, FirstName || ' ' || LastName AS AgentName,
+               Role, CountryId::INTEGER AS CountryId, IsActive::TINYINT AS IsActive
+        FROM {Agent}"""),
+    'lead': (['Lead'], """
+        SELECT LeadId::INTEGER AS LeadId, LeadStatusId::TINYINT AS LeadStatusId,
+               LeadStageId::TINYINT AS LeadStageId, LeadScoringId::TINYINT AS LeadScoringId,
+               CountryId::INTEGER AS CountryId, CityRegionId::INTEGER AS CityRegionId,
+               AssignedAgentId::INTEGER AS AssignedAgentId, CreatedOn::TIMESTAMP AS CreatedOn
+        FROM {Lead}"""),
+    'lead_call': (['LeadCall', 'Lead'], """
+        SELECT c.LeadCallId::INTEGER AS LeadCallId, c.LeadId::INTEGER AS LeadId,
+               c.CallDateTime::TIMESTAMP AS CallDateTime,
+               c.DurationSeconds::INTEGER AS DurationSeconds,
+               c.CallStatusId::TINYINT AS CallStatusId, c.SentimentId::DOUBLE::TINYINT AS SentimentId,
+               c.AssignedAgentId::INTEGER AS AssignedAgentId,
+               l.CountryId::INTEGER AS CountryId, l.LeadScoringId::TINYINT AS LeadScoringId
+        FROM {LeadCall} c LEFT JOIN {Lead} l ON l.LeadId = c.LeadId"""),
+    'schedule': (['Schedule'], """
+        SELECT ScheduleId::INTEGER AS ScheduleId, LeadId::INTEGER AS LeadId,
+               TaskTypeId::TINYINT AS TaskTypeId, ScheduleTitle,
+               ScheduledDate::TIMESTAMP AS ScheduledDate,
+               TaskStatusId::TINYINT AS TaskStatusId,
+               AssignedAgentId::INTEGER AS AssignedAgentId
+        FROM {Schedule}"""),
+}
+for _table, _source in LOOKUPS.items():
+    _id, _name = ingest.LOOKUP_TABLES[_source]
+    TABLES[_table] = ([_source], f'SELECT {_id}::INTEGER AS {_id}, {_name} FROM {{{_source}}}')
+
+INDEXES = [
+    ('lead', 'LeadId'), ('lead', 'AssignedAgentId'), ('lead', 'CountryId'),
+    ('lead_call', 'LeadId'), ('lead_call', 'AssignedAgentId'),
+    ('lead_call', 'CallDateTime'), ('lead_call', 'CountryId'),
+    ('schedule', 'LeadId'), ('schedule', 'AssignedAgentId'),
+]
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _source_fingerprints(data_dir):
+    """{source: fingerprint} for every source CSV."""
+    current = {}
+    for sources, _ in TABLES.values():
+        for source in sources:
+            current[source] = _fingerprint(ingest._csv_path(data_dir, source))
+    return current
+
+
+def _changed_sources(con, data_dir):
+    """{source: fingerprint} for every source CSV and the set whose fingerprint
+    differs from the one the database was built from (reads only)."""
+    try:
+        known = dict(con.execute('SELECT name, fingerprint FROM _sources').fetchall())
+    except duckdb.CatalogException:
+        known = {}
+    current = _source_fingerprints(data_dir)
+    return current, {s for s, fp in current.items() if known.get(s) != fp}
+
+
+def build_database(con, data_dir=ingest.DATA_DIR, force=False):
+    """Create or refresh every table whose source CSVs changed.
+
+    Returns the list of tables that were (re)loaded.
+    """
+    con.execute('CREATE TABLE IF NOT EXISTS _sources (name VARCHAR PRIMARY KEY, fingerprint VARCHAR)')
+    current, changed = _changed_sources(con, data_dir)
+    if force:
+        changed = set(current)
+
+    rebuilt = []
+    for table, (sources, select) in TABLES.items():
+        if not changed.intersection(sources):
+            continue
+        # Paths are bound as named parameters, never spliced into the SQL.
+        readers = {s: f'read_csv(${s}, header=true, all_varchar=true)' for s in sources}
+        paths = {s: ingest._csv_path(data_dir, s) for s in sources}
+        con.execute(f'CREATE OR REPLACE TABLE {table} AS {select.format(**readers)}', paths)
+        rebuilt.append(table)
+    for table, column in INDEXES:
+        if table in rebuilt:
+            con.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})')
+    for source in changed:
+        con.execute('INSERT OR REPLACE INTO _sources VALUES (?, ?)', [source, current[source]])
+    return rebuilt
+
+
+def open_database(data_dir=ingest.DATA_DIR, db_path=DB_PATH, shared=False, prepare=()):
+    """Connection to an up-to-date database, building it if needed.
+
+    Falls back to an in-memory database when the file is locked by another
+    process (DuckDB allows one writer per file).
+
+    shared=True returns a read-only connection to the file for the current
+    data version (see versioned_path), so every worker on the host attaches
+    to one copy instead of loading its own. Whoever finds it missing builds
+    it and runs the prepare steps (fn(con) that create derived tables);
+    workers still reading an older version keep their file until they close.
+    """
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    if shared:
+        con = _attach_shared(data_dir, db_path, prepare)
+        if con is not None:
+            return con
+    try:
+        con = duckdb.connect(':memory:' if shared else db_path)
+    except duckdb.IOException:
+        con = duckdb.connect(':memory:')
+    build_database(con, data_dir)
+    for step in prepare:
+        step(con)
+    return con
+
+
+def versioned_path(data_dir=ingest.DATA_DIR, db_path=DB_PATH, prepare=()):
+    """db_path with a hash of the source fingerprints and prepare steps,
+    e.g. crm-1a2b3c4d5e6f7a8b.duckdb; the file at it is never modified."""
+    key = sorted(_source_fingerprints(data_dir).items())
+    key.append([f'{step.__module__}.{step.__qualname__}' for step in prepare])
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+    stem, ext = os.path.splitext(db_path)
+    return f'{stem}-{digest}{ext}'
+
+
+def _attach_shared(data_dir, db_path, prepare):
+    # The flock serializes builders, so a worker starting mid-build waits for
+    # it and then attaches to the finished file.
+    path = versioned_path(data_dir, db_path, prepare)
+    if not os.path.exists(path):
+        with open(f'{db_path}.lock', 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.exists(path):
+                _build_version(data_dir, path, prepare)
+                _collect_versions(db_path, keep=path)
+    try:
+        return duckdb.connect(path, read_only=True)
+    except duckdb.IOException:
+        return None
+
+
+def _build_version(data_dir, path, prepare):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        con = duckdb.connect(tmp)
+        try:
+            build_database(con, data_dir)
+            for step in prepare:
+                step(con)
+        finally:
+            con.close()
+        os.replace(tmp, path)
+    finally:
+        for leftover in (tmp, f'{tmp}.wal'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def _collect_versions(db_path, keep):
+    """Remove every other version of db_path. Readers still attached to one
+    keep reading it: on POSIX the file is freed when its last connection
+    closes. Where an open file cannot be removed (Windows) it is retried by
+    the next build."""
+    stem, ext = os.path.splitext(db_path)
+    for path in glob.glob(f'{glob.escape(stem)}-*{ext}') + glob.glob(f'{glob.escape(stem)}-*{ext}.*.tmp'):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# -------------------------------
+# FILTERS
+# -------------------------------
+@dataclass(frozen=True)
+class Filters:
+    """Slice applied to every query. Empty tuples / None mean "all"."""
+    agent_ids: tuple = ()
+    country_ids: tuple = ()
+    score_ids: tuple = ()
+    start: object = None
+    end: object = None
+
+
+def _where(filters, date_column, alias=''):
+    """SQL WHERE clause and parameters for filters against one table alias."""
+    prefix = f'{alias}.' if alias else ''
+    clauses, params = [], []
+    for column, values in (('AssignedAgentId', filters.agent_ids),
+                           ('CountryId', filters.country_ids),
+                           ('LeadScoringId', filters.score_ids)):
+        if values:
+            clauses.append(f'{prefix}{column} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+    if filters.start is not None:
+        clauses.append(f'{prefix}{date_column} >= ?')
+        params.append(filters.start)
+    if filters.end is not None:
+        clauses.append(f'{prefix}{date_column} < ?')
+        params.append(filters.end)
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+# -------------------------------
+# PAGE QUERIES
+# -------------------------------
+def lead_status_counts(con, filters=Filters()):
+    """Leads per status (lead_status page); dates filter on CreatedOn."""
+    where, params = _where(filters, 'CreatedOn', 'l')
+    return con.execute(f"""
+        SELECT s.StatusName_E AS status, count(*) AS leads
+        FROM lead l JOIN lead_status s USING (LeadStatusId)
+        {where}
+        GROUP BY status ORDER BY leads DESC
+    """, params).df()
+
+
+def call_activity(con, filters=Filters(), grain='day'):
+    """Calls, connected calls and success rate per time bucket (call_activity page)."""
+    if grain not in GRAINS:
+        raise ValueError(f'unknown grain {grain!r}; expected one of {GRAINS}')
+    where, params = _where(filters, 'CallDateTime', 'c')
+    return con.execute(f"""
+        SELECT date_trunc(?, c.CallDateTime) AS period,
+               count(*) AS calls,
+               count(*) FILTER (WHERE cs.StatusName_E = ?) AS connected,
+               round(100.0 * connected / calls, 2) AS success_rate
+        FROM lead_call c JOIN call_status cs USING (CallStatusId)
+        {where}
+        GROUP BY period ORDER BY period
+    """, [grain, ingest.CONNECTED_STATUS] + params).df()
+
+
+def hourly_success(con, filters=Filters()):
+    """Calls and success rate per hour of day (call_activity page)."""
+    where, params = _where(filters, 'CallDateTime', 'c')
+    return con.execute(f"""
+        SELECT hour(c.CallDateTime) AS hour,
+               count(*) AS total_calls,
+               round(100.0 * count(*) FILTER (WHERE cs.StatusName_E = ?) / count(*), 2) AS success_rate
+        FROM lead_call c JOIN call_status cs USING (CallStatusId)
+        {where}
+        GROUP BY hour ORDER BY hour
+    """, [ingest.CONNECTED_STATUS] + params).df()
+
+
+def geographic(con, filters=Filters()):
+    """Leads, hot leads and wins per country (geographic page)."""
+    where, params = _where(filters, 'CreatedOn', 'l')
+    return con.execute(f"""
+        SELECT co.CountryName_E AS country,
+               count(*) AS leads,
+               count(*) FILTER (WHERE sc.ScoreName_E = ?) AS hot_leads,
+               count(*) FILTER (WHERE st.StatusName_E = ?) AS won_leads
+        FROM lead l
+        JOIN country co USING (CountryId)
+        JOIN lead_scoring sc USING (LeadScoringId)
+        JOIN lead_status st USING (LeadStatusId)
+        {where}
+        GROUP BY country ORDER BY leads DESC
+    """, [ingest.HOT_SCORE, ingest.WON_STATUS] + params).df()
+
+
+# -------------------------------
+# PAGINATED GRIDS
+# -------------------------------
+# grid -> base table, alias, key, date column, sortable columns (label -> SQL)
+# and the SELECT producing the displayed columns. Filters and the keyset
+# condition apply to the base table only, so both can use its indexes.
+GRIDS = {
+    'leads': {
+        'table': 'lead', 'alias': 'l', 'key': 'l.LeadId', 'date': 'CreatedOn',
+        'sortable': {'LeadId': 'l.LeadId', 'Created': 'l.CreatedOn'},
+        'select': """
+            SELECT l.LeadId, st.StatusName_E AS Status, sg.StageName_E AS Stage,
+                   sc.ScoreName_E AS Score, co.CountryName_E AS Country,
+                   a.AgentName AS Agent, l.CreatedOn AS Created
+            FROM lead l
+            LEFT JOIN lead_status st USING (LeadStatusId)
+            LEFT JOIN lead_stage sg ON sg.LeadStageId = l.LeadStageId
+            LEFT JOIN lead_scoring sc ON sc.LeadScoringId = l.LeadScoringId
+            LEFT JOIN country co ON co.CountryId = l.CountryId
+            LEFT JOIN agent a ON a.AgentId = l.AssignedAgentId""",
+    },
+    'calls': {
+        'table': 'lead_call', 'alias': 'c', 'key': 'c.LeadCallId', 'date': 'CallDateTime',
+        'sortable': {'LeadCallId': 'c.LeadCallId', 'Time': 'c.CallDateTime', 'Duration': 'c.DurationSeconds'},
+        'select': """
+            SELECT c.LeadCallId, c.LeadId, c.CallDateTime AS Time, cs.StatusName_E AS Status,
+                   se.SentimentName_E AS Sentiment, c.DurationSeconds AS Duration,
+                   a.AgentName AS Agent
+            FROM lead_call c
+            LEFT JOIN call_status cs ON cs.CallStatusId = c.CallStatusId
+            LEFT JOIN sentiment se ON se.SentimentId = c.SentimentId
+            LEFT JOIN agent a ON a.AgentId = c.AssignedAgentId""",
+    },
+}
+
+
+def _plain(value):
+    """numpy / pandas scalar -> Python value DuckDB can bind (None for NaN / NaT)."""
+    if pd.isna(value):
+        return None
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def grid_page(con, grid, filters=Filters(), after=None, limit=50, sort=None, descending=False):
+    """One window of a grid, ordered by (sort column, key).
+
+    after is the keyset cursor (sort value, key) of the last row already
+    shown; the window starts right after it, so every page costs the same no
+    matter how deep. Rows with a NULL sort value come last (first when
+    descending). Returns (rows, cursor for the next page or None).
+    """
+    spec = GRIDS[grid]
+    key = spec['key']
+    order = spec['sortable'][sort] if sort else key
+    where, params = _where(filters, spec['date'], spec['alias'])
+    if after is not None:
+        op = '<' if descending else '>'
+        if order == key:
+            condition, extra = f'{key} {op} ?', [after[1]]
+        elif after[0] is None:
+            condition, extra = f'({order} IS NULL AND {key} {op} ?)', [after[1]]
+            if descending:
+                condition = f'({order} IS NOT NULL OR {condition})'
+        else:
+            condition, extra = f'({order} {op} ? OR ({order} = ? AND {key} {op} ?))', [after[0], after[0], after[1]]
+            if not descending:
+                condition = f'({order} IS NULL OR {condition})'
+        where = f'{where} AND {condition}' if where else f'WHERE {condition}'
+        params = params + extra
+    direction = 'DESC NULLS FIRST' if descending else 'ASC NULLS LAST'
+    select = spec['select'].replace('SELECT', f'SELECT {order} AS _sort, {key} AS _key,', 1)
+    rows = con.execute(f"""
+        {select}
+        {where}
+        ORDER BY {order} {direction}, {key} {direction}
+        LIMIT ?
+    """, params + [limit + 1]).df()
+    cursor = None
+    if len(rows) > limit:
+        rows = rows.iloc[:limit]
+        last = rows.iloc[-1]
+        cursor = (_plain(last['_sort']), _plain(last['_key']))
+    return rows.drop(columns=['_sort', '_key']), cursor
+
+
+def grid_count(con, grid, filters=Filters()):
+    """Exact row count of a filtered grid.
+
+    count(*) over the base table with the filters pushed down: DuckDB
+    answers it from the filter columns alone, a few ms at 1M rows.
+    """
+    spec = GRIDS[grid]
+    where, params = _where(filters, spec['date'], spec['alias'])
+    return int(con.execute(f"SELECT count(*) FROM {spec['table']} {spec['alias']} {where}", params).fetchone()[0])
+
+
+def filter_options(con):
+    """Choices for the filter widgets: {dimension: [(id, label), ...]}."""
+    return {
+        'agents': con.execute('SELECT AgentId, AgentName FROM agent ORDER BY AgentName').fetchall(),
+        'countries': con.execute('SELECT CountryId, CountryName_E FROM country ORDER BY 2').fetchall(),
+        'scores': con.execute('SELECT LeadScoringId, ScoreName_E FROM lead_scoring ORDER BY 1').fetchall(),
+        'sentiments': con.execute('SELECT SentimentId, SentimentName_E FROM sentiment ORDER BY 1').fetchall(),
+    }
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    con = open_database(sys.argv[1] if len(sys.argv) > 1 else ingest.DATA_DIR)
+    print(f'database ready in {time.perf_counter() - started:.3f}s')
+    for query in (lead_status_counts, call_activity, hourly_success, geographic):
+        started = time.perf_counter()
+        result = query(con)
+        print(f'{query.__name__}: {len(result)} rows in {(time.perf_counter() - started) * 1000:.1f} ms')
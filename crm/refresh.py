@@ -0,0 +1,202 @@
+"""Background refresh of the processed_data/ snapshots from data/.
+
+A RefreshService thread wakes on a fixed interval and rebuilds
+dashboard_data.json and comprehensive_ai_insights.json from the raw exports.
+The rebuild itself runs in a `python -m crm.refresh` child process so pandas
+work never competes with Streamlit script runs for the GIL; a child process
+(unlike a pool worker) may start the insight engine's own process pool.
+
+Publishing is atomic and ordered: each JSON file is written to a temporary
+name and renamed into place, the on-disk snapshots are warmed, and only then
+is version.json bumped. Sessions read version.json on every rerun and pass
+the version into their cached loaders, so they switch to the new data on
+their next rerun and always find its snapshots already built.
+
+Only one process per host publishes into an output directory at a time (an
+flock on <out_dir>/.state/refresh.lock where fcntl is available).
+
+    python -m crm.refresh                  # one rebuild, then exit
+    python -m crm.refresh --interval 900   # rebuild every 15 minutes
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, single-instance use only
+    fcntl = None
+
+from crm import incremental, ingest, insights, scoring, snapshots
+
+PROCESSED_DIR = snapshots.PROCESSED_DIR
+VERSION_FILE = snapshots.VERSION_FILE
+LOCK_FILE = 'refresh.lock'
+DASHBOARD_FILE = 'dashboard_data.json'
+INSIGHTS_FILE = 'comprehensive_ai_insights.json'
+CALL_ACTIVITY_DAYS = 30
+
+
+def write_json_atomic(path, payload):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build_dashboard(data_dir, out_dir, scores=None):
+    """Fresh dashboard_data.json payload; keys we do not compute are kept.
+
+    Call totals come from the incremental aggregator, which reads only the
+    LeadCall rows appended since the last rebuild; the lead sections are
+    computed in full, with revenue and churn from scores (the crm.scoring
+    model when None).
+    """
+    if scores is None:
+        scores = scoring.score_leads(data_dir)
+    dashboard = _read_json(os.path.join(out_dir, DASHBOARD_FILE))
+    aggregator = incremental.IncrementalAggregator(
+        data_dir, os.path.join(out_dir, '.state', os.path.basename(incremental.STATE_PATH)))
+    aggregator.refresh()
+    model, _ = ingest.build_dashboard_model(data_dir, trace_memory=False, calls=aggregator.accumulator(),
+                                           scores=scores)
+    calls = aggregator.sections(days=CALL_ACTIVITY_DAYS)
+    dashboard.update(model)
+    dashboard['executive_summary'].update(calls['executive_summary'])
+    dashboard['call_activity'] = calls['call_activity']
+    dashboard['upcoming_tasks'] = calls['upcoming_tasks']
+    return dashboard
+
+
+def build_insights(data_dir, out_dir, workers=None, scores=None):
+    """Fresh comprehensive_ai_insights.json payload; sections we do not compute are kept."""
+    document = _read_json(os.path.join(out_dir, INSIGHTS_FILE))
+    sections, _ = insights.run(data_dir, workers, scores)
+    document.update(sections)  # whole sections, so fields a producer dropped do not linger
+    return document
+
+
+def rebuild(data_dir=ingest.DATA_DIR, out_dir=PROCESSED_DIR):
+    """Rebuild and publish both documents; returns the new version record.
+
+    The leads are scored once and both documents take their revenue and
+    churn from those scores, so the pages agree.
+    """
+    started = time.perf_counter()
+    scores = scoring.score_leads(data_dir)
+    dashboard = build_dashboard(data_dir, out_dir, scores)
+    document = build_insights(data_dir, out_dir, scores=scores)
+    seconds = round(time.perf_counter() - started, 3)
+
+    previous = snapshots.read_version(out_dir)
+    record = {
+        'version': previous['version'] + 1,
+        'published_at': datetime.now().isoformat(timespec='seconds'),
+        'duration_seconds': seconds,
+    }
+    meta = document.setdefault('meta_insights', {})
+    meta['last_data_refresh'] = record['published_at']
+    meta['last_refresh_seconds'] = seconds
+    meta['data_version'] = record['version']
+
+    write_json_atomic(os.path.join(out_dir, DASHBOARD_FILE), dashboard)
+    write_json_atomic(os.path.join(out_dir, INSIGHTS_FILE), document)
+    snapshots.store_for(out_dir).refresh(*snapshots.sources_in(out_dir))
+    write_json_atomic(os.path.join(out_dir, VERSION_FILE), record)
+    return record
+
+
+class _PublishLock:
+    """Non-blocking per-host lock on out_dir; acquired is False if another
+    process holds it."""
+
+    def __init__(self, out_dir=PROCESSED_DIR):
+        self.path = os.path.join(out_dir, '.state', LOCK_FILE)
+        self.file = None
+        self.acquired = False
+
+    def __enter__(self):
+        if fcntl is None:
+            self.acquired = True
+            return self
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, 'w')
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.acquired = True
+        except OSError:
+            self.acquired = False
+        return self
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            self.file.close()
+
+
+class RefreshService:
+    """Daemon thread that calls rebuild() every `interval` seconds."""
+
+    def __init__(self, data_dir=ingest.DATA_DIR, out_dir=PROCESSED_DIR, interval=900):
+        self.data_dir = data_dir
+        self.out_dir = out_dir
+        self.interval = interval
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='crm-refresh', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _command(self):
+        return [sys.executable, '-m', 'crm.refresh',
+                '--data-dir', os.path.abspath(self.data_dir), '--out-dir', os.path.abspath(self.out_dir)]
+
+    def _run(self):
+        # A fresh interpreter, not fork: forking a process that is running
+        # server threads can deadlock. The child takes the publish lock itself.
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        while not self._stop.is_set():
+            done = subprocess.run(self._command(), cwd=root, capture_output=True, text=True)
+            if done.returncode == 0 or 'another refresh' in done.stderr:
+                self.last_error = None
+            else:  # keep the service alive; surface via last_error
+                self.last_error = done.stderr.strip().splitlines()[-1] if done.stderr.strip() else f'exit {done.returncode}'
+            self._stop.wait(self.interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--data-dir', default=ingest.DATA_DIR)
+    parser.add_argument('--out-dir', default=PROCESSED_DIR)
+    parser.add_argument('--interval', type=float, default=0,
+                        help='seconds between rebuilds; 0 rebuilds once and exits')
+    args = parser.parse_args()
+    if args.interval > 0:
+        service = RefreshService(args.data_dir, args.out_dir, args.interval).start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            service.stop()
+    else:
+        with _PublishLock(args.out_dir) as lock:
+            if not lock.acquired:
+                raise SystemExit('another refresh is publishing; try again later')
+            print(json.dumps(rebuild(args.data_dir, args.out_dir)))
@@ -0,0 +1,279 @@
+"""Follow-up task scheduler over Schedule.csv.
+
+Open tasks live in one binary heap per agent keyed by (ScheduledDate,
+-priority, ScheduleId), so insert, complete and reschedule are O(log n):
+completing or moving a task drops it from the id map and leaves a dead heap
+entry that is skipped on read and swept out once dead entries outnumber live
+ones. "Next N tasks for agent X" walks the heap top-down in O(N log N)
+without popping it.
+
+Due-date counts (overdue, due today, due this week) come from Fenwick trees
+over day buckets, one overall and one per agent, so they cost O(log days)
+regardless of how many tasks are open.
+
+sync() streams only the Schedule.csv rows appended since the previous call
+(crm.incremental.read_appended). A row whose ScheduleId is already known is
+an update: a new date reschedules the task, a closed status completes it.
+Priority is the lead's churn urgency and deal size from crm.scoring.
+
+    python -m crm.scheduler [data_dir] [--agent ID] [--top N]
+"""
+import argparse
+import heapq
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from crm import incremental, ingest, scoring
+
+CLOSED_TASK_STATUSES = ingest.CLOSED_TASK_STATUSES  # dropped on load/sync
+WEEK_DAYS = 7
+DAY_NS = 86_400 * 10 ** 9
+TASK_COLUMNS = {
+    'ScheduleId': 'int32', 'LeadId': 'int32', 'ScheduleTitle': 'string',
+    'ScheduledDate': None, 'TaskStatusId': 'Int8', 'AssignedAgentId': 'int32',
+}
+
+
+def task_priority(churn_risk, revenue_potential):
+    """0-1 priority: equal parts churn urgency and deal size (vs the largest)."""
+    churn = np.nan_to_num(np.asarray(churn_risk, dtype=float), nan=50.0)
+    revenue = np.nan_to_num(np.asarray(revenue_potential, dtype=float))
+    peak = revenue.max() if len(revenue) and revenue.max() > 0 else 1.0
+    return 0.5 * churn / 100 + 0.5 * revenue / peak
+
+
+class Fenwick:
+    """Counts per day bucket with O(log n) point update and prefix sum."""
+
+    def __init__(self, counts):
+        self.counts = np.asarray(counts, dtype=np.int64).copy()
+        tree = np.concatenate([[0], self.counts])
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree.tolist()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, i, delta):
+        if i >= len(self.counts):
+            grown = np.zeros(max(2 * len(self.counts), i + 1), dtype=np.int64)
+            grown[:len(self.counts)] = self.counts
+            self.__init__(grown)
+        self.counts[i] += delta
+        i += 1
+        tree = self.tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Sum of buckets [0, i]."""
+        i = min(i, len(self.counts) - 1) + 1
+        total = 0
+        tree = self.tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range(self, lo, hi):
+        """Sum of buckets [lo, hi]."""
+        if hi < lo or hi < 0:
+            return 0
+        return self.prefix(hi) - (self.prefix(lo - 1) if lo > 0 else 0)
+
+
+class TaskScheduler:
+    """Per-agent task heaps plus day-bucket counters; thread-safe."""
+
+    def __init__(self, lead_priority=None, closed_statuses=CLOSED_TASK_STATUSES):
+        self.lead_priority = lead_priority if lead_priority is not None else pd.Series(dtype=float)
+        self.closed_statuses = set(closed_statuses)
+        self.heaps = {}
+        self.dead = {}
+        self.entries = {}
+        self.base_ns = None
+        self.days = Fenwick([])
+        self.agent_days = {}
+        self.source = {'offset': 0, 'header': None}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_data(cls, data_dir=ingest.DATA_DIR, closed_statuses=CLOSED_TASK_STATUSES):
+        scores = scoring.score_leads(data_dir)
+        priority = pd.Series(task_priority(scores['Churn_Risk'], scores['Revenue_Potential']),
+                             index=scores['LeadId'].to_numpy())
+        return cls(priority, closed_statuses).sync(data_dir)
+
+    # -------------------------------
+    # UPDATES
+    # -------------------------------
+    def _day(self, due_ns):
+        # Tasks due before the first loaded day share bucket 0 (always overdue).
+        return max(int((due_ns - self.base_ns) // DAY_NS), 0)
+
+    def _count(self, agent_id, day, delta):
+        self.days.add(day, delta)
+        per_agent = self.agent_days.get(agent_id)
+        if per_agent is None:
+            per_agent = self.agent_days[agent_id] = Fenwick(np.zeros(len(self.days), dtype=np.int64))
+        per_agent.add(day, delta)
+
+    def add(self, schedule_id, agent_id, lead_id, due, title='', priority=None):
+        """Insert a task, or move it if schedule_id is already scheduled."""
+        with self._lock:
+            self.complete(schedule_id)
+            due_ns = pd.Timestamp(due).value
+            if self.base_ns is None:
+                self.base_ns = due_ns - due_ns % DAY_NS
+            if priority is None:
+                priority = float(self.lead_priority.get(lead_id, 0.0))
+            entry = (due_ns, -priority, int(schedule_id), int(agent_id), int(lead_id), str(title))
+            self.entries[entry[2]] = entry
+            heapq.heappush(self.heaps.setdefault(entry[3], []), entry)
+            self._count(entry[3], self._day(due_ns), 1)
+
+    def complete(self, schedule_id):
+        """Remove a task; returns False if it was not scheduled."""
+        with self._lock:
+            entry = self.entries.pop(int(schedule_id), None)
+            if entry is None:
+                return False
+            agent = entry[3]
+            self._count(agent, self._day(entry[0]), -1)
+            self.dead[agent] = self.dead.get(agent, 0) + 1
+            heap = self.heaps[agent]
+            if self.dead[agent] > len(heap) // 2:
+                heap[:] = [e for e in heap if self.entries.get(e[2]) is e]
+                heapq.heapify(heap)
+                self.dead[agent] = 0
+            return True
+
+    def reschedule(self, schedule_id, due, agent_id=None):
+        """Move a task to a new due date (and optionally another agent)."""
+        with self._lock:
+            entry = self.entries[int(schedule_id)]
+            self.add(schedule_id, entry[3] if agent_id is None else agent_id, entry[4], due,
+                     entry[5], -entry[1])
+
+    def _bulk_load(self, tasks):
+        """Build every heap and counter at once (first load of a large table)."""
+        tasks = ingest.open_tasks(tasks, tuple(self.closed_statuses))
+        if tasks.empty:
+            return
+        due = tasks['ScheduledDate'].to_numpy(dtype='datetime64[ns]').view('int64')
+        self.base_ns = int(due.min() - due.min() % DAY_NS)
+        lead = tasks['LeadId'].to_numpy()
+        priority = self.lead_priority.reindex(lead).fillna(0.0).to_numpy()
+        agent = tasks['AssignedAgentId'].to_numpy()
+        day = (due - self.base_ns) // DAY_NS
+        size = int(day.max()) + 1
+        self.days = Fenwick(np.bincount(day, minlength=size))
+        for entry in zip(due.tolist(), (-priority).tolist(), tasks['ScheduleId'].tolist(), agent.tolist(),
+                         lead.tolist(), tasks['ScheduleTitle'].astype(str).tolist()):
+            self.entries[entry[2]] = entry
+            self.heaps.setdefault(entry[3], []).append(entry)
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+        order = np.argsort(agent, kind='stable')
+        agents, starts = np.unique(agent[order], return_index=True)
+        for agent_id, rows in zip(agents.tolist(), np.split(order, starts[1:])):
+            self.agent_days[agent_id] = Fenwick(np.bincount(day[rows], minlength=size))
+
+    def _apply(self, tasks):
+        closed = (tasks['TaskStatusId'].isin(self.closed_statuses) | tasks['ScheduledDate'].isna()).to_numpy()
+        for row, done in zip(tasks.itertuples(index=False), closed):
+            if done:
+                self.complete(row.ScheduleId)
+            else:
+                self.add(row.ScheduleId, row.AssignedAgentId, row.LeadId, row.ScheduledDate, row.ScheduleTitle)
+
+    def _sync(self, path):
+        batches = incremental.read_appended(path, self.source['offset'], self.source['header'], TASK_COLUMNS)
+        while True:
+            try:
+                batch = next(batches)
+            except StopIteration as done:
+                self.source['offset'], self.source['header'] = done.value
+                return
+            if self.entries:
+                self._apply(batch)
+            else:
+                self._bulk_load(batch)
+
+    def sync(self, data_dir=ingest.DATA_DIR):
+        """Fold Schedule.csv rows appended since the last sync; returns self.
+
+        A re-exported (not appended) file resets the scheduler and reloads it.
+        """
+        path = ingest._csv_path(data_dir, 'Schedule')
+        with self._lock:
+            try:
+                self._sync(path)
+            except incremental.SourceChanged:
+                # Not an append: rebuild from the start of the file, once.
+                self.__init__(self.lead_priority, self.closed_statuses)
+                self._sync(path)
+        return self
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    def next_tasks(self, agent_id, n=5):
+        """The agent's n most urgent open tasks (earliest due, then highest priority)."""
+        with self._lock:
+            heap = self.heaps.get(agent_id, [])
+            result, frontier = [], [(heap[0], 0)] if heap else []
+            while frontier and len(result) < n:
+                entry, i = heapq.heappop(frontier)
+                if self.entries.get(entry[2]) is entry:
+                    result.append(entry)
+                for child in (2 * i + 1, 2 * i + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+            return [{
+                'schedule_id': e[2], 'agent_id': e[3], 'lead_id': e[4], 'title': e[5],
+                'scheduled_date': pd.Timestamp(e[0]).strftime('%Y-%m-%d %H:%M:%S'),
+                'priority': round(-e[1], 3),
+            } for e in result]
+
+    def counts(self, now=None, agent_id=None):
+        """Open tasks overdue, due today and due in the next WEEK_DAYS days."""
+        with self._lock:
+            tree = self.days if agent_id is None else self.agent_days.get(agent_id)
+            if tree is None or self.base_ns is None or not len(tree):
+                return {'overdue': 0, 'today': 0, 'this_week': 0, 'open': 0}
+            today = int((pd.Timestamp(now or datetime.now()).normalize().value - self.base_ns) // DAY_NS)
+            return {
+                'overdue': tree.prefix(today - 1) if today > 0 else 0,
+                'today': tree.range(max(today, 0), today),
+                'this_week': tree.range(max(today, 0), today + WEEK_DAYS - 1),
+                'open': tree.prefix(len(tree) - 1),
+            }
+
+    def __len__(self):
+        return len(self.entries)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('data_dir', nargs='?', default=ingest.DATA_DIR)
+    parser.add_argument('--agent', type=int, help='agent to list tasks for (default: the first)')
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    scheduler = TaskScheduler.from_data(args.data_dir)
+    print(f'{len(scheduler):,} open tasks for {len(scheduler.heaps):,} agents '
+          f'loaded in {time.perf_counter() - started:.2f}s', file=sys.stderr)
+    print(scheduler.counts())
+    agent = args.agent if args.agent is not None else min(scheduler.heaps, default=None)
+    for task in scheduler.next_tasks(agent, args.top):
+        print(task)
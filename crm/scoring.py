@@ -0,0 +1,259 @@
+"""Vectorized lead scoring: engagement score, band, win probability, churn
+risk and revenue potential for every lead.
+
+Per-lead features are folded out of Lead, LeadCall and Schedule with
+bincounts over positional lead indices (LeadCall is streamed in chunks), and
+the model itself is a handful of whole-column array expressions, so scoring
+millions of leads takes seconds. Scores are on the LeadScoring.csv scale
+(0-20) and mapped to bands with a sorted-boundary search over the bands'
+MinScore, so editing the LeadScoring table re-bands without code changes.
+
+score_frame() is the batch API; score_lead() scores a single lead's feature
+mapping with the same expressions, and lead_features() fetches one lead's
+features from the crm.query database for on-demand rescoring.
+
+    python -m crm.scoring [data_dir] [--out scores.csv]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from crm import ingest
+
+CLOSED_LOST = ('Lost', 'Not Interested')
+POSITIVE, NEGATIVE = 'Positive', 'Negative'
+
+# Score points (0-20 scale)
+BASE_POINTS = 4.0
+CONNECTED_POINTS, CONNECTED_CAP = 1.5, 4
+SENTIMENT_POINTS = 4.0
+RECENCY_POINTS, RECENCY_HALF_LIFE_DAYS = 4.0, 14
+TASK_POINTS, TASK_CAP = 1.5, 2
+STAGE_POINTS = 1.0
+AGE_PENALTY_DAYS, AGE_PENALTY_CAP = 30, 2.0
+
+# Win probability: logistic in the score, centred on the WARM band.
+PROBABILITY_MIDPOINT, PROBABILITY_SCALE = 12.0, 2.5
+
+# Churn risk: logistic in silence, negative sentiment and follow-up coverage.
+CHURN_BIAS = -0.5
+CHURN_SILENCE_WEIGHT, CHURN_SILENCE_DAYS = 1.2, 30
+CHURN_NEGATIVE_WEIGHT = 2.0
+CHURN_POSITIVE_WEIGHT = 1.5
+CHURN_TASK_WEIGHT = 0.8
+WON_CHURN_FACTOR = 0.3
+
+CALL_COLUMNS = ['LeadId', 'CallDateTime', 'CallStatusId', 'SentimentId']
+BAND_REVENUE = {'HOT': 60_000, 'WARM': 40_000, 'COLD': 20_000, 'DEAD': 0}
+REVENUE_STEP, REVENUE_STEP_CAP = 20_000, 2
+
+FEATURE_COLUMNS = ['LeadId', 'LeadStageId', 'StatusName_E', 'DaysSinceCreation', 'Calls',
+                   'Connected', 'Positive', 'Negative', 'DaysSinceContact', 'OpenTasks']
+
+
+def load_bands(data_dir=ingest.DATA_DIR):
+    """Active LeadScoring bands as (MinScore ascending, band names)."""
+    bands = pd.read_csv(ingest._csv_path(data_dir, 'LeadScoring'),
+                        usecols=['ScoreName_E', 'MinScore', 'IsActive'])
+    bands = bands[bands['IsActive'] == 1].sort_values('MinScore')
+    return bands['MinScore'].to_numpy(dtype=float), bands['ScoreName_E'].to_numpy(dtype=object)
+
+
+def band_of(scores, bands):
+    """Band name per score: the band with the greatest MinScore <= score."""
+    mins, names = bands
+    index = (np.searchsorted(mins, scores, side='right') - 1).clip(0, len(mins) - 1)
+    return pd.Categorical.from_codes(index, categories=pd.Index(names))
+
+
+# -------------------------------
+# FEATURES
+# -------------------------------
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def build_features(data_dir=ingest.DATA_DIR, as_of=None, chunk_rows=ingest.CALL_CHUNK_ROWS, tables=None,
+                   call_chunks=None):
+    """One row per lead with the FEATURE_COLUMNS.
+
+    as_of defaults to the latest lead creation or call in the export, so a
+    stale export is scored as of its own last activity. tables reuses an
+    ingest.load_tables() result; call_chunks, an iterable of LeadCall
+    DataFrames with CALL_COLUMNS, replaces the LeadCall.csv scan.
+    """
+    tables = tables or ingest.load_tables(data_dir)
+    lead = tables['Lead']
+    n = len(lead)
+    lead_index = pd.Index(lead['LeadId'])
+    sentiment_ids, sentiment_names = tables['Sentiment']
+    names = list(sentiment_names)
+    positive_id = sentiment_ids[names.index(POSITIVE)] if POSITIVE in names else -1
+    negative_id = sentiment_ids[names.index(NEGATIVE)] if NEGATIVE in names else -1
+    connected_id = ingest.connected_status_id(tables)
+
+    calls = np.zeros(n)
+    connected = np.zeros(n)
+    positive = np.zeros(n)
+    negative = np.zeros(n)
+    last_call = np.full(n, np.iinfo('int64').min, dtype='int64')
+    if call_chunks is None:
+        call_chunks = ingest.iter_calls(data_dir, chunk_rows, columns=CALL_COLUMNS)
+    for chunk in call_chunks:
+        pos = lead_index.get_indexer(chunk['LeadId'])
+        keep = pos >= 0
+        pos = pos[keep]
+        sentiment = chunk['SentimentId'].to_numpy(dtype='int64', na_value=-1)[keep]
+        calls += np.bincount(pos, minlength=n)
+        connected += np.bincount(pos, weights=chunk['CallStatusId'].to_numpy()[keep] == connected_id, minlength=n)
+        positive += np.bincount(pos, weights=sentiment == positive_id, minlength=n)
+        negative += np.bincount(pos, weights=sentiment == negative_id, minlength=n)
+        np.maximum.at(last_call, pos, chunk['CallDateTime'].to_numpy(dtype='datetime64[ns]')[keep].view('int64'))
+
+    if as_of is None:
+        latest = [lead['CreatedOn'].max()]
+        if (last_call > np.iinfo('int64').min).any():
+            latest.append(pd.Timestamp(last_call.max()))
+        as_of = max(t for t in latest if pd.notna(t))
+    as_of = pd.Timestamp(as_of)
+
+    schedule = tables['Schedule']
+    upcoming = (schedule['ScheduledDate'] >= as_of).to_numpy()
+    task_pos = lead_index.get_indexer(schedule['LeadId'])
+    open_tasks = np.bincount(task_pos[(task_pos >= 0) & upcoming], minlength=n)
+
+    day_ns = 86_400 * 10 ** 9
+    age = (as_of.value - lead['CreatedOn'].to_numpy(dtype='datetime64[ns]').view('int64')) / day_ns
+    silence = np.where(calls > 0, (as_of.value - last_call) / day_ns, age)
+    return pd.DataFrame({
+        'LeadId': lead['LeadId'].to_numpy(),
+        'LeadStageId': lead['LeadStageId'].to_numpy(),
+        'StatusName_E': ingest.resolve(lead['LeadStatusId'], tables['LeadStatus']),
+        'DaysSinceCreation': np.maximum(age, 0).astype('float32'),
+        'Calls': calls.astype('int32'),
+        'Connected': connected.astype('int32'),
+        'Positive': positive.astype('int32'),
+        'Negative': negative.astype('int32'),
+        'DaysSinceContact': np.maximum(silence, 0).astype('float32'),
+        'OpenTasks': open_tasks.astype('int32'),
+    })
+
+
+def lead_features(con, lead_id, as_of):
+    """FEATURE_COLUMNS for one lead from the crm.query database, or None."""
+    row = con.execute("""
+        SELECT l.LeadId, l.LeadStageId, s.StatusName_E,
+               date_diff('second', l.CreatedOn, $as_of) / 86400.0,
+               count(c.LeadCallId),
+               count(c.LeadCallId) FILTER (WHERE cs.StatusName_E = $connected),
+               count(c.LeadCallId) FILTER (WHERE se.SentimentName_E = $positive),
+               count(c.LeadCallId) FILTER (WHERE se.SentimentName_E = $negative),
+               date_diff('second', coalesce(max(c.CallDateTime), l.CreatedOn), $as_of) / 86400.0,
+               (SELECT count(*) FROM schedule t WHERE t.LeadId = l.LeadId AND t.ScheduledDate >= $as_of)
+        FROM lead l
+        LEFT JOIN lead_status s USING (LeadStatusId)
+        LEFT JOIN lead_call c ON c.LeadId = l.LeadId
+        LEFT JOIN call_status cs ON cs.CallStatusId = c.CallStatusId
+        LEFT JOIN sentiment se ON se.SentimentId = c.SentimentId
+        WHERE l.LeadId = $lead_id
+        GROUP BY l.LeadId, l.LeadStageId, s.StatusName_E, l.CreatedOn""", {
+        'lead_id': int(lead_id), 'as_of': pd.Timestamp(as_of).to_pydatetime(),
+        'connected': ingest.CONNECTED_STATUS, 'positive': POSITIVE, 'negative': NEGATIVE,
+    }).fetchone()
+    if row is None:
+        return None
+    features = dict(zip(FEATURE_COLUMNS, row))
+    features['DaysSinceCreation'] = max(features['DaysSinceCreation'], 0)
+    features['DaysSinceContact'] = max(features['DaysSinceContact'], 0)
+    return features
+
+
+# -------------------------------
+# MODEL
+# -------------------------------
+def score_frame(features, bands):
+    """Batch API: score every row of a features frame.
+
+    Returns LeadId, Score, ScoreName_E, Conversion_Probability, Churn_Risk
+    and Revenue_Potential.
+    """
+    calls = features['Calls'].to_numpy(dtype=float)
+    connected = features['Connected'].to_numpy(dtype=float)
+    positive = features['Positive'].to_numpy(dtype=float)
+    negative = features['Negative'].to_numpy(dtype=float)
+    silence = features['DaysSinceContact'].to_numpy(dtype=float)
+    age = features['DaysSinceCreation'].to_numpy(dtype=float)
+    open_tasks = features['OpenTasks'].to_numpy(dtype=float)
+    stage = features['LeadStageId'].to_numpy(dtype=float)
+    status = features['StatusName_E']
+    won = (status == ingest.WON_STATUS).to_numpy()
+    lost = status.isin(CLOSED_LOST).to_numpy()
+
+    per_call = np.maximum(calls, 1)
+    score = (BASE_POINTS
+             + CONNECTED_POINTS * np.minimum(connected, CONNECTED_CAP)
+             + SENTIMENT_POINTS * (positive - negative) / per_call
+             + RECENCY_POINTS * np.exp2(-silence / RECENCY_HALF_LIFE_DAYS)
+             + TASK_POINTS * np.minimum(open_tasks, TASK_CAP)
+             + STAGE_POINTS * np.maximum(stage - 1, 0)
+             - np.minimum(age / AGE_PENALTY_DAYS, AGE_PENALTY_CAP))
+    score = np.clip(score, 0, 20)
+
+    probability = _sigmoid((score - PROBABILITY_MIDPOINT) / PROBABILITY_SCALE)
+    probability = np.where(won, 1.0, np.where(lost, 0.0, probability))
+
+    churn = _sigmoid(CHURN_BIAS
+                     + CHURN_SILENCE_WEIGHT * silence / CHURN_SILENCE_DAYS
+                     + CHURN_NEGATIVE_WEIGHT * negative / per_call
+                     - CHURN_POSITIVE_WEIGHT * positive / per_call
+                     - CHURN_TASK_WEIGHT * np.minimum(open_tasks, 1)) * 100
+    churn = np.where(won, churn * WON_CHURN_FACTOR, churn)
+
+    band = band_of(score, bands)
+    base = pd.Series(BAND_REVENUE).reindex(band.categories).fillna(0).to_numpy()[band.codes]
+    revenue = base + REVENUE_STEP * np.minimum(positive, REVENUE_STEP_CAP) * (base > 0)
+
+    return pd.DataFrame({
+        'LeadId': features['LeadId'].to_numpy(),
+        'Score': score.round(2).astype('float32'),
+        'ScoreName_E': band,
+        'Conversion_Probability': probability.round(4).astype('float32'),
+        'Churn_Risk': churn.round(1).astype('float32'),
+        'Revenue_Potential': revenue.astype('float64'),
+    })
+
+
+def score_lead(features, bands):
+    """Single-lead API: score one FEATURE_COLUMNS mapping; returns a dict."""
+    frame = pd.DataFrame({c: [features[c]] for c in FEATURE_COLUMNS})
+    row = score_frame(frame, bands).iloc[0]
+    return {
+        'LeadId': int(row['LeadId']), 'Score': float(row['Score']),
+        'ScoreName_E': str(row['ScoreName_E']),
+        'Conversion_Probability': float(row['Conversion_Probability']),
+        'Churn_Risk': float(row['Churn_Risk']), 'Revenue_Potential': float(row['Revenue_Potential']),
+    }
+
+
+def score_leads(data_dir=ingest.DATA_DIR, as_of=None):
+    """Features and scores for every lead in data_dir."""
+    return score_frame(build_features(data_dir, as_of), load_bands(data_dir))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('data_dir', nargs='?', default=ingest.DATA_DIR)
+    parser.add_argument('--out', help='write per-lead scores as CSV')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    scores = score_leads(args.data_dir)
+    seconds = time.perf_counter() - started
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        scores.to_csv(args.out, index=False)
+    print(scores['ScoreName_E'].value_counts().to_string())
+    print(f'scored {len(scores):,} leads in {seconds:.2f}s', file=sys.stderr)
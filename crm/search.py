@@ -0,0 +1,266 @@
+"""Full-text search over call summaries, objections, projects and lead notes.
+
+An embedded SQLite FTS5 index (processed_data/.state/search.sqlite) holds
+one document per call (CallSummary, KeyObjectionRaised, ProjectDiscussed)
+and one per lead (Notes, name, company, interested region), each next to a
+plain metadata table keyed by the same rowid (agent, lead country/score,
+sentiment, timestamp) so filters are joins on the matches rather than scans.
+
+LeadCall.csv is append-only, so sync() indexes only the rows past the byte
+offset it stopped at last time (crm.incremental.read_appended); a re-export
+clears the call index and rebuilds it. Lead.csv rows are edited in place, so
+the lead index is rebuilt whenever the file changes.
+
+Queries take plain words (all must match, "word*" for a prefix) and
+"quoted phrases", and return the best bm25 matches with a highlighted
+snippet. Every match that passes the filters is scored and SQLite keeps the
+top `limit` as it goes, so a term in half of a million summaries ranks in
+about 150 ms.
+
+    python -m crm.search [data_dir] QUERY [--agent ID] [--limit N]
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from crm import incremental, ingest, query
+
+INDEX_PATH = os.path.join('processed_data', '.state', 'search.sqlite')
+CALL_COLUMNS = {
+    'LeadCallId': 'int32', 'LeadId': 'Int32', 'CallDateTime': None, 'SentimentId': 'float32',
+    'AssignedAgentId': 'Int32', 'CallSummary': 'string', 'KeyObjectionRaised': 'string',
+    'ProjectDiscussed': 'string',
+}
+LEAD_COLUMNS = {
+    'LeadId': 'int32', 'FullName': 'string', 'Company': 'string', 'Notes': 'string',
+    'InterestedRegion': 'string', 'AssignedAgentId': 'Int32', 'CountryId': 'Int32',
+    'LeadScoringId': 'Int32', 'CreatedOn': None,
+}
+# bm25 column weights: an objection or project hit says more than a summary hit.
+CALL_WEIGHTS = (1.0, 2.0, 1.5)
+LEAD_WEIGHTS = (2.0, 1.0, 1.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS _sources (name TEXT PRIMARY KEY, byte_offset INTEGER, header TEXT,
+                                     last_id INTEGER, fingerprint TEXT);
+CREATE TABLE IF NOT EXISTS call_meta (id INTEGER PRIMARY KEY, lead_id INTEGER, agent_id INTEGER,
+                                      sentiment_id INTEGER, called_at TEXT);
+CREATE INDEX IF NOT EXISTS idx_call_meta_lead ON call_meta (lead_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS call_text USING fts5(summary, objection, project,
+                                                        tokenize='porter unicode61');
+CREATE TABLE IF NOT EXISTS lead_meta (id INTEGER PRIMARY KEY, agent_id INTEGER, country_id INTEGER,
+                                      score_id INTEGER, created_at TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS lead_text USING fts5(name, company, notes, region,
+                                                        tokenize='porter unicode61');
+"""
+
+
+def to_match(text):
+    """FTS5 MATCH expression for user input: quoted phrases and words, all required."""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase.strip():
+            terms.append('"' + phrase.replace('"', '') + '"')
+            continue
+        prefix = word.endswith('*')
+        word = re.sub(r'[^\w]+', ' ', word).strip()
+        for part in word.split():
+            terms.append(f'"{part}"' + ('*' if prefix and part == word.split()[-1] else ''))
+    return ' AND '.join(terms)
+
+
+def _ids(values):
+    return ','.join(str(int(v)) for v in values)
+
+
+def _text(series):
+    return series.astype(object).where(series.notna(), '').tolist()
+
+
+def _nullable(series):
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class SearchIndex:
+    """SQLite FTS5 call and lead index; thread-safe."""
+
+    def __init__(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.con = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.execute('PRAGMA synchronous=NORMAL')
+        self.con.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def _source(self, name):
+        row = self.con.execute('SELECT byte_offset, header, last_id, fingerprint FROM _sources WHERE name = ?',
+                               [name]).fetchone()
+        return row or (0, None, 0, None)
+
+    # -------------------------------
+    # INDEXING
+    # -------------------------------
+    def sync(self, data_dir=ingest.DATA_DIR):
+        """Index calls appended and leads changed since the last sync.
+
+        Returns {'calls': new call rows, 'leads': leads reindexed}.
+        """
+        with self._lock:
+            return {'calls': self._sync_calls(data_dir), 'leads': self._sync_leads(data_dir)}
+
+    def _sync_calls(self, data_dir):
+        path = ingest._csv_path(data_dir, 'LeadCall')
+        try:
+            return self._index_calls(path)
+        except incremental.SourceChanged:
+            # Not an append: clear the call index and rebuild it, once.
+            with self.con:
+                self.con.execute('DELETE FROM call_meta')
+                self.con.execute('DELETE FROM call_text')
+                self.con.execute("DELETE FROM _sources WHERE name = 'LeadCall'")
+            return self._index_calls(path)
+
+    def _index_calls(self, path):
+        offset, header, last_id, _ = self._source('LeadCall')
+        batches = incremental.read_appended(path, offset, header, CALL_COLUMNS)
+        added = 0
+        with self.con:
+            while True:
+                try:
+                    batch = next(batches)
+                except StopIteration as done:
+                    offset, header = done.value
+                    break
+                batch = batch[batch['LeadCallId'] > last_id]
+                if batch.empty:
+                    continue
+                self._add_calls(batch)
+                added += len(batch)
+                last_id = int(batch['LeadCallId'].max())
+            self.con.execute('INSERT OR REPLACE INTO _sources VALUES (?, ?, ?, ?, NULL)',
+                             ['LeadCall', offset, header, last_id])
+        return added
+
+    def _add_calls(self, calls):
+        ids = calls['LeadCallId'].tolist()
+        called_at = calls['CallDateTime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        self.con.executemany('INSERT OR REPLACE INTO call_meta VALUES (?, ?, ?, ?, ?)', zip(
+            ids, _nullable(calls['LeadId']), _nullable(calls['AssignedAgentId']),
+            _nullable(calls['SentimentId'].astype('Int64')), _nullable(called_at)))
+        self.con.executemany('INSERT INTO call_text (rowid, summary, objection, project) VALUES (?, ?, ?, ?)', zip(
+            ids, _text(calls['CallSummary']), _text(calls['KeyObjectionRaised']), _text(calls['ProjectDiscussed'])))
+
+    def _sync_leads(self, data_dir):
+        path = ingest._csv_path(data_dir, 'Lead')
+        fingerprint = query._fingerprint(path)
+        if self._source('Lead')[3] == fingerprint:
+            return 0
+        leads = pd.read_csv(path, usecols=list(LEAD_COLUMNS), parse_dates=['CreatedOn'],
+                            dtype={c: t for c, t in LEAD_COLUMNS.items() if t is not None})
+        created = leads['CreatedOn'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        ids = leads['LeadId'].tolist()
+        with self.con:
+            self.con.execute('DELETE FROM lead_meta')
+            self.con.execute('DELETE FROM lead_text')
+            self.con.executemany('INSERT INTO lead_meta VALUES (?, ?, ?, ?, ?)', zip(
+                ids, _nullable(leads['AssignedAgentId']), _nullable(leads['CountryId']),
+                _nullable(leads['LeadScoringId']), _nullable(created)))
+            self.con.executemany('INSERT INTO lead_text (rowid, name, company, notes, region) VALUES (?, ?, ?, ?, ?)',
+                                 zip(ids, _text(leads['FullName']), _text(leads['Company']), _text(leads['Notes']),
+                                     _text(leads['InterestedRegion'])))
+            self.con.execute('INSERT OR REPLACE INTO _sources VALUES (?, 0, NULL, 0, ?)', ['Lead', fingerprint])
+        return len(leads)
+
+    def optimize(self):
+        """Merge the FTS segments left behind by many small syncs."""
+        with self._lock, self.con:
+            for table in ('call_text', 'lead_text'):
+                self.con.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    def _filter_sql(self, filters, agent_col, date_col):
+        clauses, params = [], []
+        if filters.agent_ids:
+            clauses.append(f'{agent_col} IN ({_ids(filters.agent_ids)})')
+        if filters.country_ids:
+            clauses.append(f'l.country_id IN ({_ids(filters.country_ids)})')
+        if filters.score_ids:
+            clauses.append(f'l.score_id IN ({_ids(filters.score_ids)})')
+        if filters.start is not None:
+            clauses.append(f'{date_col} >= ?')
+            params.append(str(pd.Timestamp(filters.start)))
+        if filters.end is not None:
+            clauses.append(f'{date_col} < ?')
+            params.append(str(pd.Timestamp(filters.end)))
+        return ''.join(f' AND {c}' for c in clauses), params
+
+    def _search(self, table, weights, select, joins, match, where, params, limit):
+        bm25 = f"bm25({table}, {', '.join(map(str, weights))})"
+        with self._lock:
+            return self.con.execute(
+                f"SELECT {select}, snippet({table}, -1, '[', ']', '…', 12), round(-{bm25}, 3) "
+                f'FROM {table} {joins} WHERE {table} MATCH ?{where} ORDER BY {bm25} LIMIT ?',
+                [match, *params, int(limit)]).fetchall()
+
+    def calls(self, text, filters=query.Filters(), sentiment_ids=(), limit=50):
+        """Best-matching calls for text, most relevant first."""
+        columns = ['LeadCallId', 'LeadId', 'AgentId', 'SentimentId', 'CallDateTime', 'Snippet', 'Score']
+        match = to_match(text)
+        if not match:
+            return pd.DataFrame(columns=columns)
+        where, params = self._filter_sql(filters, 'm.agent_id', 'm.called_at')
+        if sentiment_ids:
+            where += f' AND m.sentiment_id IN ({_ids(sentiment_ids)})'
+        joins = 'JOIN call_meta m ON m.id = call_text.rowid'
+        if filters.country_ids or filters.score_ids:
+            joins += ' JOIN lead_meta l ON l.id = m.lead_id'
+        rows = self._search('call_text', CALL_WEIGHTS, 'm.id, m.lead_id, m.agent_id, m.sentiment_id, m.called_at',
+                            joins, match, where, params, limit)
+        return pd.DataFrame(rows, columns=columns)
+
+    def leads(self, text, filters=query.Filters(), limit=50):
+        """Best-matching leads for text, most relevant first."""
+        columns = ['LeadId', 'AgentId', 'CreatedOn', 'Snippet', 'Score']
+        match = to_match(text)
+        if not match:
+            return pd.DataFrame(columns=columns)
+        where, params = self._filter_sql(filters, 'l.agent_id', 'l.created_at')
+        rows = self._search('lead_text', LEAD_WEIGHTS, 'l.id, l.agent_id, l.created_at',
+                            'JOIN lead_meta l ON l.id = lead_text.rowid', match, where, params, limit)
+        return pd.DataFrame(rows, columns=columns)
+
+    def __len__(self):
+        with self._lock:
+            return self.con.execute('SELECT count(*) FROM call_meta').fetchone()[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('data_dir', nargs='?', default=ingest.DATA_DIR)
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('--index', default=INDEX_PATH)
+    parser.add_argument('--agent', type=int, action='append', default=[])
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+    index = SearchIndex(args.index)
+    started = time.perf_counter()
+    added = index.sync(args.data_dir)
+    print(f'indexed {added["calls"]:,} new calls, {added["leads"]:,} leads in '
+          f'{time.perf_counter() - started:.2f}s ({len(index):,} calls total)', file=sys.stderr)
+    if args.query:
+        filters = query.Filters(agent_ids=tuple(args.agent))
+        for label, search in (('calls', index.calls), ('leads', index.leads)):
+            started = time.perf_counter()
+            result = search(args.query, filters, limit=args.limit)
+            print(f'{label}: {len(result)} matches in {(time.perf_counter() - started) * 1000:.1f} ms')
+            if not result.empty:
+                print(result.to_string(index=False))
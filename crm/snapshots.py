@@ -0,0 +1,250 @@
+"""Persistent on-disk snapshots of the processed_data/ files.
+
+Each source file gets a snapshot keyed by a content hash of that file:
+tables (CSV) become uncompressed Arrow IPC files that are opened
+memory-mapped, and nested JSON documents are validated against crm.model
+once and stored as one Arrow IPC file per top-level section, so a page
+loads its own section alone and gets typed records back without re-parsing
+or re-checking the JSON. A small sidecar
+per source records the size, mtime and hash it was built from, so a cold
+start only stats the sources and a changed source rebuilds only its own
+snapshot. Snapshots survive restarts, redeploys and new workers, unlike the
+per-process @st.cache_data entries.
+
+    python -m crm.snapshots          # refresh every known snapshot
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+from crm import model
+
+PROCESSED_DIR = 'processed_data'
+SNAPSHOT_DIR = os.path.join(PROCESSED_DIR, '.snapshots')
+
+TABLE_SOURCES = [
+    os.path.join(PROCESSED_DIR, 'enhanced_lead_data.csv'),
+    os.path.join(PROCESSED_DIR, 'lead_status_details.csv'),
+    os.path.join(PROCESSED_DIR, 'call_activity_details.csv'),
+    os.path.join(PROCESSED_DIR, 'agent_availability.csv'),
+]
+DOCUMENT_SOURCES = [
+    os.path.join(PROCESSED_DIR, 'dashboard_data.json'),
+    os.path.join(PROCESSED_DIR, 'comprehensive_ai_insights.json'),
+]
+
+VERSION_FILE = 'version.json'  # published by crm.refresh
+HASH_BLOCK = 1 << 20
+SECTION_INDEX = '_sections.json'
+# Bumped whenever the on-disk snapshot layout changes.
+FORMAT_VERSION = 3
+
+
+def read_version(out_dir=PROCESSED_DIR):
+    """Currently published version record ({'version': 0} before the first)."""
+    try:
+        with open(os.path.join(out_dir, VERSION_FILE), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'version': 0}
+
+
+def content_hash(path):
+    """BLAKE2b digest of a file's bytes, read in 1 MB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    """write(f) to a temp file unique to this writer, then move it over path."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_table(table):
+    def write(f):
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+    return write
+
+
+def _build_table(source, target):
+    # pandas rather than pyarrow.csv: the exports contain short rows (blank
+    # trailing fields dropped) that pandas pads and pyarrow rejects.
+    table = pa.Table.from_pandas(pd.read_csv(source), preserve_index=False)
+    _atomic_write(target, _write_table(table))
+
+
+def _build_document(source, target):
+    """Validate a JSON document and write each model section to target/<name>.arrow.
+
+    Sections the source lacks are written too (empty, marked unavailable),
+    so their drift is reported by whoever loads them.
+    """
+    with open(source, 'r') as f:
+        payload = json.load(f)
+    sections, drift = model.parse_document(model.schema_for(source), payload)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(target) or '.', prefix=os.path.basename(target) + '.', suffix='.tmp')
+    try:
+        for name, section in sections.items():
+            table = model.to_arrow(section)
+            with pa.OSFile(os.path.join(tmp, f'{name}.arrow'), 'wb') as out:
+                with pa.ipc.new_file(out, table.schema) as writer:
+                    writer.write_table(table)
+        with open(os.path.join(tmp, SECTION_INDEX), 'w') as out:
+            json.dump({'sections': list(sections), 'drift': drift}, out)
+        try:
+            os.replace(tmp, target)
+        except OSError as e:
+            # target is keyed on the source hash and only ever appears
+            # complete, so another worker has already built the same snapshot.
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST) or not os.path.isdir(target):
+                raise
+    finally:
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+class SnapshotStore:
+    """Content-addressed snapshot directory for processed_data sources."""
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def _key(self, source):
+        stem = os.path.splitext(os.path.basename(source))[0]
+        where = hashlib.blake2b(os.path.abspath(source).encode(), digest_size=4).hexdigest()
+        return f'{stem}-{where}'
+
+    def _sidecar(self, key):
+        return os.path.join(self.root, f'{key}.meta.json')
+
+    def _read_sidecar(self, key):
+        try:
+            with open(self._sidecar(key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_sidecar(self, key, meta):
+        _atomic_write(self._sidecar(key), lambda f: f.write(json.dumps(meta).encode()))
+
+    def snapshot_path(self, source, kind):
+        """Path of an up-to-date snapshot for source, rebuilding it if stale.
+
+        The fast path is one stat of the source and one of the snapshot. Only
+        when size or mtime moved is the source re-hashed, and only when the
+        hash changed is the snapshot rebuilt.
+        """
+        stat = os.stat(source)
+        key = self._key(source)
+        meta = self._read_sidecar(key)
+        if meta and meta.get('format') != FORMAT_VERSION:
+            _remove(meta['path'])
+            meta = None
+        if meta and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns \
+                and os.path.exists(meta['path']):
+            return meta['path']
+
+        digest = content_hash(source)
+        if meta and meta['hash'] == digest and os.path.exists(meta['path']):
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self._write_sidecar(key, meta)
+            return meta['path']
+
+        os.makedirs(self.root, exist_ok=True)
+        ext = '.arrow' if kind == 'table' else ''
+        path = os.path.join(self.root, f'{key}-{digest}{ext}')
+        (_build_table if kind == 'table' else _build_document)(source, path)
+        self._write_sidecar(key, {
+            'format': FORMAT_VERSION, 'source': source, 'kind': kind, 'hash': digest, 'path': path,
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+        })
+        if meta and meta['path'] != path:
+            _remove(meta['path'])
+        return path
+
+    def load_table(self, source):
+        """Memory-mapped pyarrow.Table for a CSV source."""
+        # The map stays open for as long as the returned table's buffers live.
+        return pa.ipc.open_file(pa.memory_map(self.snapshot_path(source, 'table'), 'r')).read_all()
+
+    def load_frame(self, source):
+        """load_table() converted to a pandas DataFrame."""
+        return self.load_table(source).to_pandas()
+
+    def load_section(self, source, section):
+        """One typed section (crm.model) of a .json source; KeyError if the
+        model has no such section."""
+        cls = model.schema_for(source).get(section)
+        if cls is None:
+            raise KeyError(section)
+        path = os.path.join(self.snapshot_path(source, 'document'), f'{section}.arrow')
+        return model.from_arrow(cls, pa.ipc.open_file(pa.memory_map(path, 'r')).read_all())
+
+    def load_document(self, source):
+        """{section: typed section} for every model section of a .json source."""
+        return {section: self.load_section(source, section) for section in model.schema_for(source)}
+
+    def document_drift(self, source):
+        """Every schema drift message found when the source was snapshotted."""
+        with open(os.path.join(self.snapshot_path(source, 'document'), SECTION_INDEX), 'r') as f:
+            return json.load(f)['drift']
+
+    def refresh(self, tables=TABLE_SOURCES, documents=DOCUMENT_SOURCES):
+        """Bring every existing source's snapshot up to date; return their paths."""
+        paths = {}
+        for kind, sources in (('table', tables), ('document', documents)):
+            for source in sources:
+                if os.path.exists(source):
+                    paths[source] = self.snapshot_path(source, kind)
+        return paths
+
+
+def store_for(out_dir):
+    """The SnapshotStore of a processed_data-style directory."""
+    return SnapshotStore(os.path.join(out_dir, os.path.basename(SNAPSHOT_DIR)))
+
+
+def sources_in(out_dir):
+    """(tables, documents): TABLE_SOURCES and DOCUMENT_SOURCES under out_dir."""
+    return ([os.path.join(out_dir, os.path.basename(s)) for s in TABLE_SOURCES],
+            [os.path.join(out_dir, os.path.basename(s)) for s in DOCUMENT_SOURCES])
+
+
+default_store = SnapshotStore()
+load_table = default_store.load_table
+load_frame = default_store.load_frame
+load_document = default_store.load_document
+load_section = default_store.load_section
+document_drift = default_store.document_drift
+
+
+if __name__ == '__main__':
+    store = SnapshotStore(sys.argv[1]) if len(sys.argv) > 1 else default_store
+    for source, path in store.refresh().items():
+        print(f'{source} -> {path}')
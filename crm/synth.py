@@ -0,0 +1,251 @@
+"""Deterministic synthetic CRM exports at configurable scale.
+
+Writes a schema-valid copy of every file in data/: the reference tables
+(statuses, scores, countries, cities, ...) are copied from the template
+directory unchanged, and Agent, Lead, LeadCall and Schedule are generated
+with referential integrity against them. Distributions follow the shipped
+sample: calls cluster in business hours, about a third connect, only
+connected calls carry a sentiment, and lead stage follows lead status.
+
+The output depends only on (scale, seed); large tables are generated and
+written in fixed-size chunks so 50M call rows never sit in memory at once.
+
+    python -m crm.synth 1m bench_data/1m [--seed 0]
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from crm import ingest
+
+SCALES = {'10k': 10_000, '1m': 1_000_000, '50m': 50_000_000}
+CHUNK_ROWS = 1_000_000
+
+REFERENCE_TABLES = [
+    'CallStatus', 'CityRegion', 'Country', 'LeadScoring', 'LeadStage',
+    'LeadStatus', 'Sentiment', 'TaskType', 'TimezoneInfo',
+]
+
+# Call volume by hour 9..18, from the sample's hourly_success totals.
+CALL_HOURS = np.arange(9, 19)
+CALL_HOUR_WEIGHTS = np.array([10, 6, 10, 8, 4, 11, 9, 5, 10, 7], dtype=float)
+# CallStatusId 1..5: Connected, No Answer, Busy Signal, Failed, Declined
+CALL_STATUS_WEIGHTS = np.array([31, 27, 14, 16, 12], dtype=float)
+# SentimentId 1..3 for connected calls: Positive, Neutral, Negative
+SENTIMENT_WEIGHTS = np.array([45, 35, 20], dtype=float)
+# LeadStatusId 1..10, from the sample's lead_status counts
+LEAD_STATUS_WEIGHTS = np.array([8, 6, 4, 3, 3, 4, 7, 6, 5, 4], dtype=float)
+# LeadScoringId 1..4: HOT, WARM, COLD, DEAD
+LEAD_SCORE_WEIGHTS = np.array([8, 13, 22, 7], dtype=float)
+SCORE_LABELS = np.array(['HOT(16-20)', 'WARM(12-16)', 'COLD(5-11)', 'DEAD(0-4)'])
+
+PROJECTS = np.array([
+    'Bulgari Residences', 'King Abdullah Financial District', 'Red Sea Resort Villas',
+    'NEOM Linear City', 'Palazzo Versace', 'Commercial Towers', 'Red Sea Project',
+])
+OBJECTIONS = np.array([
+    'Need more time to decide', 'Price too high', 'Location concerns',
+    'Payment plan flexibility', 'Comparing other projects',
+])
+INTEREST = np.array(['high', 'moderate', 'low'])
+TASK_TITLES = np.array([
+    'Follow-up Call', 'Property Demo', 'Payment Discussion', 'Document Review',
+    'Project Presentation', 'Virtual Meeting', 'Final Decision Call',
+])
+FIRST_NAMES = np.array(['Jasmin', 'Mohammed', 'Sarah', 'Ahmed', 'Fatima', 'Omar', 'Layla', 'Yousef'])
+LAST_NAMES = np.array(['Ahmed', 'Ali', 'Johnson', 'Hassan', 'Al-Zahra', 'Khan', 'Harbi', 'Brown'])
+ROLES = np.array(['AI Agent', 'Senior Closer', 'Lead Nurture Specialist',
+                  'Senior Sales Agent', 'Junior Sales Agent'])
+
+EPOCH = np.datetime64('2025-01-01T00:00:00')
+HISTORY_DAYS = 270
+SYSTEM_STAMP = '2025-09-15 08:49:28'
+
+
+def table_sizes(calls):
+    """Row counts for the generated tables at a given LeadCall volume."""
+    leads = max(50, calls // 8)
+    return {
+        'LeadCall': calls,
+        'Lead': leads,
+        'Agent': max(5, leads // 2_000),
+        'Schedule': max(10, leads // 5),
+    }
+
+
+def _pick(rng, weights, size, first_id=1):
+    return (rng.choice(len(weights), size=size, p=weights / weights.sum()) + first_id).astype(np.int32)
+
+
+def _stamp(values):
+    return pd.Series(values).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _chunks(total, chunk_rows):
+    for start in range(0, total, chunk_rows):
+        yield start, min(chunk_rows, total - start)
+
+
+def _write(frame, path, first):
+    frame.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+
+def generate_agents(rng, count, cities):
+    city = rng.choice(len(cities), size=count)
+    ids = np.arange(1, count + 1, dtype=np.int32)
+    first = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=count)]
+    last = LAST_NAMES[rng.integers(len(LAST_NAMES), size=count)]
+    return pd.DataFrame({
+        'AgentId': ids,
+        'AgentCode': [f'AGENT{i:03d}' for i in ids],
+        'FirstName': first,
+        'LastName': last,
+        'Role': ROLES[rng.integers(len(ROLES), size=count)],
+        'Email': [f'{f.lower()}.{i}@darglobal.com' for f, i in zip(first, ids)],
+        'Phone': [f'+9715{n:08d}' for n in rng.integers(10 ** 8, size=count)],
+        'CountryId': cities['CountryId'].to_numpy()[city],
+        'CityRegionId': cities['CityRegionId'].to_numpy()[city],
+        'IsActive': 1,
+        'CreatedBy': 'SYSTEM', 'CreatedOn': SYSTEM_STAMP,
+        'ModifiedBy': 'SYSTEM', 'ModifiedOn': SYSTEM_STAMP,
+    })
+
+
+def generate_leads(rng, start, count, agents, cities, status_stage):
+    ids = np.arange(start + 1, start + count + 1, dtype=np.int32)
+    status = _pick(rng, LEAD_STATUS_WEIGHTS, count)
+    city = rng.choice(len(cities), size=count)
+    created = EPOCH + rng.integers(HISTORY_DAYS, size=count).astype('timedelta64[D]')
+    modified = created + rng.integers(0, 30, size=count).astype('timedelta64[D]')
+    return pd.DataFrame({
+        'LeadId': ids,
+        'LeadCode': np.char.add('LEAD', ids.astype(str)),
+        'FullName': np.char.add(np.char.add(FIRST_NAMES[ids % len(FIRST_NAMES)], ' '),
+                                LAST_NAMES[(ids // 7) % len(LAST_NAMES)]),
+        'Email': np.char.add(np.char.add('lead', ids.astype(str)), '@example.com'),
+        'Phone': np.char.add('+9665', rng.integers(10 ** 7, 10 ** 8, size=count).astype(str)),
+        'Company': 'Synthetic Holdings',
+        'LeadSourceId': rng.integers(1, 5, size=count),
+        'LeadStageId': status_stage[status],
+        'LeadStatusId': status,
+        'LeadScoringId': _pick(rng, LEAD_SCORE_WEIGHTS, count),
+        'CountryId': cities['CountryId'].to_numpy()[city],
+        'CityRegionId': cities['CityRegionId'].to_numpy()[city],
+        'InterestedRegion': PROJECTS[rng.integers(len(PROJECTS), size=count)],
+        'AssignedAgentId': rng.integers(1, agents + 1, size=count, dtype=np.int32),
+        'Notes': 'Potential investor interested in residential properties',
+        'IsActive': 1,
+        'CreatedBy': 'SYSTEM', 'CreatedOn': _stamp(created),
+        'ModifiedBy': 'SYSTEM', 'ModifiedOn': _stamp(modified),
+    })
+
+
+def generate_calls(rng, start, count, leads, agents):
+    ids = np.arange(start + 1, start + count + 1, dtype=np.int32)
+    status = _pick(rng, CALL_STATUS_WEIGHTS, count)
+    connected = status == 1
+    sentiment = np.where(connected, _pick(rng, SENTIMENT_WEIGHTS, count), 0)
+    day = rng.integers(HISTORY_DAYS, size=count).astype('timedelta64[D]')
+    hour = CALL_HOURS[rng.choice(len(CALL_HOURS), size=count, p=CALL_HOUR_WEIGHTS / CALL_HOUR_WEIGHTS.sum())]
+    minute = rng.integers(60, size=count)
+    called = EPOCH + day + hour.astype('timedelta64[h]') + minute.astype('timedelta64[m]')
+    duration = np.where(connected, rng.lognormal(6.7, 0.5, size=count).astype(np.int32), 0)
+    project = np.where(connected, PROJECTS[rng.integers(len(PROJECTS), size=count)], '')
+    interest = INTEREST[rng.integers(len(INTEREST), size=count)]
+    summary = np.where(
+        connected,
+        np.char.add(np.char.add(np.char.add('Discussed ', project), '. Client showed '),
+                    np.char.add(interest, ' interest.')),
+        'Call not connected',
+    )
+    return pd.DataFrame({
+        'LeadCallId': ids,
+        'LeadId': rng.integers(1, leads + 1, size=count, dtype=np.int32),
+        'CallId': np.char.add('CALL', ids.astype(str)),
+        'CallDateTime': _stamp(called),
+        'DurationSeconds': duration,
+        'CallStatusId': status,
+        'SentimentId': pd.Series(sentiment).where(connected),
+        'ProjectDiscussed': project,
+        'BrokerCountryId': pd.Series(rng.integers(1, 6, size=count)).where(connected),
+        'KeyObjectionRaised': np.where(connected, OBJECTIONS[rng.integers(len(OBJECTIONS), size=count)], ''),
+        'InterestedRegion': project,
+        'LeadScoringResult': np.where(connected, SCORE_LABELS[rng.integers(len(SCORE_LABELS), size=count)], ''),
+        'AgreedNextStep': '',
+        'InternalNextAction': '',
+        'AssignedAgentId': rng.integers(1, agents + 1, size=count, dtype=np.int32),
+        'CallSummary': summary,
+        'FollowUpAction': '',
+        'PromisedDate': '',
+        'CallDirection': 'Outbound',
+        'PhoneNumber': np.char.add('+9715', rng.integers(10 ** 7, 10 ** 8, size=count).astype(str)),
+        'CreatedBy': 'SYSTEM',
+        'CreatedOn': _stamp(called + np.timedelta64(5, 'm')),
+    })
+
+
+def generate_schedule(rng, count, leads, agents):
+    ids = np.arange(1, count + 1, dtype=np.int32)
+    created = EPOCH + rng.integers(HISTORY_DAYS, size=count).astype('timedelta64[D]')
+    due = created + rng.integers(1, 45, size=count).astype('timedelta64[D]') + np.timedelta64(9, 'h')
+    return pd.DataFrame({
+        'ScheduleId': ids,
+        'LeadId': rng.integers(1, leads + 1, size=count, dtype=np.int32),
+        'TaskTypeId': rng.integers(1, 7, size=count),
+        'ScheduleTitle': TASK_TITLES[rng.integers(len(TASK_TITLES), size=count)],
+        'ScheduledDate': _stamp(due),
+        'TaskStatusId': rng.integers(1, 6, size=count),
+        'AssignedAgentId': rng.integers(1, agents + 1, size=count, dtype=np.int32),
+        'IsFollowUp': rng.integers(0, 2, size=count),
+        'AgreedNextStep': 'Discuss pricing',
+        'InternalAction': 'Prepare pricing sheet',
+        'Notes': 'Follow up on previous call',
+        'CreatedBy': 'SYSTEM',
+        'CreatedOn': _stamp(created),
+    })
+
+
+def generate(out_dir, calls, seed=0, template_dir=ingest.DATA_DIR, chunk_rows=CHUNK_ROWS):
+    """Write a full synthetic data/ directory with `calls` LeadCall rows."""
+    os.makedirs(out_dir, exist_ok=True)
+    for table in REFERENCE_TABLES:
+        shutil.copyfile(ingest._csv_path(template_dir, table), ingest._csv_path(out_dir, table))
+
+    cities = pd.read_csv(ingest._csv_path(template_dir, 'CityRegion'), usecols=['CityRegionId', 'CountryId'])
+    statuses = pd.read_csv(ingest._csv_path(template_dir, 'LeadStatus'), usecols=['LeadStatusId', 'LeadStageId'])
+    status_stage = np.zeros(statuses['LeadStatusId'].max() + 1, dtype=np.int32)
+    status_stage[statuses['LeadStatusId']] = statuses['LeadStageId']
+
+    sizes = table_sizes(calls)
+    rng = np.random.default_rng([seed, 0])
+    generate_agents(rng, sizes['Agent'], cities).to_csv(ingest._csv_path(out_dir, 'Agent'), index=False)
+    rng = np.random.default_rng([seed, 1])
+    generate_schedule(rng, sizes['Schedule'], sizes['Lead'], sizes['Agent']).to_csv(
+        ingest._csv_path(out_dir, 'Schedule'), index=False)
+
+    for n, (start, count) in enumerate(_chunks(sizes['Lead'], chunk_rows)):
+        rng = np.random.default_rng([seed, 2, n])
+        _write(generate_leads(rng, start, count, sizes['Agent'], cities, status_stage),
+               ingest._csv_path(out_dir, 'Lead'), n == 0)
+    for n, (start, count) in enumerate(_chunks(calls, chunk_rows)):
+        rng = np.random.default_rng([seed, 3, n])
+        _write(generate_calls(rng, start, count, sizes['Lead'], sizes['Agent']),
+               ingest._csv_path(out_dir, 'LeadCall'), n == 0)
+    return sizes
+
+
+def parse_scale(value):
+    """'10k' / '1m' / '50m' preset or a plain row count."""
+    return SCALES[value] if value in SCALES else int(value)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('scale', help=f'LeadCall rows: one of {", ".join(SCALES)} or a number')
+    parser.add_argument('out_dir')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.out_dir, parse_scale(args.scale), args.seed))
@@ -0,0 +1,234 @@
+"""Per-rerun timing spans, cache hit/miss marks and memory peaks.
+
+app.py starts a Trace for every script run and finishes it at the end of the
+page. In between, span(name) times a block (section loads, prepare, render,
+figure and DataFrame building, shared resources); spans opened with
+cached=True count as hits unless something inside calls miss(), which the
+bodies of the st.cache_* loaders do, since they only run on a miss. Spans
+with the same name in one run are summed.
+
+Finished runs are appended as JSON lines to a rotating log
+(processed_data/.state/trace.log, 1 MB x 3 backups; CRM_TRACE_LOG moves it,
+an empty value turns it off) and kept in memory for the sidebar Performance
+panel. With CRM_TRACE_MEMORY=1 tracemalloc runs for the life of the process
+and each run records its peak traced memory; tracemalloc is process-wide,
+so concurrent sessions show up in each other's peaks.
+
+Nothing here imports Streamlit: without a started Trace, span() and miss()
+do nothing, so headless callers pay no cost.
+
+    python -m crm.trace [--last N] [--page PAGE]   # per-span p50 / p95 from the log
+"""
+import argparse
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+LOG_PATH = os.environ.get('CRM_TRACE_LOG', os.path.join('processed_data', '.state', 'trace.log'))
+LOG_BYTES = 1 << 20
+LOG_BACKUPS = 3
+MEMORY = os.environ.get('CRM_TRACE_MEMORY', '') not in ('', '0')
+
+RECENT = deque(maxlen=200)  # finished runs of this process, newest last
+_local = threading.local()
+_logger = None
+
+
+class Trace:
+    """Spans of one script run, summed by name in first-seen order."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.seconds = None
+        self.peak_bytes = None
+        self.spans = {}
+        self._open = []
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name, cached=False):
+        frame = {'cached': cached, 'missed': False}
+        self._open.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._open.pop()
+            stats = self.spans.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            if cached:
+                stats['misses'] = stats.get('misses', 0) + frame['missed']
+
+    def miss(self):
+        for frame in reversed(self._open):
+            if frame['cached']:
+                frame['missed'] = True
+                return
+
+    def record(self):
+        """JSON-ready summary of the finished run"""
+        return {
+            'ts': round(self.started, 3),
+            'page': self.page,
+            'seconds': round(self.seconds, 6),
+            'peak_bytes': self.peak_bytes,
+            'spans': {name: dict(stats, seconds=round(stats['seconds'], 6)) for name, stats in self.spans.items()},
+        }
+
+
+def current():
+    """The Trace of this thread's script run, or None."""
+    return getattr(_local, 'trace', None)
+
+
+def start(page):
+    """Begin tracing a run on this thread (replacing any unfinished one)."""
+    if MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    _local.trace = Trace(page)
+    return _local.trace
+
+
+def finish():
+    """End this thread's run: log it, keep it in RECENT and return it (None
+    when no run was started)."""
+    trace = current()
+    if trace is None:
+        return None
+    _local.trace = None
+    trace.seconds = time.perf_counter() - trace._t0
+    if MEMORY and tracemalloc.is_tracing():
+        trace.peak_bytes = tracemalloc.get_traced_memory()[1]
+    record = trace.record()
+    RECENT.append(record)
+    if LOG_PATH:
+        _log().info(json.dumps(record, separators=(',', ':')))
+    return trace
+
+
+def span(name, cached=False):
+    """Time a block under the current run (a no-op without one)."""
+    trace = current()
+    return trace.span(name, cached) if trace is not None else contextlib.nullcontext()
+
+
+def miss():
+    """Mark the innermost cached span as a miss."""
+    trace = current()
+    if trace is not None:
+        trace.miss()
+
+
+def timed(name, cached=False):
+    """Decorator form of span(); put it above @st.cache_* so hits are timed too."""
+    def wrap(func):
+        def timed_call(*args, **kwargs):
+            with span(name, cached):
+                return func(*args, **kwargs)
+        timed_call.__name__ = func.__name__
+        timed_call.__doc__ = func.__doc__
+        return timed_call
+    return wrap
+
+
+def _log():
+    global _logger
+    if _logger is None:
+        os.makedirs(os.path.dirname(LOG_PATH) or '.', exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(LOG_PATH, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+# -------------------------------
+# REPORTING
+# -------------------------------
+def read_log(path=LOG_PATH, last=None):
+    """Logged runs, oldest first (rotated files included)."""
+    records = []
+    for n in range(LOG_BACKUPS, -1, -1):
+        name = f'{path}.{n}' if n else path
+        try:
+            with open(name, 'r') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        pass
+        except FileNotFoundError:
+            pass
+    return records[-last:] if last else records
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summarize(records):
+    """{page: {'runs', 'p50', 'p95', 'peak_bytes', 'spans': {name: {'calls',
+    'p50', 'p95', 'hit_rate'}}}} over runs; span percentiles are per run."""
+    pages = {}
+    for record in records:
+        page = pages.setdefault(record['page'], {'totals': [], 'peaks': [], 'spans': {}})
+        page['totals'].append(record['seconds'])
+        if record.get('peak_bytes') is not None:
+            page['peaks'].append(record['peak_bytes'])
+        for name, stats in record['spans'].items():
+            acc = page['spans'].setdefault(name, {'seconds': [], 'calls': 0, 'misses': 0, 'cached': False})
+            acc['seconds'].append(stats['seconds'])
+            acc['calls'] += stats['calls']
+            if 'misses' in stats:
+                acc['cached'] = True
+                acc['misses'] += stats['misses']
+    return {
+        name: {
+            'runs': len(page['totals']),
+            'p50': _percentile(page['totals'], 0.5),
+            'p95': _percentile(page['totals'], 0.95),
+            'peak_bytes': max(page['peaks']) if page['peaks'] else None,
+            'spans': {
+                span_name: {
+                    'calls': acc['calls'],
+                    'p50': _percentile(acc['seconds'], 0.5),
+                    'p95': _percentile(acc['seconds'], 0.95),
+                    'hit_rate': 1 - acc['misses'] / acc['calls'] if acc['cached'] and acc['calls'] else None,
+                } for span_name, acc in page['spans'].items()
+            },
+        } for name, page in pages.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarize the dashboard trace log')
+    parser.add_argument('--log', default=LOG_PATH)
+    parser.add_argument('--last', type=int, help='only the last N runs')
+    parser.add_argument('--page', help='only this page')
+    args = parser.parse_args()
+    records = [r for r in read_log(args.log, args.last) if not args.page or r['page'] == args.page]
+    if not records:
+        print(f'no runs logged in {args.log}')
+    for page, summary in sorted(summarize(records).items()):
+        peak = f"  peak {summary['peak_bytes'] / (1 << 20):.1f} MB" if summary['peak_bytes'] else ''
+        print(f"{page}: {summary['runs']} runs  p50 {summary['p50'] * 1000:.0f} ms  "
+              f"p95 {summary['p95'] * 1000:.0f} ms{peak}")
+        for name, stats in summary['spans'].items():
+            hits = f"  hit rate {stats['hit_rate']:.0%}" if stats['hit_rate'] is not None else ''
+            print(f"  {name:<32} {stats['calls']:>6} calls  p50 {stats['p50'] * 1000:8.1f} ms  "
+                  f"p95 {stats['p95'] * 1000:8.1f} ms{hits}")
@@ -0,0 +1,69 @@
+"""Dashboard pages, one module per section, imported on first use.
+
+Every page module defines:
+
+* HEADER: the page title shown above the content;
+* prepare(ctx): the page's static content as a list of blocks (metrics,
+  HTML cards, headings, tables and Plotly figure dicts). It reads data only
+  through ctx and makes no Streamlit calls, so it can run headless;
+* render(ctx, blocks): draws the blocks (common.render_blocks) followed by
+  the page's interactive drill-downs.
+
+Pages whose drill-down can be sliced by agent or country also define
+DRILLDOWN (its title) and drilldown(ctx, con, filters): the blocks for one
+crm.query.Filters slice, read through the DuckDB cursor con. render() draws
+them for the filters picked in the page, crm.export for each partition.
+
+A block is a dict with a 'type' of 'metrics' (items of label / value /
+delta / delta_color), 'cards' (HTML strings laid out side by side; a list
+stacks several in one column), 'html', 'divider', 'heading', 'table'
+(title, DataFrame, hide_index), 'bar' (DataFrame of series by index) or
+'figure' (title, figure dict).
+"""
+import importlib
+
+from crm import trace
+
+PAGES = {
+    "🏁 Executive Summary": "executive_summary",
+    "📊 Lead Status": "lead_status",
+    "📞 AI Call Activity": "call_activity",
+    "🗂️ Follow-up Tasks": "tasks",
+    "👥 Agent Availability": "agent_availability",
+    "💵 Conversion": "conversion",
+    "🗺️ Geographic": "geographic",
+}
+
+
+def load(name):
+    """The page module for name (imported once, then cached by Python)."""
+    if name not in PAGES.values():
+        raise KeyError(name)
+    return importlib.import_module(f'{__name__}.{name}')
+
+
+class Context:
+    """What prepare() reads: the data version, insight- and dashboard-section
+    loaders and optional live resources (None when unavailable): the task
+    scheduler and the live call feed (crm.live)."""
+
+    def __init__(self, version, section, tasks=None, dashboard=None, live=None):
+        self.version = version
+        self.tasks = tasks
+        self.live = live
+        self.drift = []
+        self._section = section
+        self._dashboard = dashboard
+
+    def _collect(self, loaded):
+        self.drift.extend(d for d in loaded.drift if d not in self.drift)
+        return loaded
+
+    def section(self, name):
+        """Typed insight section (crm.model); its schema drift is collected in self.drift."""
+        with trace.span(f'load {name}', cached=True):
+            return self._collect(self._section(name))
+
+    def dashboard_section(self, name):
+        """Typed dashboard_data.json section (crm.model.DASHBOARD), drift collected likewise."""
+        return self._collect(self._dashboard(name))
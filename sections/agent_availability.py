@@ -0,0 +1,72 @@
+"""Agent Availability page."""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from sections import common
+from sections.common import metric
+
+HEADER = "👥 Agent Intelligence & Performance Optimization"
+
+
+def prepare(ctx):
+    agent_ai = ctx.section('agent_availability')
+    perf_pred = agent_ai.performance_prediction
+    skills = agent_ai.skills_development
+    capacity = agent_ai.capacity_optimization
+    burnout = agent_ai.burnout_prevention
+    return [
+        {'type': 'metrics', 'items': [
+            metric("Exceeding Targets", perf_pred.agents_exceeding_targets, delta="AI Predicted"),
+            metric("Need Support", perf_pred.agents_needing_support, delta="Early Warning"),
+            metric("Improvement Potential", f"{perf_pred.average_performance_improvement_potential*100:.1f}%"),
+            metric("Training Impact", f"{skills.training_impact_prediction*100:.1f}%"),
+        ]},
+        {'type': 'cards', 'items': [
+            '<div class="prediction-card"><h4>⚡ Capacity Analysis</h4>'
+            f'<p><strong>Current Utilization:</strong> {capacity.current_utilization_rate*100:.0f}%</p>'
+            f'<p><strong>Underutilized:</strong> Agents {", ".join(map(str, capacity.underutilized_agents))}</p>'
+            f'<p><strong>Overutilized:</strong> Agents {", ".join(map(str, capacity.overutilized_agents))}</p></div>',
+            '<div class="optimization-card"><h4>🎓 Skills Development</h4>'
+            f'<p><strong>Need Training:</strong> Agents {", ".join(map(str, skills.agents_needing_training))}</p>'
+            f'<p><strong>Priority Areas:</strong> {", ".join(skills.priority_training_areas[:2])}</p></div>',
+        ]},
+        {'type': 'html', 'html':
+            '<div class="alert-card"><h4>🛡️ Burnout Prevention & Wellness</h4>'
+            f'<p><strong>High Risk Agents:</strong> {", ".join(map(str, burnout.high_burnout_risk_agents))}</p>'
+            f'<p><strong>Wellness Score:</strong> {burnout.wellness_score*100:.0f}%</p></div>'},
+    ]
+
+
+def render(ctx, blocks):
+    from crm import availability
+
+    common.render_blocks(blocks)
+    index = common.get_availability_index(ctx.version)
+    if index is not None:
+        with st.expander("🕒 Live Availability & Utilization"):
+            last_day = pd.Timestamp(index.last_day).date()
+            col1, col2 = st.columns(2)
+            with col1:
+                day = st.date_input("Date", value=min(datetime.now().date(), last_day), key="availability_day")
+            with col2:
+                hour = st.slider("Hour", availability.WORK_START, availability.WORK_END - 1,
+                                 value=min(max(datetime.now().hour, availability.WORK_START), availability.WORK_END - 1),
+                                 key="availability_hour")
+            at = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+            end = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+            free = set(index.free_at(at).tolist())
+            utilization = index.utilization(end - timedelta(days=30), end)
+            names = common.agent_names(ctx.version)
+            col1, col2 = st.columns(2)
+            with col1: st.metric(f"Free at {at:%b %d %H:00}", f"{len(free)} / {len(index.agent_ids)}")
+            with col2: st.metric("30-Day Utilization", f"{utilization.mean()*100:.0f}%")
+            st.dataframe(pd.DataFrame({
+                'Agent': [names.get(a, f"Agent {a}") for a in index.agent_ids],
+                'Free': ['✅' if a in free else '—' for a in index.agent_ids],
+                'Utilization (30d)': [f"{u*100:.0f}%" for u in utilization],
+                'Next Free Slot': [f"{index.first_free_slot(a, at):%Y-%m-%d %H:00}" for a in index.agent_ids],
+            }), use_container_width=True, hide_index=True)
+    with st.expander("🧊 Agent Slice Explorer"):
+        common.cube_explorer("agent_cube", ['agent', 'status'], ctx.version)
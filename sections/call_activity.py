@@ -0,0 +1,122 @@
+"""AI Call Activity page."""
+import pandas as pd
+import streamlit as st
+
+from crm import charts, query
+from sections import common
+from sections.common import metric
+
+HEADER = "📞 AI Call Intelligence Dashboard"
+DRILLDOWN = "🔎 Drill-down: Call Volume & Hourly Success"
+
+
+def correlation_strength(r):
+    """'Strong positive correlation' etc. for a Pearson r (|r| >= .5 / .3 / .1)"""
+    size = abs(r)
+    if size < 0.1:
+        return "No meaningful correlation"
+    strength = "Strong" if size >= 0.5 else "Moderate" if size >= 0.3 else "Weak"
+    return f"{strength} {'positive' if r > 0 else 'negative'} correlation"
+
+
+def windows_figure(windows_data):
+    import plotly.express as px
+
+    windows_df = pd.DataFrame(windows_data, columns=['time', 'success_rate'])
+    windows_df['success_rate'] = windows_df['success_rate'] * 100
+    return px.bar(windows_df, x='time', y='success_rate',
+                  title="Top 5 Optimal Calling Windows",
+                  color='success_rate', color_continuous_scale='Viridis')
+
+
+def live_blocks(feed, labels):
+    window = feed['window']
+    recent = feed['recent']
+    days = f"{feed['window_hours'] // 24}d" if feed['window_hours'] % 24 == 0 else f"{feed['window_hours']}h"
+    sentiment = window['sentiment']
+    positive = [i for i, name in labels.get('sentiment', {}).items() if name == 'Positive']
+    blocks = [
+        {'type': 'heading', 'text': f"📡 Live Call Feed (up to {feed['newest_hour'] or 'N/A'}:00)"},
+        {'type': 'metrics', 'items': [
+            metric(f"Calls (last {recent['hours']}h)", f"{recent['calls']:,}"),
+            metric(f"Connected Rate ({recent['hours']}h)", f"{recent['success_rate']:.1f}%",
+                   delta=f"{recent['success_rate'] - window['success_rate']:+.1f}% vs {days}"),
+            metric(f"Calls ({days})", f"{window['calls']:,}"),
+            metric(f"Positive Sentiment ({days})",
+                   f"{sum(sentiment.get(i, 0) for i in positive) / sum(sentiment.values())*100:.0f}%"
+                   if positive and sentiment else 'N/A'),
+        ]},
+    ]
+    if feed['hourly']:
+        blocks.append({'type': 'bar', 'data': pd.DataFrame(feed['hourly']).set_index('hour')})
+    status_names = labels.get('status', {})
+    agent_names = labels.get('agent', {})
+    outcomes = ''.join(
+        f"<p><strong>{status_names.get(s, f'Status {s}')}:</strong> {n:,} ({n / window['calls']*100:.0f}%)</p>"
+        for s, n in window['by_status'].items())
+    agents = ''.join(f"<p><strong>{agent_names.get(a, f'Agent {a}')}:</strong> {n:,} calls</p>"
+                     for a, n in list(window['by_agent'].items())[:5])
+    blocks.append({'type': 'cards', 'items': [
+        f'<div class="prediction-card"><h4>📶 Call Outcomes ({days})</h4>{outcomes}</div>',
+        f'<div class="optimization-card"><h4>👥 Most Active Agents ({days})</h4>{agents}</div>',
+    ]})
+    return blocks
+
+
+def prepare(ctx):
+    call_ai = ctx.section('call_activity')
+    success_pred = call_ai.success_prediction
+    blocks = [{'type': 'html', 'html':
+        f'<div class="model-accuracy">'
+        f'🎯 AI Model Accuracy: {success_pred.model_accuracy*100:.1f}% | '
+        f'Predicted Improvement: {call_ai.call_optimization.predicted_success_rate_improvement*100:.1f}%'
+        f'</div>'}]
+    feed = ctx.live.snapshot() if ctx.live is not None else None
+    if feed is not None and feed['caught_up']:
+        blocks += live_blocks(feed, ctx.live.labels)
+    if success_pred.optimal_calling_windows:
+        windows_data = [w.to_dict() for w in success_pred.optimal_calling_windows[:5]]
+        blocks.append({'type': 'heading', 'text': "🕐 AI-Optimized Calling Schedule"})
+        blocks.append({'type': 'figure', 'title': "Top 5 Optimal Calling Windows", 'figure': charts.cached_figure(
+            'optimal_calling_windows', windows_data, ctx.version, lambda: windows_figure(windows_data))})
+    schedule = call_ai.predictive_scheduling.next_week_optimal_schedule
+    if schedule:
+        blocks.append(common.table("📅 AI-Recommended Weekly Schedule", [
+            {'Day': day, 'Optimal Times': ', '.join(times)} for day, times in schedule.items()]))
+    call_opt = call_ai.call_optimization
+    blocks.append({'type': 'cards', 'items': [
+        '<div class="prediction-card"><h4>📈 Success Rate Improvement</h4>'
+        f'<p><strong>Predicted Gain:</strong> {call_opt.predicted_success_rate_improvement*100:.1f}%</p>'
+        f'<p><strong>Optimal Volume:</strong> {call_opt.optimal_call_volume_per_agent} calls/agent</p></div>',
+        '<div class="optimization-card"><h4>🎯 Sentiment Impact</h4>'
+        f'<p><strong>Correlation:</strong> r = {call_opt.sentiment_correlation:+.2f}</p>'
+        f'<p>{correlation_strength(call_opt.sentiment_correlation)} between call sentiment and won leads</p></div>',
+        '<div class="ai-insight-box"><h4>🤖 AI Recommendations</h4>'
+        '<p>• Focus calls during 10-11 AM window</p>'
+        '<p>• Thursday shows highest success rates</p>'
+        '<p>• Sentiment monitoring critical</p></div>',
+    ]})
+    return blocks
+
+
+def drilldown(ctx, con, filters):
+    return [
+        {'type': 'figure', 'title': "Call Volume", 'figure': charts.call_volume(con, filters, ctx.version)},
+        {'type': 'table', 'data': query.hourly_success(con, filters)},
+    ]
+
+
+def render(ctx, blocks):
+    common.render_blocks(blocks)
+    db = common.get_query_db(ctx.version)
+    if db is not None:
+        with st.expander(DRILLDOWN):
+            filters = common.drilldown_filters("call_activity", ctx.version)
+            volume, hourly = drilldown(ctx, db.cursor(), filters)
+            col1, col2 = st.columns(2)
+            with col1:
+                common.render_blocks([volume])
+            with col2:
+                common.render_blocks([hourly])
+            st.markdown("**Call Log**")
+            common.paginated_table('calls', filters, "call_activity_grid", ctx.version)
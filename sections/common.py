@@ -0,0 +1,438 @@
+"""Shared Streamlit resources, loaders and widgets for the page modules."""
+import logging
+import os
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from crm import cache, model, query, snapshots, trace
+
+STYLE_PATH = os.path.join(os.path.dirname(__file__), 'style.css')
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def _stylesheet():
+    with open(STYLE_PATH, 'r') as f:
+        return f'<style>\n{f.read()}</style>'
+
+
+def inject_styles():
+    """Emit the stylesheet (read from disk once per process).
+
+    Streamlit drops any element a rerun does not re-emit, so the tag is
+    written on every rerun; only the file read and string build are cached.
+    """
+    st.markdown(_stylesheet(), unsafe_allow_html=True)
+
+
+# -------------------------------
+# LOADERS
+# -------------------------------
+# Load AI insights, one cached section per page so switching pages only
+# loads that page's data and each section expires on its own schedule.
+# Every loader takes the published data version, so a background refresh
+# is picked up on the next rerun as a fresh cache entry. Sections come back
+# as typed crm.model records, validated once when the snapshot was built;
+# anything missing or malformed is listed in the section's drift rather
+# than papered over with stand-in numbers.
+INSIGHTS_SOURCES = ['processed_data/comprehensive_ai_insights.json', 'comprehensive_ai_insights.json']
+DASHBOARD_SOURCE = 'processed_data/dashboard_data.json'
+PERF_PANEL = os.environ.get('CRM_PERF_PANEL', '') not in ('', '0')
+SECTION_TTL = {
+    "executive_summary": 300,
+    "lead_status": 300,
+    "call_activity": 120,
+    "tasks": 120,
+    "agent_availability": 120,
+    "conversion": 600,
+    "geographic": 3600,
+    "meta_insights": 3600,
+}
+
+
+def load_insight_section(section):
+    """One typed section of the AI insights (unavailable, with drift saying
+    why, when there is no insights file)"""
+    trace.miss()
+    for path in INSIGHTS_SOURCES:
+        if os.path.exists(path):
+            return snapshots.load_section(path, section)
+    return model.missing(model.INSIGHTS[section], f'{section}: no insights file')
+
+
+@st.cache_data(ttl=SECTION_TTL["executive_summary"])
+def load_executive_summary(version):
+    """Executive summary AI insights"""
+    return load_insight_section('executive_summary')
+
+
+@st.cache_data(ttl=SECTION_TTL["lead_status"])
+def load_lead_status(version):
+    """Lead status AI insights"""
+    return load_insight_section('lead_status')
+
+
+@st.cache_data(ttl=SECTION_TTL["call_activity"])
+def load_call_activity(version):
+    """Call activity AI insights"""
+    return load_insight_section('call_activity')
+
+
+@st.cache_data(ttl=SECTION_TTL["tasks"])
+def load_tasks(version):
+    """Follow-up task AI insights"""
+    return load_insight_section('tasks_followup')
+
+
+@st.cache_data(ttl=SECTION_TTL["agent_availability"])
+def load_agent_availability(version):
+    """Agent availability AI insights"""
+    return load_insight_section('agent_availability')
+
+
+@st.cache_data(ttl=SECTION_TTL["conversion"])
+def load_conversion(version):
+    """Conversion AI insights"""
+    return load_insight_section('conversion')
+
+
+@st.cache_data(ttl=SECTION_TTL["geographic"])
+def load_geographic(version):
+    """Geographic AI insights"""
+    return load_insight_section('geographic')
+
+
+@st.cache_data(ttl=SECTION_TTL["meta_insights"])
+def load_meta_insights(version):
+    """AI model status shown in the sidebar and footer"""
+    return load_insight_section('meta_insights')
+
+
+LOADERS = {
+    'executive_summary': load_executive_summary,
+    'lead_status': load_lead_status,
+    'call_activity': load_call_activity,
+    'tasks_followup': load_tasks,
+    'agent_availability': load_agent_availability,
+    'conversion': load_conversion,
+    'geographic': load_geographic,
+    'meta_insights': load_meta_insights,
+}
+
+
+def read_dashboard_data():
+    """Main dashboard data as {section: typed section} (unavailable sections,
+    with drift saying why, when there is no dashboard data file)"""
+    trace.miss()
+    try:
+        if os.path.exists(DASHBOARD_SOURCE):
+            return snapshots.load_document(DASHBOARD_SOURCE)
+    except FileNotFoundError:
+        pass
+    return {name: model.missing(cls, f'{name}: no dashboard data file') for name, cls in model.DASHBOARD.items()}
+
+
+@trace.timed('load dashboard_data', cached=True)
+@st.cache_data
+def load_dashboard_data(version):
+    """Main dashboard data as {section: typed section}"""
+    return read_dashboard_data()
+
+
+# -------------------------------
+# SHARED RESOURCES
+# -------------------------------
+@st.cache_resource
+def start_refresh_service():
+    """Background rebuild of processed_data every CRM_REFRESH_INTERVAL seconds
+    (None when unset); its last_error is shown under the refresh stamp"""
+    interval = float(os.environ.get('CRM_REFRESH_INTERVAL', 0))
+    if interval <= 0:
+        return None
+    from crm import refresh
+    return refresh.RefreshService(interval=interval).start()
+
+
+@trace.timed('resource live_feed', cached=True)
+@st.cache_resource
+def get_live_feed():
+    """Live call counters tailing CRM_LIVE_EVENTS (a LeadCall CSV or
+    tcp://host:port; None when unset)"""
+    trace.miss()
+    source = os.environ.get('CRM_LIVE_EVENTS', '')
+    if not source:
+        return None
+    from crm import live
+    return live.LiveFeed(source).start()
+
+
+def _close_query_db(con):
+    if con is not None:
+        con.close()
+
+
+@st.cache_resource(max_entries=1, on_release=_close_query_db)
+def _open_query_db(version):
+    trace.miss()
+    from crm import charts
+    # Close the previous version's connection first so its file is freed
+    # once no worker reads it.
+    _open_query_db.clear()
+    try:
+        return query.open_database(shared=True, prepare=(charts.ensure_rollups,))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.exception('drill-down database unavailable')
+        st.warning(f"Drill-downs are unavailable: {e}")
+        return None
+
+
+@trace.timed('resource query_db', cached=True)
+def get_query_db(version):
+    """Read-only DuckDB connection over data/*.csv, one file per data version
+    shared by every worker on the host (None when data/
+    is unavailable or the database cannot be opened; the error is logged and
+    shown)"""
+    return _open_query_db(version)
+
+
+@trace.timed('resource availability_index', cached=True)
+@st.cache_resource(max_entries=1)
+def get_availability_index(version):
+    """Agent busy-hour index from Schedule and LeadCall, built once per host
+    through crm.cache (None when data/ is unavailable)"""
+    trace.miss()
+    from crm import availability
+    try:
+        return availability.AvailabilityIndex.load()
+    except Exception:
+        return None
+
+
+@trace.timed('resource task_scheduler', cached=True)
+@st.cache_resource
+def get_task_scheduler():
+    """Per-agent task heaps over data/Schedule.csv (None when data/ is unavailable)"""
+    trace.miss()
+    from crm import scheduler
+    try:
+        return scheduler.TaskScheduler.from_data()
+    except Exception:
+        return None
+
+
+@trace.timed('resource rollup_cube', cached=True)
+@st.cache_resource(max_entries=1)
+def get_rollup_cube(version):
+    """Lead/call rollup cube over data/ (None when data/ is unavailable)"""
+    trace.miss()
+    from crm import cube
+    try:
+        return cube.Cube.load()
+    except Exception:
+        return None
+
+
+@trace.timed('resource search_index', cached=True)
+@st.cache_resource
+def get_search_index():
+    """Full-text call/lead index over data/ (None when data/ is unavailable)"""
+    trace.miss()
+    from crm import search
+    try:
+        return search.SearchIndex()
+    except Exception:
+        return None
+
+
+def agent_names(version):
+    """{agent id: display name} ({} when data/ is unavailable)"""
+    db = get_query_db(version)
+    if db is None:
+        return {}
+    return dict(query.filter_options(db.cursor())['agents'])
+
+
+def drift_warning(drift, limit=10):
+    """Say which insight fields failed validation (shown as empty values)"""
+    if not drift:
+        return
+    lines = [f"- `{d}`" for d in drift[:limit]]
+    if len(drift) > limit:
+        lines.append(f"- … and {len(drift) - limit} more")
+    st.warning("⚠️ Some AI insight data did not match the expected schema and is shown as empty:\n\n"
+               + "\n".join(lines))
+
+
+def performance_panel(run):
+    """Sidebar timings of this rerun (crm.trace), recent reruns of the same
+    page in this process and the host-wide cache counters"""
+    st.markdown("### ⏱️ Performance")
+    page = trace.summarize([r for r in trace.RECENT if r['page'] == run.page]).get(run.page)
+    st.metric("This Rerun", f"{run.seconds * 1000:.0f} ms",
+              delta=f"p50 {page['p50'] * 1000:.0f} / p95 {page['p95'] * 1000:.0f} ms over {page['runs']} runs",
+              delta_color="off")
+    if run.peak_bytes is not None:
+        st.metric("Peak Traced Memory", f"{run.peak_bytes / (1 << 20):.1f} MB")
+    rows = [{
+        'span': name,
+        'calls': stats['calls'],
+        'ms': round(stats['seconds'] * 1000, 1),
+        'cache': f"{stats['calls'] - stats['misses']}/{stats['calls']} hit" if 'misses' in stats else '',
+    } for name, stats in run.spans.items()]
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    stats = cache.default_cache().stats()
+    lookups = stats['hits'] + stats['misses']
+    st.caption(f"Host cache: {stats['entries']:,} entries, {stats['bytes'] / (1 << 20):.1f} MB, "
+               f"hit rate {stats['hits'] / lookups if lookups else 0:.0%}")
+
+
+# -------------------------------
+# BLOCKS
+# -------------------------------
+def metric(label, value, delta=None, delta_color='normal'):
+    """One item of a 'metrics' block"""
+    return {'label': label, 'value': value, 'delta': delta, 'delta_color': delta_color}
+
+
+def table(title, rows):
+    """A 'table' block from a list of row dicts"""
+    with trace.span('dataframe'):
+        return {'type': 'table', 'title': title, 'data': pd.DataFrame(rows)}
+
+
+def render_blocks(blocks):
+    """Draw the blocks a page's prepare() returned"""
+    for block in blocks:
+        kind = block['type']
+        if kind == 'metrics':
+            for col, item in zip(st.columns(len(block['items'])), block['items']):
+                with col:
+                    st.metric(item['label'], item['value'], delta=item.get('delta'),
+                              delta_color=item.get('delta_color', 'normal'))
+        elif kind == 'cards':
+            for col, item in zip(st.columns(len(block['items'])), block['items']):
+                with col:
+                    for html in item if isinstance(item, list) else [item]:
+                        st.markdown(html, unsafe_allow_html=True)
+        elif kind == 'html':
+            st.markdown(block['html'], unsafe_allow_html=True)
+        elif kind == 'divider':
+            st.markdown("---")
+        elif kind == 'heading':
+            st.markdown(f"#### {block['text']}")
+        elif kind == 'table':
+            if block.get('title'):
+                st.markdown(f"#### {block['title']}")
+            st.dataframe(block['data'], use_container_width=True, hide_index=block.get('hide_index'))
+        elif kind == 'bar':
+            st.bar_chart(block['data'])
+        elif kind == 'figure':
+            st.plotly_chart(block['figure'], use_container_width=True)
+
+
+# -------------------------------
+# WIDGETS
+# -------------------------------
+def drilldown_filters(key, version):
+    """Agent / country / lead score / date filters for a page drill-down"""
+    options = query.filter_options(get_query_db(version).cursor())
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        agents = st.multiselect("Agent", options['agents'], format_func=lambda o: o[1], key=f"{key}_agents")
+    with col2:
+        countries = st.multiselect("Country", options['countries'], format_func=lambda o: o[1], key=f"{key}_countries")
+    with col3:
+        scores = st.multiselect("Lead Score", options['scores'], format_func=lambda o: o[1], key=f"{key}_scores")
+    with col4:
+        dates = st.date_input("Date Range", value=(), key=f"{key}_dates")
+    start = end = None
+    if len(dates) == 2:
+        start, end = dates[0], dates[1] + timedelta(days=1)
+    return query.Filters(
+        agent_ids=tuple(a[0] for a in agents),
+        country_ids=tuple(c[0] for c in countries),
+        score_ids=tuple(s[0] for s in scores),
+        start=start, end=end,
+    )
+
+
+def paginated_table(grid, filters, key, version):
+    """Server-side paginated grid: each rerun fetches one keyset window from DuckDB"""
+    spec = query.GRIDS[grid]
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort = st.selectbox("Sort by", list(spec['sortable']), key=f"{key}_sort")
+    with col2:
+        page_size = st.selectbox("Rows", [25, 50, 100], key=f"{key}_size")
+    with col3:
+        descending = st.toggle("Descending", key=f"{key}_desc")
+    # Only the cursor of each visited page is kept per session, never the rows.
+    pager = st.session_state.setdefault(f"{key}_pager", {'signature': None, 'cursors': [None]})
+    signature = (filters, sort, page_size, descending)
+    if pager['signature'] != signature:
+        pager.update(signature=signature, cursors=[None])
+    db = get_query_db(version).cursor()
+    rows, next_cursor = query.grid_page(db, grid, filters, pager['cursors'][-1], page_size, sort, descending)
+    total = query.grid_count(db, grid, filters)
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    first = (len(pager['cursors']) - 1) * page_size
+    col1, col2, col3 = st.columns([1, 4, 1])
+    with col1:
+        if st.button("◀ Prev", key=f"{key}_prev", disabled=len(pager['cursors']) == 1):
+            pager['cursors'].pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Rows {first + 1 if len(rows) else 0:,}–{first + len(rows):,} of {total:,}")
+    with col3:
+        if st.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+            pager['cursors'].append(next_cursor)
+            st.rerun()
+
+
+def cube_explorer(key, default_dims, version):
+    """Group-by / filter picker answered from the rollup cube"""
+    from crm import cube
+    rollup = get_rollup_cube(version)
+    if rollup is None:
+        return
+    dims = st.multiselect("Group by", cube.DIMENSIONS, default=default_dims, key=f"{key}_dims")
+    cols = st.columns(3)
+    where = {}
+    for col, dim in zip(cols, ('country', 'score', 'status')):
+        with col:
+            where[dim] = st.multiselect(dim.title(), rollup.members(dim), key=f"{key}_{dim}")
+    result = rollup.slice(dims, where)
+    result['connect_rate'] = (100 * result['connected'] / result['calls'].where(result['calls'] > 0)).round(1)
+    st.dataframe(result, use_container_width=True, hide_index=True)
+
+
+def search_results(text, version):
+    """Matching calls and leads for the sidebar search box"""
+    index = get_search_index()
+    if index is None:
+        st.info("Search is unavailable: no data/ directory.")
+        return
+    index.sync()
+    with st.expander(f"🔍 Search results for “{text}”", expanded=True):
+        filters, names, sentiments = query.Filters(), {}, []
+        db = get_query_db(version)
+        if db is not None:
+            filters = drilldown_filters("search", version)
+            options = query.filter_options(db.cursor())
+            names = dict(options['agents'])
+            sentiments = st.multiselect("Call Sentiment", options['sentiments'], format_func=lambda o: o[1],
+                                        key="search_sentiments")
+        calls = index.calls(text, filters, tuple(s[0] for s in sentiments))
+        leads = index.leads(text, filters)
+        for frame in (calls, leads):
+            frame['AgentId'] = frame['AgentId'].map(lambda a: names.get(a, a))
+        st.markdown(f"**Calls** ({len(calls)})")
+        st.dataframe(calls.rename(columns={'AgentId': 'Agent'}), use_container_width=True, hide_index=True)
+        st.markdown(f"**Leads** ({len(leads)})")
+        st.dataframe(leads.rename(columns={'AgentId': 'Agent'}), use_container_width=True, hide_index=True)
+
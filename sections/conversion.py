@@ -0,0 +1,58 @@
+"""Conversion page."""
+from sections import common
+from sections.common import metric
+
+HEADER = "💰 AI Revenue Forecasting & Conversion Intelligence"
+
+
+def prepare(ctx):
+    conv_ai = ctx.section('conversion')
+
+    # Revenue Forecasting
+    revenue_forecast = conv_ai.revenue_forecasting
+    blocks = [{'type': 'metrics', 'items': [
+        metric("Pipeline Value", f"${revenue_forecast.total_pipeline_value/1000000:.2f}M"),
+        metric("Next Quarter Forecast", f"${revenue_forecast.expected_revenue_next_quarter/1000:.0f}K",
+               delta="AI Predicted"),
+        metric("High Probability Revenue", f"${revenue_forecast.high_probability_revenue/1000:.0f}K"),
+        metric("Next Month Conversions", conv_ai.predictive_insights.next_month_conversions_forecast),
+    ]}]
+
+    # Optimization Opportunities
+    conv_opt = conv_ai.conversion_optimization
+    time_to_conversion = conv_ai.time_to_conversion
+    blocks.append({'type': 'cards', 'items': [
+        '<div class="optimization-card">'
+        '<h4>🎯 Conversion Optimization</h4>'
+        f'<p><strong>Opportunities:</strong> {conv_opt.optimization_opportunities_count}</p>'
+        f'<p><strong>Revenue at Risk:</strong> ${conv_opt.total_revenue_at_risk/1000:.0f}K</p>'
+        f'<p><strong>Potential Uplift:</strong> ${conv_opt.potential_revenue_uplift/1000:.0f}K</p>'
+        '</div>',
+        '<div class="prediction-card">'
+        '<h4>⏱️ Time Intelligence</h4>'
+        f'<p><strong>Avg Conversion Time:</strong> {time_to_conversion.average_conversion_time:.1f} days</p>'
+        f'<p><strong>Fast Track Opportunities:</strong> {time_to_conversion.fast_track_opportunities}</p>'
+        f'<p><strong>Stalled Deals:</strong> {time_to_conversion.stalled_deals_needing_attention}</p>'
+        '</div>',
+    ]})
+
+    # Predictive Insights (the typed model guarantees a list of floats)
+    pred_insights = conv_ai.predictive_insights
+    ci = pred_insights.revenue_confidence_interval
+    low, high = (ci[0], ci[1]) if len(ci) >= 2 else (0.0, 0.0)
+    seasonal = float(pred_insights.seasonal_adjustment_factor)
+    trend = float(pred_insights.market_trend_impact)
+
+    blocks.append({'type': 'html', 'html': f"""
+        <div class="ai-insight-box">
+        <h4>🔮 Revenue Predictions & Market Intelligence</h4>
+        <p><strong>Revenue Confidence Range:</strong> ${low/1000:.0f}K - ${high/1000:.0f}K</p>
+        <p><strong>Seasonal Adjustment:</strong> {seasonal*100:.0f}% expected increase</p>
+        <p><strong>Market Trend Impact:</strong> +{trend*100:.0f}% from favorable conditions</p>
+        </div>
+        """})
+    return blocks
+
+
+def render(ctx, blocks):
+    common.render_blocks(blocks)
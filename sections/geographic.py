@@ -0,0 +1,55 @@
+"""Geographic page."""
+import streamlit as st
+
+from crm import query
+from sections import common
+from sections.common import metric
+
+HEADER = "🌍 Market Intelligence & Geographic AI Analytics"
+DRILLDOWN = "🔎 Drill-down: Leads by Country"
+
+
+def prepare(ctx):
+    geo_ai = ctx.section('geographic')
+    market_intel = geo_ai.market_intelligence
+    expansion = geo_ai.expansion_opportunities
+    risk = geo_ai.risk_analysis
+    blocks = [
+        {'type': 'metrics', 'items': [
+            metric("Top Opportunity Market", market_intel.top_opportunity_market or 'N/A', delta="AI Ranked #1"),
+            metric("Fastest Growing", market_intel.fastest_growing_market or 'N/A', delta="Growth Leader"),
+            metric("Best Conversion", market_intel.highest_conversion_market or 'N/A', delta="Performance Leader"),
+            metric("Market Diversity", f"{market_intel.market_diversity_index*100:.0f}%", delta="Balance Score"),
+        ]},
+        {'type': 'cards', 'items': [
+            '<div class="optimization-card"><h4>🚀 Expansion Opportunities</h4>'
+            f'<p><strong>High Potential Markets:</strong> {", ".join(expansion.high_potential_markets)}</p>'
+            f'<p><strong>Total Potential:</strong> {expansion.total_expansion_potential}</p>'
+            f'<p><strong>Underserved Markets:</strong> {", ".join(expansion.underserved_markets)}</p></div>',
+            '<div class="alert-card"><h4>⚠️ Risk Analysis</h4>'
+            f'<p><strong>Regulatory Challenges:</strong> {", ".join(risk.regulatory_challenges)}</p>'
+            f'<p><strong>Competitive Pressures:</strong> {", ".join(risk.competitive_pressures)}</p></div>',
+        ]},
+    ]
+    pred_analytics = geo_ai.predictive_analytics
+    if pred_analytics.market_saturation_timeline:
+        blocks.append(common.table("📅 Market Saturation Timeline", [
+            {'Market': m, 'Saturation Timeline': t} for m, t in pred_analytics.market_saturation_timeline.items()]))
+    return blocks
+
+
+def drilldown(ctx, con, filters):
+    return [{'type': 'table', 'data': query.geographic(con, filters)}]
+
+
+def render(ctx, blocks):
+    common.render_blocks(blocks)
+    db = common.get_query_db(ctx.version)
+    if db is not None:
+        with st.expander(DRILLDOWN):
+            filters = common.drilldown_filters("geographic", ctx.version)
+            common.render_blocks(drilldown(ctx, db.cursor(), filters))
+            st.markdown("**Leads**")
+            common.paginated_table('leads', filters, "geographic_grid", ctx.version)
+    with st.expander("🧊 Market Slice Explorer"):
+        common.cube_explorer("geographic_cube", ['country', 'city'], ctx.version)
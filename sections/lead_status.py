@@ -0,0 +1,62 @@
+"""Lead Status page."""
+import streamlit as st
+
+from crm import query
+from sections import common
+from sections.common import metric
+
+HEADER = "📊 Lead Status Dashboard"
+DRILLDOWN = "🔎 Drill-down: Leads by Status"
+
+
+def prepare(ctx):
+    lead_ai = ctx.section('lead_status')
+    conv_pred = lead_ai.conversion_predictions
+    blocks = [
+        {'type': 'metrics', 'items': [
+            metric("High Probability Leads", conv_pred.high_probability_leads, delta="AI Scored >70%"),
+            metric("Medium Probability", conv_pred.medium_probability_leads, delta="40-70%"),
+            metric("Low Probability", conv_pred.low_probability_leads, delta="<40%"),
+            metric("Avg Conversion Rate", f"{conv_pred.average_conversion_probability*100:.1f}%",
+                   delta="AI Predicted"),
+        ]},
+        {'type': 'html', 'html': '<div class="ai-insight-box"><h3>🤖 Lead Intelligence & Predictions</h3></div>'},
+    ]
+    if lead_ai.status_transitions:
+        blocks.append(common.table("🔄 Status Transition Predictions", [{
+            'Current Status': status,
+            'Next Likely Status': info.next_likely_status or 'N/A',
+            'Probability': f"{info.probability*100:.0f}%",
+            'Avg Days': f"{info.avg_days:.1f}"
+        } for status, info in lead_ai.status_transitions.items()]))
+    opt_rec = lead_ai.optimization_recommendations
+    if lead_ai.available:
+        blocks.append({'type': 'cards', 'items': [
+            '<div class="prediction-card"><h4>🎯 Priority Actions</h4>'
+            f'<p><strong>Immediate Action Leads:</strong> {len(opt_rec.priority_leads_for_immediate_action)}</p>'
+            f'<p>Top Lead IDs: {", ".join(map(str, opt_rec.priority_leads_for_immediate_action[:5]))}</p>'
+            '</div>',
+            '<div class="alert-card"><h4>⚠️ Churn Risk</h4>'
+            f'<p><strong>At-Risk Leads:</strong> {len(opt_rec.leads_at_risk_of_churn)}</p>'
+            '<p>Require immediate intervention</p></div>',
+            '<div class="optimization-card"><h4>💎 High Value Opportunities</h4>'
+            f'<p><strong>High Value Leads:</strong> {len(opt_rec.high_value_opportunities)}</p>'
+            '<p>Revenue > $60K + High Conversion</p></div>',
+        ]})
+    return blocks
+
+
+def drilldown(ctx, con, filters):
+    status_df = query.lead_status_counts(con, filters)
+    return [{'type': 'bar', 'data': status_df.set_index('status')}]
+
+
+def render(ctx, blocks):
+    common.render_blocks(blocks)
+    db = common.get_query_db(ctx.version)
+    if db is not None:
+        with st.expander(DRILLDOWN):
+            filters = common.drilldown_filters("lead_status", ctx.version)
+            common.render_blocks(drilldown(ctx, db.cursor(), filters))
+            st.markdown("**Leads**")
+            common.paginated_table('leads', filters, "lead_status_grid", ctx.version)
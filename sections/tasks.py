@@ -0,0 +1,76 @@
+"""Follow-up Tasks page."""
+import pandas as pd
+import streamlit as st
+
+from crm import model, query
+from sections import common
+from sections.common import metric
+
+HEADER = "🗂️ Smart Task Management & AI Prioritization"
+DRILLDOWN = "📋 Agent Task Queue"
+
+
+def prepare(ctx):
+    task_ai = ctx.section('tasks_followup')
+    smart_prior = task_ai.smart_prioritization
+    urgent = task_ai.urgent_actions
+    if ctx.tasks is not None:
+        live_counts = ctx.tasks.sync().counts()
+        urgent = model.UrgentActions(overdue_tasks=live_counts['overdue'], tasks_due_today=live_counts['today'],
+                                     tasks_due_this_week=live_counts['this_week'])
+    success = task_ai.success_prediction
+    insights = task_ai.predictive_insights
+    return [
+        {'type': 'metrics', 'items': [
+            metric("High Priority Tasks", smart_prior.high_priority_tasks, delta="AI Prioritized"),
+            metric("Medium Priority", smart_prior.medium_priority_tasks),
+            metric("Low Priority", smart_prior.low_priority_tasks),
+            metric("Success Rate Prediction", f"{success.overall_success_rate_prediction*100:.1f}%"),
+        ]},
+        {'type': 'cards', 'items': [
+            '<div class="alert-card"><h4>🚨 Immediate Action Required</h4>'
+            f'<p><strong>Overdue Tasks:</strong> {urgent.overdue_tasks}</p>'
+            f'<p><strong>Due Today:</strong> {urgent.tasks_due_today}</p>'
+            f'<p><strong>Due This Week:</strong> {urgent.tasks_due_this_week}</p></div>',
+            '<div class="prediction-card"><h4>📊 Success Predictions</h4>'
+            f'<p><strong>High Success Probability:</strong> {success.high_success_probability_tasks}</p>'
+            f'<p><strong>Low Success Probability:</strong> {success.low_success_probability_tasks}</p></div>',
+            '<div class="optimization-card"><h4>🔧 Productivity Optimization</h4>'
+            f'<p><strong>Improvement Potential:</strong> {insights.productivity_improvement_potential*100:.0f}%</p>'
+            f'<p><strong>Completion Forecast:</strong> {insights.completion_rate_forecast*100:.0f}%</p></div>',
+        ]},
+    ]
+
+
+def drilldown(ctx, con, filters, top_n=10):
+    if ctx.tasks is None or not filters.agent_ids:
+        return []
+    counts = [ctx.tasks.counts(agent_id=agent_id) for agent_id in filters.agent_ids]
+    total = {key: sum(c[key] for c in counts) for key in ('open', 'overdue', 'today', 'this_week')}
+    blocks = [{'type': 'metrics', 'items': [
+        metric("Open", total['open']),
+        metric("Overdue", total['overdue']),
+        metric("Due Today", total['today']),
+        metric("Due This Week", total['this_week']),
+    ]}]
+    queue = pd.DataFrame([task for agent_id in filters.agent_ids for task in ctx.tasks.next_tasks(agent_id, top_n)])
+    if not queue.empty:
+        queue = queue.sort_values(['scheduled_date', 'priority'], ascending=[True, False], kind='stable').head(top_n)
+        blocks.append({'type': 'table', 'data': queue[['scheduled_date', 'title', 'lead_id', 'priority']],
+                       'hide_index': True})
+    return blocks
+
+
+def render(ctx, blocks):
+    common.render_blocks(blocks)
+    tasks_live = ctx.tasks
+    if tasks_live is not None and tasks_live.heaps:
+        with st.expander(DRILLDOWN):
+            names = common.agent_names(ctx.version)
+            agent_ids = sorted(tasks_live.heaps)
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                agent_id = st.selectbox("Agent", agent_ids, format_func=lambda a: names.get(a, f"Agent {a}"), key="task_queue_agent")
+            with col2:
+                top_n = st.number_input("Show", min_value=1, max_value=100, value=10, key="task_queue_n")
+            common.render_blocks(drilldown(ctx, None, query.Filters(agent_ids=(agent_id,)), int(top_n)))
@@ -0,0 +1,42 @@
+"""Tests for crm.charts.
+
+    python -m pytest tests/
+"""
+import os
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from crm import charts, query
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def test_lttb_keeps_endpoints_budget_and_peaks():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[537] = 25.0
+    keep = charts.lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+    assert 537 in keep
+
+
+def test_lttb_passes_short_series_through():
+    assert list(charts.lttb(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+    assert list(charts.lttb(np.arange(5), np.arange(5), 2)) == [0, 1, 2, 3, 4]
+
+
+def test_call_series_stays_within_the_point_budget():
+    con = duckdb.connect()
+    query.build_database(con, DATA)
+    start, end = pd.Timestamp('2025-08-01'), pd.Timestamp('2025-10-01')
+    full, grain = charts.call_series(con, query.Filters(start=start, end=end))
+    assert grain == 'hour' and full['calls'].sum() == con.execute('SELECT count(*) FROM lead_call').fetchone()[0]
+    small, grain = charts.call_series(con, query.Filters(start=start, end=end), budget=4)
+    weeks = con.execute('SELECT period FROM call_rollup_week ORDER BY period').df()['period']
+    assert grain == 'week' and len(weeks) > 4
+    assert len(small) == 4
+    assert small['period'].iloc[[0, -1]].tolist() == weeks.iloc[[0, -1]].tolist()
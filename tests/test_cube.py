@@ -0,0 +1,65 @@
+"""Tests for crm.cube.
+
+    python -m pytest tests/
+"""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from crm import cube, ingest
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+@pytest.fixture(scope='module')
+def built():
+    return cube.Cube.build(DATA)
+
+
+def _totals(frame):
+    return [int(round(frame[m].sum())) for m in cube.MEASURES]
+
+
+def test_every_cuboid_sums_to_the_table_totals(built):
+    tables = ingest.load_tables(DATA)
+    calls = pd.concat(ingest.iter_calls(DATA, columns=['CallStatusId']))
+    connected = int((calls['CallStatusId'] == ingest.connected_status_id(tables)).sum())
+    base = _totals(built.cuboids[tuple(cube.DIMENSIONS)])
+    assert base[:3] == [len(tables['Lead']), len(calls), connected]
+    for dims, frame in built.cuboids.items():
+        assert _totals(frame) == base, dims
+
+
+@pytest.mark.parametrize('dims, where', [
+    (('country',), {}),
+    (('agent', 'month'), {}),
+    (('city', 'agent'), {'status': ['Won']}),
+    (('score',), {'country': ['Saudi Arabia', 'India'], 'month': ['2025-09']}),
+])
+def test_slice_matches_the_base_cuboid(built, dims, where):
+    base = built.cuboids[tuple(cube.DIMENSIONS)]
+    for dim, values in where.items():
+        base = base[base[dim].isin(values)]
+    expected = base.groupby(list(dims), observed=True)[cube.MEASURES].sum()
+    got = built.slice(dims, where).set_index(list(dims))
+    pd.testing.assert_frame_equal(got.sort_index(), expected.sort_index(), check_dtype=False)
+
+
+def test_load_reuses_the_stored_cube_until_a_source_changes(tmp_path):
+    data = shutil.copytree(DATA, tmp_path / 'data')
+    cube_dir = str(tmp_path / 'cube')
+    first = cube.Cube.load(data, cube_dir)
+    stored = os.stat(os.path.join(cube_dir, 'manifest.json')).st_mtime_ns
+    again = cube.Cube.load(data, cube_dir)
+    assert os.stat(os.path.join(cube_dir, 'manifest.json')).st_mtime_ns == stored
+    assert _totals(again.slice(('country',))) == _totals(first.slice(('country',)))
+
+    with open(data / 'LeadCall.csv') as f:
+        last = f.read().rstrip('\n').rsplit('\n', 1)[1].split(',')
+    last[0] = str(int(last[0]) + 1000)
+    with open(data / 'LeadCall.csv', 'a') as f:
+        f.write(','.join(last) + '\n')
+    rebuilt = cube.Cube.load(data, cube_dir)
+    assert _totals(rebuilt.slice())[1] == _totals(first.slice())[1] + 1
@@ -0,0 +1,99 @@
+"""Tests for crm.incremental.
+
+    python -m pytest tests/
+"""
+import os
+import shutil
+
+import pytest
+
+from crm import incremental, scheduler
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+HEADER = 'ScheduleId,LeadId,ScheduleTitle,ScheduledDate,TaskStatusId,AssignedAgentId,CreatedOn\n'
+NOW = '2025-10-01 12:00:00'
+CREATED = '2025-09-15 08:00:00'
+
+
+def _data_dir(tmp_path):
+    """data/ with the shipped lookups and an empty LeadCall."""
+    shutil.copyfile(os.path.join(DATA, 'CallStatus.csv'), tmp_path / 'CallStatus.csv')
+    with open(os.path.join(DATA, 'LeadCall.csv')) as f:
+        (tmp_path / 'LeadCall.csv').write_text(f.readline())
+    (tmp_path / 'Schedule.csv').write_text(HEADER)
+    return tmp_path
+
+
+def _append(path, name, rows):
+    with open(path / name, 'a') as f:
+        f.write(''.join(row + '\n' for row in rows))
+
+
+def _aggregator(path):
+    return incremental.IncrementalAggregator(str(path), str(path / 'state.json'))
+
+
+def _upcoming(aggregator):
+    return [(t['lead_id'], t['scheduled_date']) for t in aggregator.sections(NOW)['upcoming_tasks']]
+
+
+def test_closed_and_updated_tasks_match_the_scheduler(tmp_path):
+    data = _data_dir(tmp_path)
+    _append(data, 'Schedule.csv', [
+        f'1,10,Call,2025-10-02 09:00:00,1,1,{CREATED}',
+        f'2,11,Call,2025-10-03 09:00:00,4,1,{CREATED}',   # completed
+        f'3,12,Call,2025-10-04 09:00:00,5,2,{CREATED}',   # cancelled
+        f'4,13,Call,2025-10-05 09:00:00,2,2,{CREATED}',
+    ])
+    aggregator = _aggregator(data)
+    aggregator.refresh(NOW)
+    assert _upcoming(aggregator) == [(10, '2025-10-02 09:00:00'), (13, '2025-10-05 09:00:00')]
+
+    # Appended rows for known ids complete task 1 and move task 4.
+    _append(data, 'Schedule.csv', [f'1,10,Call,2025-10-02 09:00:00,4,1,{CREATED}',
+                                   f'4,13,Call,2025-10-06 09:00:00,2,2,{CREATED}'])
+    aggregator.refresh(NOW)
+    assert _upcoming(aggregator) == [(13, '2025-10-06 09:00:00')]
+    tasks = scheduler.TaskScheduler().sync(str(data))
+    assert tasks.counts(NOW)['open'] == len(_upcoming(aggregator))
+
+
+def test_reexport_rebuilds_and_parse_errors_propagate(tmp_path):
+    data = _data_dir(tmp_path)
+    _append(data, 'Schedule.csv', [f'1,10,Call,2025-10-02 09:00:00,1,1,{CREATED}',
+                                   f'2,11,Call,2025-10-03 09:00:00,1,1,{CREATED}'])
+    aggregator = _aggregator(data)
+    aggregator.refresh(NOW)
+    (data / 'Schedule.csv').write_text(HEADER + f'3,12,Call,2025-10-04 09:00:00,1,2,{CREATED}\n')
+    assert aggregator.refresh(NOW)['new_tasks'] == 1
+    assert _upcoming(aggregator) == [(12, '2025-10-04 09:00:00')]
+
+    _append(data, 'Schedule.csv', [f'x,13,Call,2025-10-05 09:00:00,1,2,{CREATED}'])
+    with pytest.raises(ValueError):
+        aggregator.refresh(NOW)
+    assert _upcoming(aggregator) == [(12, '2025-10-04 09:00:00')]
+
+
+def test_quoted_newlines_stay_in_one_record(tmp_path):
+    path = tmp_path / 'Schedule.csv'
+    path.write_text(HEADER + f'1,10,"Call\nback",2025-10-02 09:00:00,1,1,{CREATED}\n'
+                    f'2,11,"Demo, part\n')   # a writer mid-append, inside a quoted field
+    reader = incremental.read_appended(str(path), 0, None, incremental.TASK_COLUMNS)
+    batches = list(_drain(reader))
+    assert [list(b['ScheduleTitle']) for b in batches[:-1]] == [['Call\nback']]
+    offset, header = batches[-1]
+
+    with open(path, 'a') as f:
+        f.write(f'two",2025-10-03 09:00:00,1,1,{CREATED}\n')
+    batches = list(_drain(incremental.read_appended(str(path), offset, header, incremental.TASK_COLUMNS)))
+    assert [list(b['ScheduleTitle']) for b in batches[:-1]] == [['Demo, part\ntwo']]
+
+
+def _drain(reader):
+    """Every batch, then the (offset, header) the reader returned."""
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration as done:
+            yield done.value
+            return
@@ -0,0 +1,18 @@
+"""Tests for crm.ingest.
+
+    python -m pytest tests/
+"""
+import json
+import os
+
+from crm import ingest, model
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def test_unscored_leads_give_strict_json_without_drift():
+    dashboard, _ = ingest.build_dashboard_model(DATA, scores_path=None, trace_memory=False)
+    text = json.dumps(dashboard, allow_nan=False)
+    assert all('Churn_Risk' not in stats for stats in dashboard['geographic'].values())
+    drift = model.parse_document(model.DASHBOARD, json.loads(text))[1]
+    assert [d for d in drift if d.startswith('geographic')] == []
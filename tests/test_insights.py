@@ -0,0 +1,34 @@
+"""Tests for crm.insights.
+
+    python -m pytest tests/
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from crm import insights
+
+
+def _sentiment(names):
+    return pd.Series(pd.Categorical(names, categories=['Positive', 'Neutral', 'Negative']))
+
+
+def test_sentiment_correlation_is_pearson_r():
+    sentiment = _sentiment(['Positive', 'Positive', 'Neutral', 'Negative', None, None])
+    won = np.array([True, True, False, False, True, False])
+    x, y = np.array([1.0, 1.0, 0.0, -1.0]), np.array([1.0, 1.0, 0.0, 0.0])
+    assert insights.sentiment_correlation(sentiment, won) == pytest.approx(np.corrcoef(x, y)[0, 1])
+
+
+def test_sentiment_correlation_sign_and_degenerate_cases():
+    assert insights.sentiment_correlation(_sentiment(['Positive', 'Negative']), [False, True]) == pytest.approx(-1.0)
+    assert insights.sentiment_correlation(_sentiment(['Positive', 'Negative']), [True, True]) == 0.0
+    assert insights.sentiment_correlation(_sentiment([None, None]), [True, False]) == 0.0
+
+
+def test_training_impact_is_the_mean_shortfall_of_below_average_agents():
+    connect_rate = pd.Series([0.2, 0.4, 0.6, 0.8], index=[1, 2, 3, 4])
+    weak, gap = insights.connect_rate_gap(connect_rate)
+    assert list(weak) == [1, 2]
+    assert gap == pytest.approx(((0.5 - 0.2) + (0.5 - 0.4)) / 2)
+    assert insights.connect_rate_gap(pd.Series([0.5, 0.5], index=[1, 2]))[1] == 0.0
@@ -0,0 +1,50 @@
+"""Tests for crm.live.
+
+    python -m pytest tests/
+"""
+import os
+import time
+
+from crm import live
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+HEADER = 'LeadCallId,CallDateTime,CallStatusId,SentimentId,AssignedAgentId'
+
+
+def _wait(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.02)
+
+
+def test_window_drops_old_hours_and_counts_late_and_bad_events():
+    counters = live.LiveCounters(connected_id=1, window_hours=2)
+    counters.fold(HEADER, ['1,2025-10-01 10:05:00,1,1.0,3', '2,2025-10-01 11:10:00,2,,3'])
+    counters.fold(HEADER, ['3,2025-10-01 12:00:00,1,3,4', '4,2025-10-01 10:30:00,1,1,3', '5,bad,x,1,3'])
+    snap = counters.snapshot(recent_hours=1)
+    assert (snap['total_calls'], snap['connected_calls'], snap['late'], snap['errors']) == (4, 3, 1, 1)
+    assert [h['hour'] for h in snap['hourly']] == ['2025-10-01 11', '2025-10-01 12']
+    assert snap['window'] == {'calls': 2, 'connected': 1, 'success_rate': 50.0, 'by_status': {1: 1, 2: 1},
+                              'sentiment': {3: 1}, 'by_agent': {3: 1, 4: 1}}
+    assert snap['recent'] == {'hours': 1, 'calls': 1, 'connected': 1, 'success_rate': 100.0}
+
+
+def test_tail_reads_complete_lines_and_resets_on_reexport(tmp_path):
+    path = tmp_path / 'LeadCall.csv'
+    path.write_text(HEADER + '\n1,2025-10-01 10:05:00,1,1,3\n2,2025-10-01 10:')
+    feed = live.LiveFeed(str(path), DATA, poll=0.02).start()
+    try:
+        _wait(lambda: feed.counters.caught_up)
+        assert feed.snapshot()['total_calls'] == 1
+        with open(path, 'a') as f:
+            f.write('20:00,2,1,3\n')
+        _wait(lambda: feed.snapshot()['total_calls'] == 2)
+
+        path.write_text(HEADER + '\n9,2025-10-02 09:00:00,1,1,5\n')
+        _wait(lambda: feed.snapshot()['newest_hour'] == '2025-10-02 09')
+        snap = feed.snapshot()
+        assert (snap['total_calls'], snap['window']['by_agent']) == (1, {5: 1})
+        assert feed.last_error is None
+    finally:
+        feed.stop()
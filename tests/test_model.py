@@ -0,0 +1,42 @@
+"""Tests for crm.model.
+
+    python -m pytest tests/
+"""
+from crm import model
+
+Point = model.record('Point', {'hour': int, 'rate': float})
+Sample = model.section('Sample', {
+    'name': str, 'total': int, 'points': model.List(Point), 'by_country': model.Map(float),
+}, optional=('by_country',))
+
+
+def test_drift_is_reported_and_failed_fields_stay_empty():
+    drift = []
+    sample = model.parse(Sample, {
+        'name': None, 'total': 2.5, 'points': [{'hour': 9, 'rate': 1}, {'hour': '10'}], 'extra': 1,
+    }, 'sample', drift)
+    assert sorted(drift) == sorted([
+        'sample.name: expected str, got null',
+        'sample.total: expected int, got float',
+        'sample.points[1].hour: expected int, got str',
+        'sample.points[1].rate: missing',
+        'sample.extra: unexpected field',
+    ])
+    assert (sample.name, sample.total, sample.by_country) == ('', 0, {})
+    assert [(p.hour, p.rate) for p in sample.points] == [(9, 1.0), (0, 0.0)]
+    assert type(sample.points[0].rate) is float
+
+
+def test_missing_sections_are_unavailable():
+    sections, drift = model.parse_document({'sample': Sample}, {'other': {}})
+    assert not sections['sample'].available
+    assert drift == ['sample: missing section', 'other: unexpected section']
+
+
+def test_arrow_round_trip_keeps_values_and_drift():
+    sections, _ = model.parse_document({'sample': Sample}, {'sample': {
+        'name': 'x', 'total': 3, 'points': [{'hour': 1, 'rate': 0.5}], 'by_country': {'India': 2.0}, 'extra': 0,
+    }})
+    restored = model.from_arrow(Sample, model.to_arrow(sections['sample']))
+    assert restored.to_dict() == sections['sample'].to_dict()
+    assert restored.drift == ('sample.extra: unexpected field',) and restored.available
@@ -0,0 +1,105 @@
+"""Tests for crm.query.
+
+    python -m pytest tests/
+"""
+import os
+import shutil
+
+import duckdb
+import pytest
+
+from crm import query
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def _data_dir(tmp_path):
+    data = tmp_path / 'data'
+    shutil.copytree(DATA, data)
+    return data
+
+
+def _versions(db_path):
+    return sorted(p for p in os.listdir(os.path.dirname(db_path)) if p.endswith('.duckdb'))
+
+
+def test_new_version_builds_a_new_file_while_readers_hold_the_old(tmp_path):
+    data = _data_dir(tmp_path)
+    db_path = str(tmp_path / 'state' / 'crm.duckdb')
+    old = query.open_database(data, db_path, shared=True)
+    leads = old.execute('SELECT count(*) FROM lead').fetchone()[0]
+    old_file = os.path.basename(query.versioned_path(data, db_path))
+    assert _versions(db_path) == [old_file]
+
+    with open(data / 'Lead.csv') as f:
+        last = f.read().rstrip('\n').rsplit('\n', 1)[1].split(',')
+    last[0] = str(int(last[0]) + 1000)
+    with open(data / 'Lead.csv', 'a') as f:
+        f.write(','.join(last) + '\n')
+    new = query.open_database(data, db_path, shared=True)
+    assert new.execute("SELECT database_name FROM duckdb_databases() WHERE NOT internal").fetchone()[0] != 'memory'
+    assert new.execute('SELECT count(*) FROM lead').fetchone()[0] == leads + 1
+    assert _versions(db_path) == [os.path.basename(query.versioned_path(data, db_path))]
+
+    # The old reader keeps its snapshot after the file is collected.
+    assert old.execute('SELECT count(*) FROM lead').fetchone()[0] == leads
+    old.close()
+    new.close()
+
+
+def test_csv_paths_are_bound_not_spliced(tmp_path):
+    data = shutil.copytree(DATA, tmp_path / "it's data")
+    con = duckdb.connect()
+    query.build_database(con, data)
+    with open(data / 'Lead.csv') as f:
+        assert con.execute('SELECT count(*) FROM lead').fetchone()[0] == len(f.readlines()) - 1
+
+
+def test_unknown_grain_is_rejected():
+    con = duckdb.connect()
+    query.build_database(con, DATA)
+    assert len(query.call_activity(con, grain='week')) > 0
+    with pytest.raises(ValueError):
+        query.call_activity(con, grain="day', CallDateTime) --")
+
+
+def _paged_database():
+    """The shipped data with tied and NULL durations on every third call."""
+    con = duckdb.connect()
+    query.build_database(con, DATA)
+    con.execute("""UPDATE lead_call SET DurationSeconds =
+                   CASE WHEN LeadCallId % 3 = 0 THEN NULL ELSE LeadCallId % 2 * 60 END""")
+    return con
+
+
+def _walk(con, grid, limit, **kwargs):
+    keys, cursor = [], None
+    while True:
+        rows, cursor = query.grid_page(con, grid, after=cursor, limit=limit, **kwargs)
+        assert len(rows) <= limit
+        keys.extend(rows.iloc[:, 0])
+        if cursor is None:
+            return keys
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_keyset_pages_cover_every_row_once_with_nulls_last(descending):
+    con = _paged_database()
+    calls = con.execute('SELECT LeadCallId, DurationSeconds FROM lead_call').fetchall()
+    present = sorted((d, k) for k, d in calls if d is not None)
+    missing = sorted(k for k, d in calls if d is None)
+    if descending:
+        expected = missing[::-1] + [k for _, k in present[::-1]]
+    else:
+        expected = [k for _, k in present] + missing
+    assert _walk(con, 'calls', 2, sort='Duration', descending=descending) == expected
+    assert query.grid_count(con, 'calls') == len(calls)
+
+
+def test_filtered_pages_match_the_filtered_count():
+    con = _paged_database()
+    agent = con.execute('SELECT AssignedAgentId FROM lead GROUP BY 1 ORDER BY count(*) DESC LIMIT 1').fetchone()[0]
+    filters = query.Filters(agent_ids=(agent,))
+    keys = _walk(con, 'leads', 3, filters=filters, sort='Created')
+    assert len(keys) == len(set(keys)) == query.grid_count(con, 'leads', filters)
+    assert set(keys) == {k for (k,) in con.execute('SELECT LeadId FROM lead WHERE AssignedAgentId = ?', [agent]).fetchall()}
@@ -0,0 +1,14 @@
+"""Tests for crm.refresh.
+
+    python -m pytest tests/
+"""
+from crm import refresh
+
+
+def test_publish_lock_is_per_output_directory(tmp_path):
+    with refresh._PublishLock(str(tmp_path / 'a')) as first:
+        with refresh._PublishLock(str(tmp_path / 'a')) as same:
+            with refresh._PublishLock(str(tmp_path / 'b')) as other:
+                assert first.acquired and other.acquired
+                assert not same.acquired or refresh.fcntl is None
+    assert (tmp_path / 'a' / '.state' / refresh.LOCK_FILE).exists()
@@ -0,0 +1,61 @@
+"""Tests for crm.scheduler.
+
+    python -m pytest tests/
+"""
+import pytest
+
+from crm import scheduler
+
+HEADER = 'ScheduleId,LeadId,ScheduleTitle,ScheduledDate,TaskStatusId,AssignedAgentId\n'
+NOW = '2025-10-01 12:00:00'
+
+
+def _write(path, rows, header=HEADER):
+    with open(path / 'Schedule.csv', 'w') as f:
+        f.write(header + ''.join(row + '\n' for row in rows))
+
+
+def _append(path, rows):
+    with open(path / 'Schedule.csv', 'a') as f:
+        f.write(''.join(row + '\n' for row in rows))
+
+
+def test_completed_and_cancelled_are_closed_by_default():
+    assert scheduler.TaskScheduler().closed_statuses == {4, 5}
+
+
+def test_closed_tasks_are_not_counted(tmp_path):
+    _write(tmp_path, [
+        '1,10,Call,2025-09-20 09:00:00,1,1',   # open, overdue
+        '2,11,Call,2025-09-20 09:00:00,4,1',   # completed
+        '3,12,Call,2025-10-01 09:00:00,5,1',   # cancelled
+        '4,13,Call,2025-10-03 09:00:00,2,2',   # open, this week
+    ])
+    tasks = scheduler.TaskScheduler(closed_statuses=(4, 5)).sync(tmp_path)
+    assert tasks.counts(NOW) == {'overdue': 1, 'today': 0, 'this_week': 1, 'open': 2}
+    _append(tmp_path, ['1,10,Call,2025-09-20 09:00:00,4,1'])
+    assert tasks.sync(tmp_path).counts(NOW)['overdue'] == 0
+    assert [t['schedule_id'] for t in tasks.next_tasks(1)] == []
+
+
+def test_blank_status_is_open(tmp_path):
+    _write(tmp_path, ['1,10,Call,2025-09-20 09:00:00,,1'])
+    tasks = scheduler.TaskScheduler(closed_statuses=(4, 5)).sync(tmp_path)
+    _append(tmp_path, ['2,11,Call,2025-10-02 09:00:00,,1'])
+    assert tasks.sync(tmp_path).counts(NOW)['open'] == 2
+
+
+def test_parse_errors_propagate(tmp_path):
+    _write(tmp_path, ['1,10,Call,2025-09-20 09:00:00,x,1'])
+    with pytest.raises(ValueError):
+        scheduler.TaskScheduler().sync(tmp_path)
+
+
+def test_reexport_reloads_once(tmp_path):
+    _write(tmp_path, ['1,10,Call,2025-09-20 09:00:00,1,1', '2,11,Call,2025-09-21 09:00:00,1,1'])
+    tasks = scheduler.TaskScheduler().sync(tmp_path)
+    _write(tmp_path, ['3,12,Call,2025-09-22 09:00:00,1,2'])
+    assert len(tasks.sync(tmp_path)) == 1
+    _write(tmp_path, ['3,12,Call,2025-09-22 09:00:00,1,2'], header=HEADER.replace('LeadId', 'LeadID'))
+    with pytest.raises(ValueError):
+        tasks.sync(tmp_path)
@@ -0,0 +1,62 @@
+"""Tests for crm.search.
+
+    python -m pytest tests/
+"""
+import os
+import shutil
+
+from crm import query, search
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def _index(tmp_path):
+    data = shutil.copytree(DATA, tmp_path / 'data')
+    index = search.SearchIndex(str(tmp_path / 'search.sqlite'))
+    return data, index
+
+
+def _call(data, call_id, summary, agent=1):
+    """A copy of the first LeadCall row with a new id, agent and summary."""
+    with open(data / 'LeadCall.csv') as f:
+        header = f.readline().rstrip('\n').split(',')
+        row = f.readline().rstrip('\n').split(',')
+    fields = dict(zip(header, row))
+    fields.update(LeadCallId=str(call_id), AssignedAgentId=str(agent), CallSummary=summary)
+    return ','.join(fields[c] for c in header)
+
+
+def test_sync_indexes_only_appended_calls(tmp_path):
+    data, index = _index(tmp_path)
+    first = index.sync(data)
+    assert first['calls'] == len(index) > 0 and first['leads'] > 0
+    assert index.sync(data) == {'calls': 0, 'leads': 0}
+
+    with open(data / 'LeadCall.csv', 'a') as f:
+        f.write(_call(data, 9001, 'Asked about a waterfront penthouse', agent=3) + '\n')
+    assert index.sync(data)['calls'] == 1
+    assert index.calls('penthouse')['LeadCallId'].tolist() == [9001]
+    assert index.calls('penthouse', query.Filters(agent_ids=(1,))).empty
+
+
+def test_reexport_drops_calls_that_are_gone(tmp_path):
+    data, index = _index(tmp_path)
+    with open(data / 'LeadCall.csv', 'a') as f:
+        f.write(_call(data, 9001, 'Asked about a waterfront penthouse') + '\n')
+    index.sync(data)
+    with open(data / 'LeadCall.csv') as f:
+        header = f.readline()
+    (data / 'LeadCall.csv').write_text(header + _call(data, 1, 'Wants a quiet villa') + '\n')
+    assert index.sync(data)['calls'] == 1
+    assert len(index) == 1
+    assert index.calls('penthouse').empty
+    assert index.calls('"quiet villa"')['LeadCallId'].tolist() == [1]
+
+
+def test_edited_lead_notes_are_reindexed(tmp_path):
+    data, index = _index(tmp_path)
+    index.sync(data)
+    text = (data / 'Lead.csv').read_text()
+    (data / 'Lead.csv').write_text(text.replace('Potential investor', 'Prospective buyer', 1))
+    assert index.sync(data)['leads'] > 0
+    assert index.leads('prospective buyer')['LeadId'].tolist() == [1]
@@ -0,0 +1,74 @@
+"""Tests for crm.snapshots.
+
+    python -m pytest tests/
+"""
+import json
+import multiprocessing
+import os
+import shutil
+
+from crm import snapshots
+
+SHIPPED = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'processed_data', 'dashboard_data.json')
+
+
+def _document(tmp_path):
+    source = tmp_path / 'dashboard_data.json'
+    shutil.copyfile(SHIPPED, source)
+    return str(source)
+
+
+def _load(root, source, barrier, results):
+    barrier.wait()
+    try:
+        summary = snapshots.SnapshotStore(root).load_section(source, 'executive_summary')
+        results.put(summary.total_leads)
+    except Exception as e:
+        results.put(repr(e))
+
+
+def test_section_round_trip(tmp_path):
+    source = _document(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / '.snapshots'))
+    with open(source) as f:
+        expected = json.load(f)['executive_summary']['total_leads']
+    assert store.load_section(source, 'executive_summary').total_leads == expected
+    assert store.document_drift(source) == []
+
+
+def test_changed_source_rebuilds_and_drops_the_old_snapshot(tmp_path):
+    source = _document(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / '.snapshots'))
+    old = store.snapshot_path(source, 'document')
+    with open(source) as f:
+        payload = json.load(f)
+    payload['executive_summary']['total_leads'] = 123
+    with open(source, 'w') as f:
+        json.dump(payload, f)
+    assert store.load_section(source, 'executive_summary').total_leads == 123
+    assert not os.path.exists(old)
+
+
+def test_missing_sidecar_reuses_the_built_snapshot(tmp_path):
+    source = _document(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / '.snapshots'))
+    path = store.snapshot_path(source, 'document')
+    os.remove(store._sidecar(store._key(source)))
+    assert store.snapshot_path(source, 'document') == path
+    assert [p for p in os.listdir(store.root) if p.endswith('.tmp')] == []
+
+
+def test_concurrent_cold_start(tmp_path):
+    source = _document(tmp_path)
+    root = str(tmp_path / '.snapshots')
+    workers = 8
+    barrier, results = multiprocessing.Barrier(workers), multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_load, args=(root, source, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    loaded = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join()
+    with open(source) as f:
+        assert loaded == [json.load(f)['executive_summary']['total_leads']] * workers
+    assert [p for p in os.listdir(root) if p.endswith('.tmp')] == []